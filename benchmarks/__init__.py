@@ -0,0 +1,8 @@
+"""asv benchmarks of napari-power-widgets.
+
+Run ``asv run`` from the repository root. All the benchmarks run headless.
+"""
+
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
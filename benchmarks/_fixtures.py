@@ -0,0 +1,55 @@
+"""Synthetic layers and helpers shared by the benchmarks."""
+
+from __future__ import annotations
+
+import numpy as np
+
+SEED = 12345
+
+
+def make_labels(nvoxels: int, block: int = 32) -> np.ndarray:
+    """Make a cubic uint8 label image of about ``nvoxels`` voxels.
+
+    The image is tiled with cubic blocks of edge ``block``, filled plane by
+    plane so that no int64 temporary of the full size is created.
+    """
+    n = max(int(round(nvoxels ** (1 / 3))), block)
+    nblocks = -(-n // block)
+    yy, xx = np.indices((n, n), dtype=np.int64) // block
+    plane = yy * nblocks + xx
+    out = np.empty((n, n, n), dtype=np.uint8)
+    for z in range(n):
+        out[z] = (plane + (z // block) * nblocks**2) % 256
+    return out
+
+
+def make_rectangles(nshapes: int, extent: float = 1000.0) -> np.ndarray:
+    """Make ``nshapes`` random rectangles as a (N, 4, 2) array."""
+    rng = np.random.default_rng(SEED)
+    centers = rng.uniform(0, extent, size=(nshapes, 1, 2))
+    corners = np.array([[-2, -3], [-2, 3], [2, 3], [2, -3]], dtype=np.float64)
+    return centers + corners
+
+
+def make_features(nrows: int, ncols: int = 4):
+    """Make a feature data frame with ``nrows`` rows."""
+    import pandas as pd
+
+    rng = np.random.default_rng(SEED)
+    return pd.DataFrame(
+        rng.normal(size=(nrows, ncols)),
+        columns=[f"col-{i}" for i in range(ncols)],
+    )
+
+
+def make_viewer():
+    """Make a headless viewer."""
+    import napari
+
+    return napari.Viewer(show=False)
+
+
+def dock(viewer, widget):
+    """Dock a widget so that it can find the viewer ancestor."""
+    viewer.window.add_dock_widget(widget)
+    return widget
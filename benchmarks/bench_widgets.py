@@ -0,0 +1,310 @@
+"""Benchmarks of the widget hot paths with synthetic large layers."""
+
+import numpy as np
+
+from . import _fixtures as fx
+
+
+class LabelsSuite:
+    params = [10**6, 10**7, 10**9]
+    param_names = ["nvoxels"]
+    timeout = 600
+
+    def setup(self, nvoxels):
+        from napari_power_widgets import LabelComboBox
+
+        self.viewer = fx.make_viewer()
+        self.layer = self.viewer.add_labels(fx.make_labels(nvoxels))
+        self.widget = fx.dock(self.viewer, LabelComboBox())
+        self.widget.reset_choices()
+        self.widget.value = (self.layer, 1)
+
+    def teardown(self, nvoxels):
+        self.viewer.close()
+
+    def time_value(self, nvoxels):
+        self.widget.value
+
+    def peakmem_value(self, nvoxels):
+        self.widget.value
+
+    def time_get_index_list(self, nvoxels):
+        self.widget._get_index_list(self.widget)
+
+
+class ShapesSuite:
+    params = [10**2, 10**4, 10**5]
+    param_names = ["nshapes"]
+    timeout = 600
+
+    def setup(self, nshapes):
+        from napari_power_widgets import ShapeComboBox, ShapeSelect
+
+        self.viewer = fx.make_viewer()
+        self.layer = self.viewer.add_shapes(
+            list(fx.make_rectangles(nshapes)), shape_type="rectangle"
+        )
+        self.combobox = fx.dock(self.viewer, ShapeComboBox())
+        self.select = fx.dock(self.viewer, ShapeSelect())
+        self.combobox.reset_choices()
+        self.select.reset_choices()
+
+    def teardown(self, nshapes):
+        self.viewer.close()
+
+    def time_combobox_refresh(self, nshapes):
+        self.combobox._shape_cbox.reset_choices()
+
+    def time_select_refresh(self, nshapes):
+        self.select._shape_cbox.reset_choices()
+
+    def time_combobox_value(self, nshapes):
+        self.combobox.value
+
+
+class FeaturesSuite:
+    params = [10**3, 10**5, 10**6]
+    param_names = ["nrows"]
+    timeout = 300
+
+    def setup(self, nrows):
+        from napari_power_widgets import ColumnChoice
+
+        self.viewer = fx.make_viewer()
+        self.viewer.add_labels(
+            np.zeros((16, 16), dtype=np.uint8),
+            features=fx.make_features(nrows),
+        )
+        self.widget = fx.dock(self.viewer, ColumnChoice())
+        self.widget.reset_choices()
+
+    def teardown(self, nrows):
+        self.viewer.close()
+
+    def time_refresh(self, nrows):
+        self.widget.reset_choices()
+        self.widget._set_available_columns()
+
+    def time_value(self, nrows):
+        self.widget.value
+
+
+class BoxSelectorSuite:
+    params = [10, 1000, 10000]
+    param_names = ["nevents"]
+
+    def setup(self, nevents):
+        from napari_power_widgets import BoxSelector
+        from napari_power_widgets.replay import MouseStream
+
+        self.viewer = fx.make_viewer()
+        self.viewer.add_image(np.zeros((128, 128), dtype=np.float32))
+        self.widget = fx.dock(self.viewer, BoxSelector())
+        self.stream = MouseStream.drag([0, 0], [100, 100], nevents)
+
+    def teardown(self, nevents):
+        self.viewer.close()
+
+    def _replay(self):
+        from napari_power_widgets.replay import replay
+
+        self.widget.mode = "selecting"
+        return replay(self.stream, self.viewer)
+
+    def time_drag(self, nevents):
+        self._replay()
+
+    def track_move_latency_us(self, nevents):
+        return self._replay().summary()["mouse_move_mean_us"]
+
+    track_move_latency_us.unit = "us"
+
+    def track_throughput(self, nevents):
+        return self._replay().throughput
+
+    track_throughput.unit = "events/s"
+
+
+class ClickSuite:
+    def setup(self):
+        from napari_power_widgets import CoordinateSelector, LabelComboBox
+        from napari_power_widgets.replay import MouseStream
+
+        self.viewer = fx.make_viewer()
+        self.viewer.add_labels(fx.make_labels(10**6)[0])
+        self.coord = fx.dock(self.viewer, CoordinateSelector())
+        self.labels = fx.dock(self.viewer, LabelComboBox())
+        self.labels.reset_choices()
+        self.stream = MouseStream.click([40, 40])
+
+    def teardown(self):
+        self.viewer.close()
+
+    def time_coordinate_click(self):
+        from napari_power_widgets.replay import replay
+
+        self.coord.mode = "selecting"
+        replay(self.stream, self.viewer)
+
+    def time_label_click(self):
+        from napari_power_widgets.replay import replay
+
+        self.labels.mode = "selecting"
+        replay(self.stream, self.viewer)
+
+
+class ShapeDataEditSuite:
+    params = [10, 1000, 10000]
+    param_names = ["nvertices"]
+    # time_draw_line adds a line to the layer, so every call needs a fresh
+    # viewer from setup
+    number = 1
+    warmup_time = 0
+
+    def setup(self, nvertices):
+        from napari_power_widgets import LineDataEdit, PathDataEdit
+        from napari_power_widgets.replay import MouseStream
+
+        self.viewer = fx.make_viewer()
+        self.path_edit = fx.dock(self.viewer, PathDataEdit())
+        self.line_edit = fx.dock(self.viewer, LineDataEdit())
+        rng = np.random.default_rng(fx.SEED)
+        self.vertices = rng.uniform(0, 100, size=(nvertices, 2))
+        self.drag = MouseStream.drag([0, 0], [100, 100], nvertices)
+
+    def teardown(self, nvertices):
+        self.viewer.close()
+
+    def time_set_path_value(self, nvertices):
+        self.path_edit.value = self.vertices
+
+    def time_draw_line(self, nvertices):
+        from napari_power_widgets.replay import replay
+
+        widget = self.line_edit
+        widget.mode = "selecting"
+        layer = widget._layer
+        layer.add_lines(self.drag.positions[[0, -1]])
+        widget._force_layer_mode()
+        replay(self.drag, layer, callbacks=[widget._on_drag])
+        widget.mode = "idle"
+
+
+class PointsIndexSuite:
+    params = [10**4, 10**6]
+    param_names = ["npoints"]
+    timeout = 300
+
+    def setup(self, npoints):
+        from napari.layers import Points
+        from napari_power_widgets._widgets._points import PointsIndex
+
+        rng = np.random.default_rng(fx.SEED)
+        self.layer = Points(rng.uniform(0, 1000, size=(npoints, 2)))
+        self.index = PointsIndex.of(self.layer)
+        self.index.nearest([500, 500])
+        self.index.in_box([0, 0], [1, 1])
+
+    def time_nearest(self, npoints):
+        self.index.nearest([500, 500], max_distance=5)
+
+    def time_in_box(self, npoints):
+        self.index.in_box([400, 400], [600, 600])
+
+    def time_in_polygon(self, npoints):
+        self.index.in_polygon([[400, 400], [400, 600], [600, 500]], [500, 500])
+
+    def time_rebuild(self, npoints):
+        self.index._invalidate()
+        self.index.nearest([500, 500])
+
+
+class CameraPathSuite:
+    params = [10**6, 10**8]
+    param_names = ["nvoxels"]
+    timeout = 600
+
+    def setup(self, nvoxels):
+        from napari_power_widgets.replay import CameraPath
+        from napari_power_widgets.types import CameraState
+
+        self.viewer = fx.make_viewer()
+        self.viewer.add_labels(fx.make_labels(nvoxels))
+        n = self.viewer.dims.range[0][1]
+        start = CameraState.from_viewer(self.viewer)
+        stop = start._replace(
+            zoom=start.zoom * 4, step=(int(n) - 1,) + start.step[1:]
+        )
+        self.path = CameraPath([start, stop]).interpolate(50)
+
+    def teardown(self, nvoxels):
+        self.viewer.close()
+
+    def track_fps(self, nvoxels):
+        from napari_power_widgets.replay import replay_camera_path
+
+        return replay_camera_path(self.path, self.viewer).fps
+
+    track_fps.unit = "frames/s"
+
+
+class ConstructionSuite:
+    """
+    Construction of a FunctionGui with every type in ``types``.
+
+    Only the tables of the shape data and coordinates widgets are deferred
+    to the first show. The ``*_table_widgets`` benchmarks isolate them, so
+    the gain is the difference between construction with and without show.
+    """
+
+    def setup(self):
+        import inspect
+
+        from magicgui import use_app
+        from napari_power_widgets import types
+
+        use_app()
+        self.signature = inspect.Signature(
+            [
+                inspect.Parameter(
+                    f"x{i}",
+                    inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                    annotation=getattr(types, name),
+                )
+                for i, name in enumerate(types.__all__)
+                if hasattr(getattr(types, name), "__supertype__")
+                or name == "CameraState"
+            ]
+        )
+
+    def _function(self):
+        def f(*args, **kwargs):
+            pass
+
+        f.__signature__ = self.signature
+        return f
+
+    def time_construct(self):
+        from magicgui import magicgui
+
+        magicgui(self._function())
+
+    def time_construct_and_show(self):
+        from magicgui import magicgui
+
+        widget = magicgui(self._function())
+        widget.show()
+        widget.close()
+
+    def _table_widgets(self):
+        from napari_power_widgets import CoordinatesSelector, LineDataEdit
+
+        return [LineDataEdit(), CoordinatesSelector()]
+
+    def time_construct_table_widgets(self):
+        self._table_widgets()
+
+    def time_construct_and_show_table_widgets(self):
+        for widget in self._table_widgets():
+            widget.show()
+            widget.close()
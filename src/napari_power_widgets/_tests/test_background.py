@@ -0,0 +1,169 @@
+from concurrent.futures import CancelledError
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from magicgui import magicgui
+from magicgui.application import use_app
+from napari.components import LayerList
+from napari.layers import Image, Labels
+
+from napari_power_widgets import background
+from napari_power_widgets._widgets._cache import ValueSnapshot
+from napari_power_widgets.background import (
+    _downsample,
+    _Run,
+    is_cancelled,
+    run_in_background,
+)
+from napari_power_widgets.types import BoxSelection
+
+
+class _Viewer:
+    def __init__(self, layers: LayerList):
+        self.layers = layers
+
+
+def _wait_until(condition, timeout: float = 5.0):
+    app = use_app()
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        app.process_events()
+        time.sleep(0.01)
+
+
+def test_only_last_result_delivered():
+    started = threading.Event()
+    release = threading.Event()
+    cancelled = []
+
+    @magicgui
+    def f(x: int = 0):
+        if x == 1:
+            started.set()
+            release.wait(5)
+            cancelled.append(is_cancelled())
+        return x
+
+    runner = run_in_background(f)
+    delivered = []
+    f.called.connect(delivered.append)
+    f.x.value = 1
+    first = runner.submit()
+    assert started.wait(5)
+    f.x.value = 2  # input change cancels the running call
+    second = runner.submit()
+    release.set()
+    with pytest.raises(CancelledError):
+        first.result(timeout=5)
+    assert second.result(timeout=5) == 2
+    _wait_until(lambda: delivered)
+    assert delivered == [2]
+    assert cancelled == [True]
+    runner.shutdown()
+
+
+def test_stale_snapshot_cancelled():
+    @magicgui
+    def f(x: int = 0):
+        return x
+
+    runner = run_in_background(f)
+    layer = Labels(np.zeros((4, 4), dtype=np.uint8))
+    snapshot = ValueSnapshot(np.asarray, layer.data, layer=layer)
+    layer.data = np.ones((4, 4), dtype=np.uint8)
+    assert snapshot.is_stale()
+    with pytest.raises(CancelledError):
+        runner._work(_Run(0), {"x": snapshot})
+    runner.shutdown()
+
+
+def test_exception_surfaces():
+    @magicgui
+    def f(x: int = 0):
+        raise ValueError("failed")
+
+    runner = run_in_background(f)
+    scheduled = []
+    runner._deliver_on_main = lambda run, future, factor: scheduled.append(
+        (run, future)
+    )
+    future = runner.submit()
+    with pytest.raises(ValueError, match="failed"):
+        future.result(timeout=5)
+    _wait_until(lambda: scheduled)
+    run, future = scheduled[0]
+    with pytest.raises(ValueError, match="failed"):
+        runner._deliver(run, future)
+    runner.shutdown()
+
+
+def test_downsample():
+    arr = np.zeros((3, 10, 10))
+    assert _downsample(arr, 4).shape == (3, 3, 3)
+    assert _downsample(arr, 1) is arr
+    assert _downsample(5.0, 4) == 5.0
+
+
+def test_preview_while_dragging(monkeypatch):
+    @magicgui(auto_call=True)
+    def f(box: BoxSelection):
+        return box
+
+    f.box.value = ((0, 40), (0, 80))
+    runner = run_in_background(f, preview=4)
+    threads = []
+    preview = f.box._preview
+
+    def _preview(factor):
+        threads.append(threading.current_thread())
+        return preview(factor)
+
+    f.box._preview = _preview
+    f.box._start_drag()
+    runner._on_inputs_changed()
+    future = runner._future
+    assert tuple(map(tuple, future.result(timeout=5))) == ((0, 10), (0, 20))
+    # the preview value is taken on the main thread at submit time
+    assert threads == [threading.main_thread()]
+
+    layers = LayerList()
+    layer = Image(np.zeros((3, 8, 8)), name=f.result_name, scale=(1, 2, 2))
+    layers.append(layer)
+    monkeypatch.setattr(
+        background,
+        "find_viewer_ancestor",
+        lambda _: SimpleNamespace(layers=layers),
+    )
+    runner._deliver(runner._run, future, 4)
+    np.testing.assert_allclose(layer.scale, [1, 8, 8])
+    runner._rescale_output(1)
+    np.testing.assert_allclose(layer.scale, [1, 2, 2])
+    f.box._finish_drag(emit=False)
+    runner.shutdown()
+
+
+def test_no_preview_on_transformed_layers(monkeypatch):
+    @magicgui(auto_call=True)
+    def f(box: BoxSelection):
+        return box
+
+    f.box.value = ((0, 40), (0, 80))
+    runner = run_in_background(f, preview=4)
+    layers = LayerList()
+    layers.append(Image(np.zeros((8, 8))))
+    viewer = _Viewer(layers)
+    monkeypatch.setattr(background, "find_viewer_ancestor", lambda _: viewer)
+    assert runner._can_preview()
+    layers.append(Image(np.zeros((8, 8)), scale=(2, 2)))
+    assert not runner._can_preview()
+    f.box._start_drag()
+    runner._on_inputs_changed()
+    # world coordinates are passed as is at full resolution
+    value = runner._future.result(timeout=5)
+    assert tuple(map(tuple, value)) == ((0, 40), (0, 80))
+    f.box._finish_drag(emit=False)
+    runner.shutdown()
@@ -0,0 +1,66 @@
+import numpy as np
+
+from napari_power_widgets.batch import Recipe, run_batch
+
+
+def masked_crop(image, label, box, zrange):
+    (y0, y1), (x0, x1) = box
+    z0, z1 = zrange
+    out = np.where(label, image, 0)
+    return out[z0:z1, int(y0) : int(y1), int(x0) : int(x1)]
+
+
+def _make_recipe():
+    return Recipe(
+        f"{__name__}:masked_crop",
+        {
+            "image": {"type": "input", "name": "image"},
+            "label": {"type": "OneOfLabels", "layer": "labels", "label": 2},
+            "box": {"type": "BoxSelection", "y": [1, 3], "x": [0, 2]},
+            "zrange": {"type": "ZRange", "range": [0, 2]},
+        },
+    )
+
+
+def test_recipe_io(tmp_path):
+    recipe = _make_recipe()
+    assert recipe.inputs == {"image", "labels"}
+    path = tmp_path / "recipe.json"
+    recipe.save(path)
+    loaded = Recipe.load(path)
+    assert loaded.function == recipe.function
+    assert loaded.params == recipe.params
+
+
+def test_run_batch(tmp_path):
+    rng = np.random.default_rng(0)
+    files = []
+    for i in range(3):
+        image = rng.random((3, 4, 4))
+        labels = rng.integers(0, 3, size=(3, 4, 4))
+        files.append(tmp_path / f"{i}.npz")
+        np.savez(files[-1], image=image, labels=labels)
+    files.append(tmp_path / "missing.npz")
+
+    recipe = _make_recipe()
+    results = run_batch(recipe, files, max_workers=2)
+    assert not isinstance(results, list)
+    # results are yielded in the order of completion
+    results = sorted(results, key=lambda r: files.index(r.file))
+    assert [r.file for r in results] == files
+    assert [r.ok for r in results] == [True, True, True, False]
+    for file, result in zip(files, results[:3]):
+        with result:
+            with np.load(file) as npz:
+                expected = recipe.apply(dict(npz))
+            np.testing.assert_array_equal(result.value, expected)
+
+
+def test_resolve_some_of_points():
+    recipe = Recipe(
+        "numpy:asarray",
+        {"a": {"type": "SomeOfPoints", "layer": "points", "indices": [2, 0]}},
+    )
+    points = np.arange(10).reshape(5, 2)
+    out = recipe.apply({"points": points})
+    np.testing.assert_array_equal(out, [2, 0])
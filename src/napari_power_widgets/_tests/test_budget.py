@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from napari_power_widgets.budget import (
+    MemoryBudgetError,
+    MemoryBudgetWarning,
+    memory_budget,
+)
+from napari_power_widgets._widgets._mask import PackedMask, dense_mask
+
+
+def test_dense_mask_budget():
+    data = np.zeros((8, 32, 32), dtype=np.uint8)
+    data[2:4, 5:9, 5:9] = 1
+    expected = data == 1
+    with memory_budget(1000):
+        with pytest.raises(MemoryBudgetError, match="8.0 KB"):
+            dense_mask(data, 1)
+    with memory_budget("1KB", policy="lazy"):
+        with pytest.warns(MemoryBudgetWarning):
+            out = dense_mask(data, 1)
+        assert isinstance(out, PackedMask)
+        np.testing.assert_array_equal(np.asarray(out), expected)
+    with memory_budget(1000, policy="memmap"):
+        with pytest.warns(MemoryBudgetWarning):
+            out = dense_mask(data, 1)
+        assert isinstance(out, np.memmap)
+        np.testing.assert_array_equal(out, expected)
+    with memory_budget("1MB"):
+        assert type(dense_mask(data, 1)) is np.ndarray
+
+
+def test_invalid_budget_env(monkeypatch):
+    from napari_power_widgets._widgets._budget import _budget_from_env
+
+    monkeypatch.setenv("NAPARI_POWER_WIDGETS_MEMORY_BUDGET", "lots")
+    with pytest.warns(MemoryBudgetWarning):
+        assert _budget_from_env() is None
+    monkeypatch.setenv("NAPARI_POWER_WIDGETS_MEMORY_BUDGET", "2KB")
+    assert _budget_from_env() == 2048
@@ -0,0 +1,80 @@
+import numpy as np
+
+from napari_power_widgets._widgets._cache import LRUCache, object_token
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache["a"] = 0
+    cache["b"] = 1
+    assert cache.get("a") == 0
+    cache["c"] = 2
+    assert "b" not in cache
+    assert list(cache) == ["a", "c"]
+    assert cache.get_or_create("d", lambda: 3) == 3
+    assert list(cache) == ["c", "d"]
+
+
+def test_object_token():
+    arr = np.zeros(3)
+    token = object_token(arr)
+    assert object_token(arr) == token
+    del arr
+    assert object_token(np.zeros(3)) != token
+
+
+def test_memoize():
+    from napari_power_widgets._widgets._cache import register_value_key
+    from napari_power_widgets.cache import memoize, value_key
+
+    ncalls = 0
+
+    @memoize(maxsize=2)
+    def f(arr, n=1):
+        nonlocal ncalls
+        ncalls += 1
+        return arr.sum() * n
+
+    large = register_value_key(np.ones(10**6), ("OneOfLabels", 0, 0, 1))
+    assert value_key(large) == ("OneOfLabels", 0, 0, 1)
+    assert f(large) == f(large) == 10**6
+    assert ncalls == 1
+    # same key, different object
+    f(register_value_key(np.ones(10**6), ("OneOfLabels", 0, 0, 1)))
+    assert ncalls == 1
+    f(large, n=2)
+    assert ncalls == 2
+    # large arrays without keys are not cached
+    f(np.ones(10**6))
+    f(np.ones(10**6))
+    assert ncalls == 4
+    f(np.ones(3))
+    f(np.ones(3))
+    assert ncalls == 5
+
+
+def test_data_version_on_paint():
+    from napari.layers import Labels
+
+    from napari_power_widgets._widgets._cache import layer_key
+
+    layer = Labels(np.zeros((10, 10), dtype=np.uint8))
+    key = layer_key(layer)
+    layer.paint((5, 5), 2, refresh=False)
+    assert layer.data[5, 5] == 2
+    assert layer_key(layer) != key
+    key = layer_key(layer)
+    layer.fill((0, 0), 3, refresh=False)
+    assert layer_key(layer) != key
+
+
+def test_features_version():
+    import pandas as pd
+    from napari.layers import Points
+
+    from napari_power_widgets._widgets._cache import features_version
+
+    layer = Points(np.zeros((3, 2)), features={"a": [0, 1, 2]})
+    version = features_version(layer)
+    layer.features = pd.DataFrame({"a": [3, 4, 5]})
+    assert features_version(layer) != version
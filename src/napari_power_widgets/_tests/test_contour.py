@@ -0,0 +1,38 @@
+import numpy as np
+from skimage.draw import polygon2mask
+from skimage.measure import find_contours
+
+from napari_power_widgets._widgets._contour import label_contours
+from napari_power_widgets._widgets._mask import label_bbox
+
+
+def test_label_bbox():
+    data = np.zeros((4, 20, 30), dtype=np.uint8)
+    data[1:3, 5:9, 10:20] = 2
+    assert label_bbox(data, 2) == (slice(1, 3), slice(5, 9), slice(10, 20))
+    assert label_bbox(data, 3) is None
+
+
+def test_contours_match_full_image():
+    data = np.zeros((40, 50), dtype=np.int32)
+    data[5:15, 3:20] = 1
+    data[0:10, 40:50] = 2  # touching the image border
+    for label in [1, 2]:
+        full = find_contours(np.pad(data == label, 1).astype(float), 0.5)
+        out = label_contours(data, label)
+        assert len(out) == len(full) == 1
+        np.testing.assert_allclose(
+            np.unique(out[0], axis=0), np.unique(full[0] - 1, axis=0)
+        )
+
+
+def test_contours_nd_and_simplified():
+    data = np.zeros((3, 30, 30), dtype=np.uint8)
+    data[1, 5:25, 5:25] = 1
+    out = label_contours(data, 1, tolerance=0.5)
+    assert len(out) == 1
+    assert np.all(out[0][:, 0] == 1)
+    # a square is simplified into a few vertices around its corners
+    assert len(out[0]) < 20
+    mask = polygon2mask((30, 30), out[0][:, 1:])
+    assert abs(int(mask.sum()) - 400) < 60
@@ -0,0 +1,37 @@
+import numpy as np
+
+from napari_power_widgets._widgets._crop import LazyCrop, _Channels
+from napari_power_widgets.budget import memory_budget
+
+
+def test_lazy_crop_levels():
+    full = np.arange(4 * 64 * 64).reshape(4, 64, 64)
+    levels = [full, full[:, ::2, ::2], full[:, ::4, ::4]]
+    crop = LazyCrop(levels, [(1, 3), (8, 40), (16, 48)])
+    assert crop.shape == (2, 32, 32)
+    np.testing.assert_array_equal(np.asarray(crop), full[1:3, 8:40, 16:48])
+
+    coarse = crop.at_resolution(8)
+    assert coarse.level == 2
+    assert coarse.shape == (2, 8, 8)
+    np.testing.assert_array_equal(
+        np.asarray(coarse), levels[2][1:3, 2:10, 4:12]
+    )
+    assert crop.at_resolution(16).level == 1
+    assert crop.at_resolution(1000).level == 0
+
+
+def test_lazy_crop_rgb_over_budget():
+    rgb = np.arange(16 * 16 * 3, dtype=np.uint8).reshape(16, 16, 3)
+    crop = LazyCrop([_Channels(rgb)], [(2, 10), (3, 12)])
+    assert crop.shape == (8, 9)
+    expected = rgb[2:10, 3:12]
+    # 72 bytes without the channel axis, 216 bytes with it
+    with memory_budget(100, policy="memmap"):
+        out = crop.compute()
+    assert isinstance(out, np.memmap)
+    np.testing.assert_array_equal(out, expected)
+    with memory_budget(1000, policy="memmap"):
+        out = crop.compute()
+    assert not isinstance(out, np.memmap)
+    np.testing.assert_array_equal(out, expected)
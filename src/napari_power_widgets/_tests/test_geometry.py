@@ -0,0 +1,53 @@
+import numpy as np
+
+from napari_power_widgets._widgets._geometry import (
+    points_in_polygon,
+    polygon_mask,
+    rasterize_shapes,
+)
+
+
+def test_points_in_polygon():
+    # L-shaped polygon
+    polygon = np.array([[0, 0], [0, 4], [2, 4], [2, 2], [4, 2], [4, 0]])
+    points = np.array([[1, 1], [1, 3], [3, 1], [3, 3], [5, 5], [-1, 1]])
+    inside = points_in_polygon(points, polygon)
+    np.testing.assert_array_equal(inside, [1, 1, 1, 0, 0, 0])
+
+
+def test_polygon_mask():
+    polygon = np.array([[0, 0], [0, 4], [2, 4], [2, 2], [4, 2], [4, 0]])
+    polygon = polygon + 0.5  # no pixel center on the edges
+    mask = polygon_mask(polygon, (6, 6))
+    ys, xs = np.indices(mask.shape)
+    points = np.stack([ys.ravel(), xs.ravel()], axis=1)
+    expected = points_in_polygon(points, polygon).reshape(mask.shape)
+    np.testing.assert_array_equal(mask, expected)
+
+
+def test_rasterize_shapes():
+    data = [
+        np.array([[1, 1], [1, 3], [3, 3], [3, 1]]),
+        np.array([[0, 0], [0, 9]]),  # line is ignored
+        np.array([[2, 2], [2, 10], [10, 10], [10, 2]]),
+        np.array([[-5, -5], [-5, -1], [-1, -1], [-1, -5]]),  # out of bounds
+    ]
+    types = ["rectangle", "line", "polygon", "rectangle"]
+    labels = rasterize_shapes(data, types, (8, 8), labels=True)
+    assert labels[1, 1] == 1
+    assert labels[2, 2] == 3  # drawn on top
+    assert labels[7, 7] == 3
+    assert labels[0, 0] == 0
+    mask = rasterize_shapes(data, types, (8, 8))
+    np.testing.assert_array_equal(mask, labels > 0)
+
+
+def test_polygon_mask_fill_rule():
+    # pentagram: the center is filled only with the nonzero rule
+    t = np.pi / 2 + np.arange(5) * 4 * np.pi / 5
+    star = np.stack([10 + 8 * np.sin(t), 10 + 8 * np.cos(t)], axis=1)
+    evenodd = polygon_mask(star, (21, 21))
+    nonzero = polygon_mask(star, (21, 21), fill_rule="nonzero")
+    assert not evenodd[10, 10]
+    assert nonzero[10, 10]
+    assert np.all(nonzero[evenodd])
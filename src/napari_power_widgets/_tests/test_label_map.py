@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from napari_power_widgets._widgets._label_map import (
+    LabelSelection,
+    format_label_ids,
+    label_ids,
+    map_labels,
+    parse_label_ids,
+)
+
+
+def _area(mask):
+    return int(mask.sum())
+
+
+def _mean(crop, mask):
+    return float(crop[mask].mean())
+
+
+def _labels():
+    rng = np.random.default_rng(0)
+    data = np.zeros((60, 80), dtype=np.int32)
+    data[2:10, 5:30] = 1
+    data[20:50, 40:45] = 3
+    data[55:60, 70:80] = 7
+    image = rng.random(data.shape)
+    return data, image
+
+
+@pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+def test_map_labels_matches_loop(executor):
+    data, image = _labels()
+    expected = {i: float(image[data == i].mean()) for i in [1, 3, 7]}
+    out = map_labels(_mean, data, image=image, executor=executor)
+    assert out.keys() == expected.keys()
+    for i in expected:
+        assert out[i] == pytest.approx(expected[i])
+
+
+def test_map_labels_selection_and_table():
+    data, _ = _labels()
+    sel = LabelSelection(data, [3, 7, 5])  # 5 does not exist
+    out = sel.map(_area)
+    assert out == {3: 150, 7: 50}
+    table = map_labels(_area, sel, output="table")
+    assert list(table.index) == [3, 7]
+    assert list(table["value"]) == [150, 50]
+
+
+def test_map_labels_bool_and_padding():
+    mask = np.zeros((10, 10), dtype=bool)
+    mask[3:5, 4:8] = True
+    out = map_labels(lambda m: m.shape, mask, padding=2)
+    assert out == {1: (6, 8)}
+
+
+def test_parse_label_ids():
+    assert parse_label_ids("1-3, 7,9 ") == (1, 2, 3, 7, 9)
+    assert parse_label_ids("") == ()
+    assert format_label_ids([9, 1, 2, 3, 7]) == "1-3, 7, 9"
+    with pytest.raises(ValueError):
+        parse_label_ids("1-x")
+
+
+def test_label_ids_cached():
+    from napari.layers import Labels
+
+    data, _ = _labels()
+    layer = Labels(data)
+    ids = label_ids(layer)
+    assert ids == (1, 3, 7)
+    assert label_ids(layer) is ids
+    layer.data = np.where(data == 3, 0, data)
+    assert label_ids(layer) == (1, 7)
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from napari.layers import Image
+
+from napari_power_widgets._widgets import _lasso
+from napari_power_widgets._widgets._lasso import LassoSelector
+from napari_power_widgets.replay import MouseStream, replay
+
+
+def test_drag_lasso(monkeypatch):
+    lasso = LassoSelector()
+    monkeypatch.setattr(lasso, "_deactivate", lambda: None)
+    viewer = SimpleNamespace(
+        overlays=SimpleNamespace(interaction_box=SimpleNamespace(points=None))
+    )
+    vertices = [[0, 0], [0, 8], [8, 8], [8, 0], [0, 0]]
+    stream = MouseStream([0, 1, 1, 1, 2], vertices)
+    emitted = []
+    lasso.changed.connect(emitted.append)
+    replay(stream, viewer, callbacks=[lasso._on_drag])
+    np.testing.assert_array_equal(
+        viewer.overlays.interaction_box.points, [[0, 0], [8, 8]]
+    )
+    assert len(emitted) == 1
+    # no target layer: the polygon is in world coordinates. The release
+    # position is not appended.
+    np.testing.assert_array_equal(lasso.value.polygon, vertices[:-1])
+    with pytest.raises(ValueError):
+        lasso._recipe()
+
+
+def test_to_data_on_current_slice(monkeypatch):
+    # rotation in the (z, y) plane mixes the leading axis into the plane
+    affine = np.eye(4)
+    c, s = np.cos(np.pi / 6), np.sin(np.pi / 6)
+    affine[:2, :2] = [[c, -s], [s, c]]
+    layer = Image(np.zeros((4, 10, 10)), affine=affine)
+    point = (2.0, 5.0, 5.0)
+    monkeypatch.setattr(
+        _lasso,
+        "find_viewer_ancestor",
+        lambda _: SimpleNamespace(dims=SimpleNamespace(point=point)),
+    )
+    lasso = LassoSelector()
+    world = np.array([[1.0, 2.0], [3.0, 4.0]])
+    expected = [
+        layer._data_to_world.inverse([point[0], *p])[-2:] for p in world
+    ]
+    np.testing.assert_allclose(lasso._to_data(layer, world), expected)
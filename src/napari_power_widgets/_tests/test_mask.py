@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from napari_power_widgets._widgets import _mask
+from napari_power_widgets._widgets._mask import PackedMask, RunLengthMask
+
+
+@pytest.mark.parametrize("slab_size", [7, 64, 1 << 22])
+@pytest.mark.parametrize("cls", [PackedMask, RunLengthMask])
+def test_encode_decode(cls, slab_size, monkeypatch):
+    monkeypatch.setattr(_mask, "_SLAB_SIZE", slab_size)
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 3, size=(5, 6, 7))
+    data[:, :, 0] = 0
+    for label in [1, 2, 9]:
+        mask = cls.from_labels(data, label)
+        assert mask.shape == data.shape
+        np.testing.assert_array_equal(np.asarray(mask), data == label)
+
+
+def test_packed_bbox():
+    data = np.zeros((10, 20), dtype=np.uint8)
+    data[2:5, 3:9] = 1
+    mask = PackedMask.from_labels(data, 1)
+    assert mask.bbox == (slice(2, 5), slice(3, 9))
+    assert mask.crop().all()
+    assert mask.nbytes == 3
@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+from napari_power_widgets._widgets._mouse import MouseInteractivityMixin
+
+
+def _callback(layer, event):
+    yield
+
+
+def test_freeze_layers_stashes_callbacks():
+    layer = SimpleNamespace(
+        interactive=True,
+        mode="add_rectangle",
+        mouse_drag_callbacks=[_callback],
+        mouse_move_callbacks=[],
+        mouse_double_click_callbacks=[],
+    )
+    viewer = SimpleNamespace(layers=SimpleNamespace(selection=[layer]))
+    original = layer.mouse_drag_callbacks
+
+    mixin = MouseInteractivityMixin()
+    mixin._freeze_layers(viewer)
+    assert not layer.interactive
+    assert layer.mode == "add_rectangle"
+    assert list(layer.mouse_drag_callbacks) == []
+    assert _callback in layer.mouse_drag_callbacks
+
+    # mode changes during selection are forwarded to the original list
+    layer.mouse_drag_callbacks.remove(_callback)
+    layer.mouse_move_callbacks.append(_callback)
+
+    mixin._unfreeze_layers()
+    assert layer.interactive
+    assert layer.mouse_drag_callbacks is original
+    assert original == []
+    assert layer.mouse_move_callbacks == [_callback]
+
+
+def test_drag_flag():
+    emitted = []
+    mixin = MouseInteractivityMixin()
+    mixin.value = 1
+    mixin.changed = SimpleNamespace(emit=emitted.append)
+    assert not mixin.dragging
+    mixin._start_drag()
+    assert mixin.dragging
+    mixin._finish_drag()
+    assert not mixin.dragging
+    assert emitted == [1]
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+import napari_power_widgets as NpW
+from napari_power_widgets import perf
+from napari_power_widgets._widgets._mouse import MouseInteractivityMixin
+
+
+def test_instrumentation_restores_methods():
+    original = NpW.BoxSelector.__dict__["value"]
+    with perf.instrumented():
+        assert perf.is_enabled()
+        assert NpW.BoxSelector.__dict__["value"] is not original
+    assert not perf.is_enabled()
+    assert NpW.BoxSelector.__dict__["value"] is original
+    assert "reset_choices" not in NpW.ShapeSelect.__dict__
+
+
+def test_latency_recorded():
+    perf.reset()
+    with perf.instrumented():
+        widget = NpW.BoxSelector()
+        widget.value = ((0, 1), (2, 3))
+    summary = perf.stats()
+    assert summary["BoxSelector.changed"]["count"] > 0
+    assert summary["BoxSelector.value"]["count"] > 0
+    assert json.loads(perf.to_json()).keys() == summary.keys()
+    trace = json.loads(perf.to_chrome_trace())
+    assert len(trace["traceEvents"]) > 0
+    perf.reset()
+    assert perf.stats() == {}
+
+
+class _Selector(MouseInteractivityMixin):
+    _mode = None
+
+    def _activate(self):
+        pass
+
+    def _deactivate(self):
+        pass
+
+
+def test_no_toggle_while_selecting():
+    widget = _Selector()
+    widget.mode = "selecting"
+    with pytest.raises(RuntimeError):
+        perf.enable()
+    assert not perf.is_enabled()
+    widget.mode = "idle"
+    with perf.instrumented():
+        widget.mode = "selecting"
+        with pytest.raises(RuntimeError):
+            perf.disable()
+        widget.mode = "idle"
+    assert not perf.is_enabled()
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from napari_power_widgets.projection import project_z
+
+
+@pytest.mark.parametrize("method", ["max", "min", "sum", "mean"])
+@pytest.mark.parametrize("max_workers", [None, 3])
+def test_project_z(method, max_workers):
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 100, size=(2, 10, 4, 5), dtype=np.uint8)
+    out = project_z(
+        data, (2, 8), method, chunk_size=2, max_workers=max_workers
+    )
+    expected = getattr(np, method)(data[:, 2:9], axis=1)
+    np.testing.assert_allclose(out, expected)
+    assert out.shape == (2, 4, 5)
+
+
+def test_project_z_memmap(tmp_path):
+    data = np.lib.format.open_memmap(
+        tmp_path / "x.npy", mode="w+", dtype=np.float32, shape=(6, 3, 3)
+    )
+    data[:] = np.arange(6)[:, None, None]
+    np.testing.assert_array_equal(project_z(data, (1, 3), "max"), 3)
+
+
+def test_project_z_invalid_axis():
+    with pytest.raises(ValueError):
+        project_z(np.zeros((5, 5)), (0, 2))
+    with pytest.raises(ValueError):
+        project_z(np.zeros((3, 5, 5)), (0, 2), axis=3)
@@ -0,0 +1,31 @@
+import numpy as np
+from napari.components import LayerList
+from napari.layers import Image, Labels
+
+from napari_power_widgets._widgets._registry import LayerRegistry
+
+
+def test_layer_registry():
+    layers = LayerList()
+    registry = LayerRegistry(layers)
+    img = Image(np.zeros((4, 4)))
+    layers.append(img)
+    assert registry.layers("Image") == [img]
+    assert registry.layers("Labels") == []
+    v_image = registry.version("Image")
+    v_labels = registry.version("Labels")
+
+    # inserting a Labels layer does not invalidate the Image list
+    lbl = Labels(np.zeros((4, 4), dtype=np.uint8))
+    layers.append(lbl)
+    assert registry.version("Image") == v_image
+    assert registry.version("Labels") == v_labels + 1
+    assert registry.layers("Labels") == [lbl]
+    assert registry.layers("Image", "Labels") == [img, lbl]
+
+    layers.move(1, 0)
+    assert registry.layers("Image", "Labels") == [lbl, img]
+
+    layers.remove(img)
+    assert registry.version("Image") == v_image + 2
+    assert registry.layers("Image") == []
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from napari_power_widgets.replay import MouseStream, replay
+
+
+class _Target:
+    def __init__(self):
+        self.mouse_drag_callbacks = [self._on_drag]
+        self.positions = []
+
+    def _on_drag(self, obj, event):
+        self.positions.append(event.position)
+        yield
+        while event.type == "mouse_move":
+            self.positions.append(event.position)
+            yield
+        self.positions.append(event.position)
+
+
+def test_save_and_load(tmp_path):
+    stream = MouseStream.drag([0, 0, 0], [0, 10, 20], 50, modifiers=["Shift"])
+    stream.save(tmp_path / "stream.npz")
+    loaded = MouseStream.load(tmp_path / "stream.npz")
+    assert len(loaded) == 50
+    np.testing.assert_array_equal(loaded.positions, stream.positions)
+    np.testing.assert_array_equal(loaded.modifiers, stream.modifiers)
+    np.testing.assert_array_equal(loaded.dims_displayed, [1, 2])
+
+
+def test_replay():
+    target = _Target()
+    stream = MouseStream.drag([0, 0], [10, 10], 100)
+    stream = stream.concat(MouseStream.click([3, 4]))
+    result = replay(stream, target)
+    assert len(target.positions) == 102
+    np.testing.assert_array_equal(target.positions[-1], [3, 4])
+    assert result.latencies.shape == (102,)
+    assert result.summary()["nevents"] == 102
+
+
+def test_camera_path(tmp_path):
+    from napari_power_widgets.replay import CameraPath
+    from napari_power_widgets.types import CameraState
+
+    path = CameraPath(
+        [
+            CameraState(1.0, (0.0, 0.0, 0.0), (0.0, 0.0, 90.0), (0, 0, 0)),
+            CameraState(4.0, (0.0, 10.0, 20.0), (0.0, 0.0, 90.0), (10, 0, 0)),
+        ]
+    )
+    interpolated = path.interpolate(3)
+    assert len(interpolated) == 3
+    assert interpolated[1].zoom == pytest.approx(2.0)
+    assert interpolated[1].center == (0.0, 5.0, 10.0)
+    assert interpolated[1].step == (5, 0, 0)
+    interpolated.save(tmp_path / "path.npz")
+    assert CameraPath.load(tmp_path / "path.npz").states == interpolated.states
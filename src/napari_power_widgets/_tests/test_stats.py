@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from napari_power_widgets._widgets._stats import IntegralImage
+
+
+@pytest.mark.parametrize(
+    ["y", "x"],
+    [
+        ((0, 19), (0, 29)),
+        ((2.5, 10.2), (3, 17)),
+        ((15, 4), (28.9, -5)),
+    ],
+)
+def test_integral_image(y, x):
+    rng = np.random.default_rng(0)
+    plane = rng.normal(1000, 3, size=(20, 30)).astype(np.float32)
+    table = IntegralImage(plane)
+    y0, y1 = sorted(y)
+    x0, x1 = sorted(x)
+    ys = slice(max(int(np.ceil(y0)), 0), int(np.floor(y1)) + 1)
+    xs = slice(max(int(np.ceil(x0)), 0), int(np.floor(x1)) + 1)
+    crop = plane[ys, xs].astype(np.float64)
+    stats = table.stats(y, x)
+    assert stats.count == crop.size
+    assert stats.sum == pytest.approx(crop.sum())
+    assert stats.mean == pytest.approx(crop.mean())
+    assert stats.var == pytest.approx(crop.var(), rel=1e-6)
+
+
+def test_empty_box():
+    table = IntegralImage(np.ones((5, 5)))
+    stats = table.stats((10, 20), (0, 4))
+    assert stats.count == 0
+    assert np.isnan(stats.mean)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from napari_power_widgets._widgets._tiles import TiledBox
+
+
+def test_tiles_cover_box():
+    box = TiledBox((3.5, 50), (0, 37.2), tile_size=16, overlap=4)
+    assert box.shape == (47, 38)
+    assert box.grid_shape == (3, 3)
+    covered = np.zeros((60, 60), dtype=int)
+    tiles = list(box)
+    assert len(tiles) == len(box) == 9
+    for tile in tiles:
+        covered[tile.write] += 1
+        ry, rx = tile.read
+        wy, wx = tile.write
+        assert ry.start == max(wy.start - 4, 0)
+        assert rx.stop == wx.stop + 4
+    assert np.all(covered[box.slices] == 1)
+    assert covered.sum() == 47 * 38
+
+
+@pytest.mark.parametrize("max_workers", [None, 3])
+def test_map_matches_whole(max_workers):
+    rng = np.random.default_rng(0)
+    data = rng.random((2, 70, 90))
+
+    def func(arr):
+        # a 3x3 box filter along the last two axes needs a halo of 1
+        out = np.zeros_like(arr)
+        pad = np.pad(arr, [(0, 0), (1, 1), (1, 1)], mode="edge")
+        for dy in range(3):
+            for dx in range(3):
+                out += pad[:, dy : dy + arr.shape[1], dx : dx + arr.shape[2]]
+        return out / 9
+
+    box = TiledBox((5, 65), (10, 90), tile_size=17, overlap=1)
+    out = box.map(func, data, max_workers=max_workers)
+    expected = func(data)[:, 5:65, 10:90]
+    np.testing.assert_allclose(out, expected)
@@ -0,0 +1,48 @@
+import numpy as np
+from napari.layers import Image, Shapes
+
+from napari_power_widgets._widgets._transform import (
+    data_to_data,
+    world_to_data,
+    world_to_data_matrix,
+)
+
+
+def test_world_to_data_matches_layer_transform():
+    layer = Image(
+        np.zeros((4, 10, 10)), scale=(2, 0.5, 0.25), translate=(1, 3, -2)
+    )
+    layer.rotate = 30
+    world = np.random.default_rng(0).random((20, 3)) * 10
+    expected = np.asarray(layer._data_to_world.inverse(world))
+    np.testing.assert_allclose(world_to_data(layer, world), expected)
+
+    # 2D coordinates on the plane of the leading coordinate
+    leading = world[:, :1]
+    expected_2d = [layer._data_to_world.inverse(p)[-2:] for p in world]
+    out = [
+        world_to_data(layer, p[1:], leading=lead)
+        for p, lead in zip(world, leading)
+    ]
+    np.testing.assert_allclose(out, expected_2d)
+
+
+def test_matrix_cache_invalidated():
+    layer = Image(np.zeros((10, 10)), scale=(2, 2))
+    mat = world_to_data_matrix(layer)
+    assert world_to_data_matrix(layer) is mat
+    layer.scale = (4, 4)
+    assert world_to_data_matrix(layer) is not mat
+    np.testing.assert_allclose(world_to_data(layer, [[8.0, 4.0]]), [[2, 1]])
+
+
+def test_data_to_data():
+    shapes = Shapes(
+        [np.array([[0, 0], [0, 4], [4, 4]])],
+        shape_type="polygon",
+        scale=(2, 2),
+    )
+    image = Image(np.zeros((10, 10)), scale=(0.5, 0.5), translate=(1, 1))
+    out = data_to_data(shapes, image, shapes.data[0])
+    expected = np.array([[0, 0], [0, 16], [16, 16]]) - 2
+    np.testing.assert_allclose(out, expected)
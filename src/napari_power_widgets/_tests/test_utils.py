@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from napari_power_widgets._widgets._utils import GrowableArray
+
+
+def test_growable_array():
+    arr = GrowableArray(2, capacity=2)
+    arr.append([0, 1])
+    first = arr.view()
+    for i in range(1, 10):
+        arr.append([i, i + 1])
+    assert len(arr) == 10
+    assert arr.capacity == 16
+    np.testing.assert_array_equal(arr.view()[:, 0], np.arange(10))
+    np.testing.assert_array_equal(first, [[0, 1]])
+    assert not arr.view().flags.writeable
+    with pytest.raises(ValueError):
+        arr.append([0, 1, 2])
+    before = arr.view()
+    arr.clear()
+    arr.append([0, 1, 2])
+    assert arr.view().shape == (1, 3)
+    arr.clear()
+    arr.append([5, 5])
+    # views taken before clear are not overwritten
+    np.testing.assert_array_equal(before[:, 0], np.arange(10))
+
+
+def test_lazy_table():
+    from napari_power_widgets import LineDataEdit
+    from napari_power_widgets._widgets._utils import LazyTable
+
+    table = LazyTable(np.zeros((0, 2)), columns=["Y", "X"])
+    assert not table.built
+    emitted = []
+    table.changed.connect(emitted.append)
+    table.set_data(np.ones((3, 2)))
+    assert len(emitted) == 1
+    data = np.asarray(table.table.data.to_list())
+    np.testing.assert_array_equal(data, np.ones((3, 2)))
+    assert table.built
+
+    widget = LineDataEdit()
+    assert not widget._table.built
+    widget.value = [[0, 1], [2, 3]]
+    widget.show()
+    assert widget._table.built
+    data = np.asarray(widget._table.table.data.to_list())
+    np.testing.assert_array_equal(data, [[0, 1], [2, 3]])
+    widget.close()
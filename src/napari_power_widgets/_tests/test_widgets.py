@@ -11,9 +11,13 @@ from napari_power_widgets import types as NpT
         NpW.BoxSelector,
         NpW.ShapeComboBox,
         NpW.ShapeSelect,
+        NpW.ShapesMaskSelect,
         NpW.ColumnChoice,
         NpW.CoordinateSelector,
+        NpW.CoordinatesSelector,
         NpW.LabelComboBox,
+        NpW.PointComboBox,
+        NpW.PointSelect,
         NpW.LineDataEdit,
         NpW.PolygonDataEdit,
         NpW.RectangleDataEdit,
@@ -21,6 +25,14 @@ from napari_power_widgets import types as NpT
         NpW.EllipseDataEdit,
         NpW.ZStepSpinBox,
         NpW.ZRangeEdit,
+        NpW.CameraStateEdit,
+        NpW.ImageCropEdit,
+        NpW.ZProjectionEdit,
+        NpW.LassoSelector,
+        NpW.TiledBoxSelector,
+        NpW.BoxStatisticsEdit,
+        NpW.LabelContourEdit,
+        NpW.LabelSelect,
     ],
 )
 def test_magicgui_construction(widget_cls):
@@ -33,6 +45,8 @@ def test_magicgui_construction(widget_cls):
     ["tp", "widget_cls"],
     [
         (NpT.BoxSelection, NpW.BoxSelector),
+        (NpT.TiledBoxSelection, NpW.TiledBoxSelector),
+        (NpT.BoxStatistics, NpW.BoxStatisticsEdit),
         (NpT.OneOfShapes, NpW.ShapeComboBox),
         (NpT.OneOfLines, NpW.ShapeComboBox),
         (NpT.OneOfRectangles, NpW.ShapeComboBox),
@@ -45,7 +59,12 @@ def test_magicgui_construction(widget_cls):
         (NpT.SomeOfEllipses, NpW.ShapeSelect),
         (NpT.SomeOfPaths, NpW.ShapeSelect),
         (NpT.SomeOfPolygons, NpW.ShapeSelect),
+        (NpT.ShapesMask, NpW.ShapesMaskSelect),
         (NpT.OneOfLabels, NpW.LabelComboBox),
+        (NpT.LabelContour, NpW.LabelContourEdit),
+        (NpT.SomeOfLabels, NpW.LabelSelect),
+        (NpT.OneOfPoints, NpW.PointComboBox),
+        (NpT.SomeOfPoints, NpW.PointSelect),
         (NpT.FeatureColumn, NpW.ColumnChoice),
         (NpT.LineData, NpW.LineDataEdit),
         (NpT.PolygonData, NpW.PolygonDataEdit),
@@ -54,6 +73,15 @@ def test_magicgui_construction(widget_cls):
         (NpT.ZStep, NpW.ZStepSpinBox),
         (NpT.ZRange, NpW.ZRangeEdit),
         (NpT.Coordinate, NpW.CoordinateSelector),
+        (NpT.Coordinates, NpW.CoordinatesSelector),
+        (NpT.CameraState, NpW.CameraStateEdit),
+        (NpT.ImageCrop, NpW.ImageCropEdit),
+        (NpT.ZProjection, NpW.ZProjectionEdit),
+        (NpT.LassoSelection, NpW.LassoSelector),
+        (NpT.OneOfShapesInLayer, NpW.InLayerEdit),
+        (NpT.CoordinateInLayer, NpW.InLayerEdit),
+        (NpT.LineDataInLayer, NpW.InLayerEdit),
+        (NpT.PolygonDataInLayer, NpW.InLayerEdit),
     ],
 )
 def test_magicgui_construction_with_type(tp, widget_cls):
@@ -62,3 +90,31 @@ def test_magicgui_construction_with_type(tp, widget_cls):
         return x
 
     assert type(f.x) is widget_cls
+
+
+def test_point_select_lasso(monkeypatch):
+    from types import SimpleNamespace
+
+    import numpy as np
+    from napari.layers import Points
+
+    from napari_power_widgets.replay import MouseStream, replay
+
+    layer = Points([[1, 1], [1, 3], [3, 1], [3, 3], [5, 5]])
+    widget = NpW.PointSelect()
+    monkeypatch.setattr(widget, "_deactivate", lambda: None)
+    monkeypatch.setattr(
+        type(widget), "points_layer", property(lambda self: layer)
+    )
+    viewer = SimpleNamespace(
+        overlays=SimpleNamespace(interaction_box=SimpleNamespace(points=None))
+    )
+    # L-shaped lasso excludes (3, 3) though it is in the bounding box
+    vertices = [[0, 0], [0, 4], [2, 4], [2, 2], [4, 2], [4, 0], [0, 0]]
+    mods = np.full(len(vertices), 4, dtype=np.uint8)  # Alt
+    stream = MouseStream([0, 1, 1, 1, 1, 1, 2], vertices, modifiers=mods)
+    replay(stream, viewer, callbacks=[widget._on_drag])
+    np.testing.assert_array_equal(
+        viewer.overlays.interaction_box.points, [[0, 0], [4, 4]]
+    )
+    np.testing.assert_array_equal(widget.value, [0, 1, 2])
@@ -1,7 +1,8 @@
-from ._coordinate import BoxSelector, CoordinateSelector
+from ._coordinate import BoxSelector, CoordinateSelector, CoordinatesSelector
 from ._features import ColumnChoice
-from ._shapes import ShapeComboBox, ShapeSelect
+from ._shapes import ShapeComboBox, ShapeSelect, ShapesMaskSelect
 from ._labels import LabelComboBox
+from ._points import PointComboBox, PointSelect
 from ._temp_shape import (
     LineDataEdit,
     PolygonDataEdit,
@@ -10,14 +11,27 @@ from ._temp_shape import (
     EllipseDataEdit,
 )
 from ._multidim import ZStepSpinBox, ZRangeEdit
+from ._camera import CameraStateEdit
+from ._crop import ImageCropEdit
+from ._projection import ZProjectionEdit
+from ._lasso import LassoSelector
+from ._transform import InLayerEdit
+from ._tiles import TiledBoxSelector
+from ._stats import BoxStatisticsEdit
+from ._contour import LabelContourEdit
+from ._label_map import LabelSelect
 
 __all__ = [
     "BoxSelector",
     "ColumnChoice",
     "ShapeComboBox",
     "ShapeSelect",
+    "ShapesMaskSelect",
     "LabelComboBox",
+    "PointComboBox",
+    "PointSelect",
     "CoordinateSelector",
+    "CoordinatesSelector",
     "LineDataEdit",
     "PolygonDataEdit",
     "RectangleDataEdit",
@@ -25,4 +39,13 @@ __all__ = [
     "PathDataEdit",
     "ZStepSpinBox",
     "ZRangeEdit",
+    "CameraStateEdit",
+    "ImageCropEdit",
+    "ZProjectionEdit",
+    "LassoSelector",
+    "InLayerEdit",
+    "TiledBoxSelector",
+    "BoxStatisticsEdit",
+    "LabelContourEdit",
+    "LabelSelect",
 ]
@@ -0,0 +1,189 @@
+"""Per-process memory budget of the array-returning widget values."""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from enum import Enum
+import os
+import re
+import tempfile
+from typing import Iterator, NamedTuple
+import warnings
+
+import numpy as np
+
+_ENV_BUDGET = "NAPARI_POWER_WIDGETS_MEMORY_BUDGET"
+_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+class BudgetPolicy(Enum):
+    """What to do when a value exceeds the memory budget."""
+
+    raise_ = "raise"  # raise MemoryBudgetError before allocating
+    lazy = "lazy"  # lazy or cropped results, memmap if not available
+    memmap = "memmap"  # memmap-backed arrays in a temporary directory
+
+
+class MemoryBudgetError(MemoryError):
+    """Raised before allocating an array that exceeds the memory budget."""
+
+
+class MemoryBudgetWarning(UserWarning):
+    """Warned when a value falls back to a lazy or memmap-backed result."""
+
+
+class _Budget(NamedTuple):
+    nbytes: int | None
+    policy: BudgetPolicy
+    tempdir: str | None
+
+
+def parse_nbytes(size: int | str | None) -> int | None:
+    """Parse a size such as 1024, "512M" or "4GB" into bytes."""
+    if size is None:
+        return None
+    if isinstance(size, (int, float, np.number)):
+        return int(size)
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([KMGT]?)i?B?\s*", size.upper())
+    if match is None:
+        raise ValueError(f"Invalid size {size!r}.")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def format_nbytes(nbytes: int) -> str:
+    """Format bytes into a human-readable string."""
+    if nbytes < 1024:
+        return f"{nbytes} B"
+    size = nbytes / 1024
+    for unit in ["KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def _budget_from_env() -> int | None:
+    """The budget set by the environment variable, None if invalid."""
+    try:
+        return parse_nbytes(os.environ.get(_ENV_BUDGET))
+    except ValueError as e:
+        # never fail the import of the plugin
+        warnings.warn(
+            f"{_ENV_BUDGET} is ignored: {e}", MemoryBudgetWarning, stacklevel=2
+        )
+        return None
+
+
+_budget = _Budget(_budget_from_env(), BudgetPolicy.raise_, None)
+
+
+def set_memory_budget(
+    nbytes: int | str | None,
+    policy: BudgetPolicy | str = "raise",
+    tempdir: str | None = None,
+) -> None:
+    """
+    Set the memory budget of a single widget value in this process.
+
+    Parameters
+    ----------
+    nbytes : int, str or None
+        Maximum bytes of an array allocated by a value getter, such as 1e9 or
+        "4GB". None for no limit. The default is read from the environment
+        variable ``NAPARI_POWER_WIDGETS_MEMORY_BUDGET``.
+    policy : "raise", "lazy" or "memmap", default is "raise"
+        What to do when a value exceeds the budget. "raise" raises a
+        ``MemoryBudgetError`` before allocating. "lazy" returns a lazy or
+        cropped result if the type has one (e.g. ``PackedMask`` for
+        ``OneOfLabels``) and a memmap-backed array otherwise. "memmap" always
+        returns a memmap-backed array.
+    tempdir : str, optional
+        Directory of the memmap files. The system temporary directory by
+        default.
+    """
+    global _budget
+    _budget = _Budget(parse_nbytes(nbytes), BudgetPolicy(policy), tempdir)
+    return None
+
+
+def get_memory_budget() -> _Budget:
+    """Return the current (nbytes, policy, tempdir)."""
+    return _budget
+
+
+@contextmanager
+def memory_budget(
+    nbytes: int | str | None,
+    policy: BudgetPolicy | str = "raise",
+    tempdir: str | None = None,
+) -> Iterator[None]:
+    """Temporarily set the memory budget."""
+    old = _budget
+    set_memory_budget(nbytes, policy, tempdir)
+    try:
+        yield
+    finally:
+        set_memory_budget(*old)
+
+
+def estimate_nbytes(shape: tuple[int, ...], dtype) -> int:
+    """Estimated bytes of an array."""
+    return int(np.prod(shape, dtype=np.float64)) * np.dtype(dtype).itemsize
+
+
+def check_budget(
+    shape: tuple[int, ...], dtype, what: str = "value"
+) -> BudgetPolicy | None:
+    """
+    Check the estimated size of an array against the budget.
+
+    Returns None if the array fits in the budget, or the policy to apply.
+    Raises ``MemoryBudgetError`` if the policy is "raise".
+    """
+    nbytes, policy, _ = _budget
+    if nbytes is None:
+        return None
+    size = estimate_nbytes(shape, dtype)
+    if size <= nbytes:
+        return None
+    msg = (
+        f"{what} of shape {tuple(shape)} and dtype {np.dtype(dtype)} needs "
+        f"{format_nbytes(size)}, which exceeds the memory budget of "
+        f"{format_nbytes(nbytes)}"
+    )
+    if policy is BudgetPolicy.raise_:
+        raise MemoryBudgetError(
+            f"{msg}. Select a smaller region or raise the budget by "
+            "`napari_power_widgets.budget.set_memory_budget`."
+        )
+    warnings.warn(
+        f"{msg}. Falling back to the {policy.value!r} policy.",
+        MemoryBudgetWarning,
+        stacklevel=3,
+    )
+    return policy
+
+
+def memmap_zeros(shape: tuple[int, ...], dtype) -> np.memmap:
+    """A zero-filled array backed by an anonymous temporary file."""
+    fd, path = tempfile.mkstemp(suffix=".dat", dir=_budget.tempdir)
+    os.close(fd)
+    out = np.memmap(path, dtype=dtype, mode="w+", shape=tuple(shape))
+    try:
+        # the mapping stays valid after the file is unlinked on POSIX
+        os.unlink(path)
+    except OSError:
+        pass
+    return out
+
+
+def zeros(shape: tuple[int, ...], dtype, what: str = "value") -> np.ndarray:
+    """
+    A zero-filled array that respects the memory budget.
+
+    A memmap-backed array is returned if the array exceeds the budget and the
+    policy is not "raise".
+    """
+    if check_budget(shape, dtype, what) is None:
+        return np.zeros(shape, dtype=dtype)
+    return memmap_zeros(shape, dtype)
@@ -25,9 +25,7 @@ class ButtonedValueWidget(Container):
 
         # Emit the value
         self._inner_value_widget.changed.disconnect()
-        self._inner_value_widget.changed.connect(
-            lambda: self.changed.emit(self.value)
-        )
+        self._inner_value_widget.changed.connect(self._emit_changed)
 
         # Button clicked event
         self._btn.changed.disconnect()
@@ -52,5 +50,8 @@ class ButtonedValueWidget(Container):
         """Set value"""
         self._inner_value_widget.value = value
 
+    def _emit_changed(self, *_):
+        self.changed.emit(self.value)
+
     def _on_button_clicked(self):
         pass
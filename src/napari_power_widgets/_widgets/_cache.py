@@ -0,0 +1,236 @@
+"""Caching utilities shared by the widgets."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Callable, Hashable, Iterator
+import weakref
+
+import numpy as np
+
+_NOT_FOUND = object()
+
+
+class LRUCache:
+    """A dict-like cache that evicts the least recently used item."""
+
+    def __init__(self, maxsize: int = 16):
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive.")
+        self._maxsize = maxsize
+        self._dict: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(size={len(self)}, "
+            f"maxsize={self.maxsize})"
+        )
+
+    @property
+    def maxsize(self) -> int:
+        """Maximum number of items."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int):
+        if value < 1:
+            raise ValueError("maxsize must be positive.")
+        self._maxsize = value
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._dict)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._dict
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._dict))
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get an item and mark it as the most recently used one."""
+        if (out := self._dict.get(key, _NOT_FOUND)) is _NOT_FOUND:
+            return default
+        self._dict.move_to_end(key)
+        return out
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._dict[key] = value
+        self._dict.move_to_end(key)
+        self._evict()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Get an item, or create it by ``factory()`` if not found."""
+        if (out := self.get(key, _NOT_FOUND)) is _NOT_FOUND:
+            out = self[key] = factory()
+        return out
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove an item."""
+        return self._dict.pop(key, default)
+
+    def clear(self) -> None:
+        """Remove all the items."""
+        self._dict.clear()
+
+    def _evict(self) -> None:
+        while len(self._dict) > self._maxsize:
+            self._dict.popitem(last=False)
+
+
+_token_counter = count()
+_tokens: dict[int, tuple[weakref.ReferenceType, int]] = {}
+
+
+def object_token(obj: Any) -> int:
+    """
+    Return a token that uniquely identifies a living object.
+
+    Unlike ``id``, a token is never reused after the object is deleted, so it
+    can safely be used as a part of a cache key. ``obj`` must support weak
+    references, but it does not need to be hashable.
+    """
+    _id = id(obj)
+    if (item := _tokens.get(_id)) is not None and item[0]() is obj:
+        return item[1]
+
+    def _remove(_, _id=_id):
+        _tokens.pop(_id, None)
+
+    token = next(_token_counter)
+    _tokens[_id] = (weakref.ref(obj, _remove), token)
+    return token
+
+
+class _VersionCounter:
+    def __init__(self):
+        self.version = 0
+
+    def __call__(self, *_):
+        self.version += 1
+
+
+_versions: weakref.WeakKeyDictionary[
+    Any, _VersionCounter
+] = weakref.WeakKeyDictionary()
+
+
+def data_version(layer) -> int:
+    """
+    Return the version of the layer data.
+
+    The version is incremented every time ``layer.events.data`` is emitted,
+    or ``layer.events.paint`` for the in-place painting and filling of a
+    Labels layer. Other in-place modification of the data array is not
+    detected.
+    """
+    if (counter := _versions.get(layer)) is None:
+        counter = _versions[layer] = _VersionCounter()
+        layer.events.data.connect(counter)
+        if hasattr(layer.events, "paint"):
+            layer.events.paint.connect(counter)
+    return counter.version
+
+
+_feature_versions: weakref.WeakKeyDictionary[
+    Any, _VersionCounter
+] = weakref.WeakKeyDictionary()
+
+
+def features_version(layer) -> int:
+    """
+    Return the version of the layer features.
+
+    The version is incremented every time ``layer.events.features`` or
+    ``layer.events.properties`` is emitted, such as when the features are
+    set. In-place modification of the features table is not detected.
+    """
+    if (counter := _feature_versions.get(layer)) is None:
+        counter = _feature_versions[layer] = _VersionCounter()
+        for name in ("features", "properties"):
+            if hasattr(layer.events, name):
+                getattr(layer.events, name).connect(counter)
+    return counter.version
+
+
+def layer_key(layer) -> tuple[int, int]:
+    """A cache key of the current state of the layer data."""
+    return object_token(layer), data_version(layer)
+
+
+_value_keys: dict[int, tuple[weakref.ReferenceType, Hashable]] = {}
+
+
+def register_value_key(obj: Any, key: Hashable) -> Any:
+    """
+    Attach a versioned key to a widget value and return the value.
+
+    The key identifies the source of the value, such as (layer token, data
+    version, selection). ``obj`` must support weak references.
+    """
+    _id = id(obj)
+
+    def _remove(_, _id=_id):
+        _value_keys.pop(_id, None)
+
+    _value_keys[_id] = (weakref.ref(obj, _remove), key)
+    return obj
+
+
+def value_key(obj: Any) -> Hashable | None:
+    """Return the key attached to a widget value, or None."""
+    if (item := _value_keys.get(id(obj))) is not None and item[0]() is obj:
+        return item[1]
+    return None
+
+
+class ValueList(list):
+    """A list that can carry a value key."""
+
+
+def readonly(arr):
+    """Return a read-only view of a numpy array (other arrays as is)."""
+    if isinstance(arr, np.ndarray):
+        arr = arr.view()
+        arr.flags.writeable = False
+    return arr
+
+
+class ValueSnapshot:
+    """
+    A lazily evaluated value of a widget.
+
+    A snapshot keeps references to the inputs (not copies) and the data
+    version of the source layer. The value is computed by ``resolve`` later,
+    possibly in another thread.
+    """
+
+    def __init__(self, func: Callable, *args, layer=None):
+        self._func = func
+        self._args = args
+        self._layer_ref = None if layer is None else weakref.ref(layer)
+        self._key = None if layer is None else layer_key(layer)
+
+    @classmethod
+    def constant(cls, value: Any) -> ValueSnapshot:
+        """A snapshot of an already evaluated value."""
+        return cls(lambda: value)
+
+    def is_stale(self) -> bool:
+        """True if the source layer has been deleted or its data changed."""
+        if self._layer_ref is None:
+            return False
+        layer = self._layer_ref()
+        return layer is None or layer_key(layer) != self._key
+
+    def resolve(self) -> Any:
+        """Evaluate the value."""
+        return self._func(*self._args)
+
+
+def snapshot_value(widget) -> ValueSnapshot:
+    """Take a snapshot of the value of a widget."""
+    if (snapshot := getattr(widget, "_snapshot", None)) is not None:
+        return snapshot()
+    return ValueSnapshot.constant(widget.value)
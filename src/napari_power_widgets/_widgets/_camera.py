@@ -1 +1,97 @@
-# TODO
+from __future__ import annotations
+
+from typing import NamedTuple, Tuple, TYPE_CHECKING
+
+from magicgui.widgets import Container, Label, PushButton
+from magicgui.widgets._bases.value_widget import UNSET
+
+from ._utils import find_viewer_ancestor
+
+if TYPE_CHECKING:
+    import napari
+
+
+class CameraState(NamedTuple):
+    """State of the viewer camera and the dimension sliders."""
+
+    zoom: float
+    center: Tuple[float, ...]
+    angles: Tuple[float, float, float]
+    step: Tuple[int, ...]
+
+    @classmethod
+    def from_viewer(cls, viewer: napari.Viewer) -> CameraState:
+        """Capture the current state of a viewer."""
+        camera = viewer.camera
+        return cls(
+            zoom=float(camera.zoom),
+            center=tuple(float(c) for c in camera.center),
+            angles=tuple(float(a) for a in camera.angles),
+            step=tuple(int(s) for s in viewer.dims.current_step),
+        )
+
+    def apply(self, viewer: napari.Viewer) -> None:
+        """Restore the state to a viewer."""
+        dims = viewer.dims
+        if len(self.step) == dims.ndim:
+            dims.current_step = self.step
+        camera = viewer.camera
+        camera.center = self.center
+        camera.angles = self.angles
+        camera.zoom = self.zoom
+        return None
+
+
+class CameraStateEdit(Container):
+    """A widget that captures and restores the camera state of the viewer."""
+
+    def __init__(self, value=UNSET, nullable: bool = False, **kwargs):
+        self._label = Label(value="Not captured")
+        self._capture_btn = PushButton(
+            text="Capture", tooltip="Capture the current camera state"
+        )
+        self._restore_btn = PushButton(
+            text="Restore", tooltip="Restore the camera state to the viewer"
+        )
+        super().__init__(
+            widgets=[self._label, self._capture_btn, self._restore_btn],
+            layout="horizontal",
+            labels=False,
+            **kwargs,
+        )
+        self.margins = (0, 0, 0, 0)
+        self._capture_btn.changed.disconnect()
+        self._restore_btn.changed.disconnect()
+        self._capture_btn.changed.connect(self._capture)
+        self._restore_btn.changed.connect(self._restore)
+
+        self._state: CameraState | None = None
+        self.value = value
+
+    @property
+    def value(self) -> CameraState | None:
+        """The captured camera state."""
+        return self._state
+
+    @value.setter
+    def value(self, state: CameraState | None):
+        if state is UNSET:
+            return
+        if state is not None:
+            state = CameraState(*state)
+            center = ", ".join(f"{c:.1f}" for c in state.center)
+            self._label.value = f"zoom={state.zoom:.2f}, center=({center})"
+        else:
+            self._label.value = "Not captured"
+        self._state = state
+        self.changed.emit(state)
+
+    def _capture(self):
+        if viewer := find_viewer_ancestor(self):
+            self.value = CameraState.from_viewer(viewer)
+
+    def _restore(self):
+        if self._state is None:
+            return
+        if viewer := find_viewer_ancestor(self):
+            self._state.apply(viewer)
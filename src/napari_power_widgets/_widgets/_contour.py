@@ -0,0 +1,135 @@
+"""Contour polygons of a label traced within its bounding box."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from magicgui.widgets._bases.value_widget import UNSET
+
+from ._cache import ValueList, ValueSnapshot, layer_key, register_value_key
+from ._labels import LabelComboBox
+from ._mask import label_bbox
+from ._transform import apply_affine, data_to_world_matrix
+
+if TYPE_CHECKING:
+    from napari.layers import Labels
+
+
+def label_contours(
+    data, label: int, tolerance: float = 0.0
+) -> list[np.ndarray]:
+    """
+    Contour polygons of ``data == label`` in the data coordinates.
+
+    Only the bounding box of the label is read and traced by marching
+    squares. nD labels are traced plane by plane along the last two axes,
+    and the vertices carry the indices of the leading axes.
+
+    Parameters
+    ----------
+    data : array-like
+        Labels array.
+    label : int
+        Label to trace.
+    tolerance : float, default is 0.0
+        If positive, polygons are simplified by the Douglas-Peucker algorithm
+        with this tolerance in pixels.
+    """
+    from skimage.measure import approximate_polygon, find_contours
+
+    if data.ndim < 2:
+        raise ValueError("Labels must be at least 2D.")
+    bbox = label_bbox(data, label)
+    if bbox is None:
+        return []
+    crop = np.asarray(data[bbox]) == label
+    lead_ndim = data.ndim - 2
+    # pad by one pixel so that contours touching the bbox are closed
+    offset = np.array([sl.start - 1 for sl in bbox[-2:]], dtype=np.float64)
+    out: list[np.ndarray] = []
+    for idx in np.ndindex(*crop.shape[:-2]):
+        plane = crop[idx]
+        if not plane.any():
+            continue
+        padded = np.pad(plane, 1).view(np.uint8)
+        leading = [sl.start + i for sl, i in zip(bbox, idx)]
+        for contour in find_contours(padded, 0.5):
+            if tolerance > 0:
+                contour = approximate_polygon(contour, tolerance)
+            vertices = np.empty((contour.shape[0], lead_ndim + 2))
+            vertices[:, :lead_ndim] = leading
+            vertices[:, lead_ndim:] = contour + offset
+            out.append(vertices)
+    return out
+
+
+def _world_contours(
+    matrix: np.ndarray, data, label: int, tolerance: float
+) -> list[np.ndarray]:
+    """Contours transformed into world coordinates by one multiply."""
+    contours = label_contours(data, label, tolerance)
+    if not contours:
+        return contours
+    world = apply_affine(matrix, np.concatenate(contours, axis=0))
+    return np.split(world, np.cumsum([len(c) for c in contours])[:-1])
+
+
+class LabelContourEdit(LabelComboBox):
+    """
+    A ``LabelComboBox`` whose value is the list of the contour polygons of
+    the selected label in world coordinates.
+    """
+
+    def __init__(self, value=UNSET, tolerance: float = 0.0, **kwargs):
+        self._tolerance = float(tolerance)
+        super().__init__(value, **kwargs)
+
+    @property
+    def tolerance(self) -> float:
+        """Tolerance of the polygon simplification in pixels."""
+        return self._tolerance
+
+    @property
+    def value(self) -> list[np.ndarray]:
+        """Contours of the selected label in world coordinates."""
+        layer: Labels = self._layer_cbox.value
+        idx = self._spinbox.value
+        matrix = data_to_world_matrix(layer)
+        out = ValueList(
+            _world_contours(matrix, layer.data, idx, self._tolerance)
+        )
+        return register_value_key(
+            out,
+            (
+                "LabelContour",
+                *layer_key(layer),
+                idx,
+                self._tolerance,
+                matrix.tobytes(),
+            ),
+        )
+
+    @value.setter
+    def value(self, shape: tuple[Labels, int]):
+        LabelComboBox.value.fset(self, shape)
+
+    def _snapshot(self) -> ValueSnapshot:
+        layer: Labels = self._layer_cbox.value
+        return ValueSnapshot(
+            _world_contours,
+            data_to_world_matrix(layer),
+            layer.data,
+            self._spinbox.value,
+            self._tolerance,
+            layer=layer,
+        )
+
+    def _recipe(self) -> dict:
+        layer: Labels = self._layer_cbox.value
+        return {
+            "type": "LabelContour",
+            "layer": layer.name,
+            "label": int(self._spinbox.value),
+            "tolerance": self._tolerance,
+        }
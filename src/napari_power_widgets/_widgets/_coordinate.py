@@ -4,13 +4,24 @@ from typing import TYPE_CHECKING, Union, NamedTuple
 
 import napari
 import numpy as np
-from magicgui.widgets import Container, PushButton, TupleEdit, FloatSpinBox
+from magicgui.widgets import (
+    Container,
+    PushButton,
+    TupleEdit,
+    FloatSpinBox,
+    Label,
+    Slider,
+)
 from magicgui.widgets._bases.value_widget import UNSET
 
 from ._typing import MouseEvent
 from ._mouse import MouseInteractivityMixin, Mode
+from ._utils import GrowableArray, LazyTable
+from ._snap import SnapMode, snap_position
 
 if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
     _RangeLike = Union[tuple[float, float], slice]
     # _IntRangeLike = Union[tuple[int, int], slice]
 
@@ -84,6 +95,10 @@ class BoxSelector(Container, MouseInteractivityMixin):
         self._yrange.value = yval
         self._xrange.value = xval
 
+    def _recipe(self) -> dict:
+        y, x = self.value
+        return {"type": "BoxSelection", "y": list(y), "x": list(x)}
+
     def _activate(self):
         self._btn.text = "Selecting"
         viewer = napari.current_viewer()
@@ -105,7 +120,15 @@ class BoxSelector(Container, MouseInteractivityMixin):
         self._unfreeze_layers()
         self._btn.text = "Select"
 
+    def _preview(self, factor: int) -> BoxRange:
+        """The value in the coordinates downsampled by ``factor``."""
+        y, x = self.value
+        return BoxRange(
+            y=tuple(v / factor for v in y), x=tuple(v / factor for v in x)
+        )
+
     def _on_drag(self, viewer: napari.Viewer, event: MouseEvent):
+        self._start_drag()
         try:
             pos0 = event.position
             pos1 = pos0
@@ -117,7 +140,10 @@ class BoxSelector(Container, MouseInteractivityMixin):
                 self.value = viewer.overlays.interaction_box.points.T
                 yield
         finally:
-            self.mode = Mode.idle
+            try:
+                self.mode = Mode.idle
+            finally:
+                self._finish_drag()
 
     def _setup_container(self):
         self._xrange = TupleEdit(
@@ -143,13 +169,14 @@ class BoxSelector(Container, MouseInteractivityMixin):
         self._btn.changed.disconnect()
 
         # connect signals
-        self._range_container.changed.connect(
-            lambda: self.changed.emit(self.value)
-        )
+        self._range_container.changed.connect(self._emit_changed)
         self._btn.changed.connect(self._switch_mode)
 
         return None
 
+    def _emit_changed(self, *_):
+        self.changed.emit(self.value)
+
 
 # TODO: `BoxSliceSelector` does not consider layer transformation at the
 # moment.
@@ -209,12 +236,25 @@ class BoxSelector(Container, MouseInteractivityMixin):
 
 
 class CoordinateSelector(Container, MouseInteractivityMixin):
+    """
+    A widget that selects a 2D point by clicking the viewer.
+
+    If ``snap`` is "maxima", the clicked point snaps to the nearest local
+    maximum of the topmost visible Image layer. If "centroid", it snaps to the
+    nearest label centroid of the topmost visible Labels layer. Snapping
+    targets within ``snap_radius`` pixels are searched.
+    """
+
     def __init__(
         self,
         value: tuple[_RangeLike, _RangeLike] = UNSET,
         nullable: bool = False,
+        snap: str | None = None,
+        snap_radius: float = 10.0,
         **kwargs,
     ):
+        self._snap = None if snap is None else SnapMode(snap)
+        self._snap_radius = snap_radius
         self._xpos = FloatSpinBox(value=0.0, label="X", min=-1e6, max=1e6)
         self._ypos = FloatSpinBox(value=0.0, label="Y", min=-1e6, max=1e6)
         self._btn = PushButton(
@@ -235,8 +275,8 @@ class CoordinateSelector(Container, MouseInteractivityMixin):
         self._btn.changed.disconnect()
 
         self._btn.changed.connect(self._switch_mode)
-        self._xpos.changed.connect(lambda: self.changed.emit(self.value))
-        self._ypos.changed.connect(lambda: self.changed.emit(self.value))
+        self._xpos.changed.connect(self._emit_changed)
+        self._ypos.changed.connect(self._emit_changed)
 
     @property
     def value(self) -> np.ndarray:
@@ -250,6 +290,18 @@ class CoordinateSelector(Container, MouseInteractivityMixin):
             return
         self._ypos.value, self._xpos.value = pos
 
+    def _emit_changed(self, *_):
+        self.changed.emit(self.value)
+
+    def _recipe(self) -> dict:
+        return {"type": "Coordinate", "value": self.value.tolist()}
+
+    def _preview(self, factor: int) -> np.ndarray:
+        # leading coordinates select the plane and are not downsampled
+        out = np.array(self.value, dtype=np.float64)
+        out[..., -2:] /= factor
+        return out
+
     def _activate(self):
         self._btn.text = "..."
         viewer = napari.current_viewer()
@@ -272,7 +324,14 @@ class CoordinateSelector(Container, MouseInteractivityMixin):
             while event.type == "mouse_move":
                 yield  # do nothing
             px1 = event.pos
-            if np.sum(px0 - px1) < 2:
+            if np.abs(px0 - px1).sum() < 2:
+                if self._snap is not None:
+                    snapped = snap_position(
+                        viewer, pos0, self._snap, self._snap_radius
+                    )
+                    if snapped is not None:
+                        pos0 = np.array(pos0, dtype=np.float64)
+                        pos0[-2:] = snapped[-2:]
                 self.value = pos0[-2:]
                 viewer.overlays.interaction_box.show = True
                 viewer.overlays.interaction_box.points = pos0
@@ -281,3 +340,126 @@ class CoordinateSelector(Container, MouseInteractivityMixin):
         finally:
             if init:
                 self.mode = Mode.idle
+
+
+class CoordinatesSelector(Container, MouseInteractivityMixin):
+    """
+    A widget that collects points by clicking the viewer.
+
+    Unlike ``CoordinateSelector``, this widget stays in the selection mode
+    until the button is clicked again, and every click appends an nD world
+    coordinate (including the current dims step) to the value. Only the
+    visible rows are rendered in the table.
+    """
+
+    _NROWS = 6
+
+    def __init__(
+        self,
+        value: ArrayLike = UNSET,
+        nullable: bool = False,
+        **kwargs,
+    ):
+        self._buffer = GrowableArray(2)
+        self._table = LazyTable(
+            np.zeros((0, 2)), columns=["Y", "X"], max_height=160
+        )
+        self._slider = Slider(
+            value=0, min=0, max=0, orientation="vertical", tracking=True
+        )
+        self._count = Label(value="0 points")
+        self._btn = PushButton(
+            text="Select", tooltip="Click the viewer to add points"
+        )
+        self._clear_btn = PushButton(text="Clear")
+        self._mode = Mode.idle
+
+        table_container = Container(
+            widgets=[self._table, self._slider], layout="horizontal"
+        )
+        table_container.margins = (0, 0, 0, 0)
+        btn_container = Container(
+            widgets=[self._count, self._btn, self._clear_btn],
+            layout="horizontal",
+        )
+        btn_container.margins = (0, 0, 0, 0)
+        super().__init__(
+            widgets=[table_container, btn_container], labels=False, **kwargs
+        )
+        table_container.changed.disconnect()
+        btn_container.changed.disconnect()
+        self._slider.changed.connect(self._update_table)
+        self._btn.changed.connect(self._switch_mode)
+        self._clear_btn.changed.connect(self._clear)
+
+        self.value = value
+
+    @property
+    def value(self) -> np.ndarray:
+        """(N, ndim) array of the coordinates (a read-only view)."""
+        return self._buffer.view()
+
+    @value.setter
+    def value(self, coords: ArrayLike):
+        if coords is UNSET:
+            return
+        self._buffer.clear()
+        self._buffer.extend(np.asarray(coords, dtype=np.float64))
+        self._on_buffer_changed()
+
+    def _recipe(self) -> dict:
+        return {"type": "Coordinates", "value": self.value.tolist()}
+
+    def _preview(self, factor: int) -> np.ndarray:
+        out = self.value.copy()
+        out[:, -2:] /= factor
+        return out
+
+    def _clear(self):
+        self._buffer.clear()
+        self._on_buffer_changed()
+
+    def _on_buffer_changed(self):
+        n = len(self._buffer)
+        self._count.value = f"{n} points"
+        # scroll to the last row
+        last = max(n - self._NROWS, 0)
+        with self._slider.changed.blocked():
+            self._slider.max = last
+            self._slider.value = last
+        self._update_table()
+        self.changed.emit(self.value)
+
+    def _update_table(self, *_):
+        start = self._slider.value
+        rows = self._buffer.view()[start : start + self._NROWS]
+        ndim = self._buffer.ncols
+        columns = [f"dim-{i}" for i in range(ndim - 2)] + ["Y", "X"]
+        self._table.set_data(
+            rows,
+            index=list(range(start, start + rows.shape[0])),
+            columns=columns[-ndim:],
+        )
+
+    def _activate(self):
+        self._btn.text = "Selecting"
+        viewer = napari.current_viewer()
+        viewer.overlays.interaction_box.show = False
+        self._freeze_layers(viewer)
+        viewer.mouse_drag_callbacks.append(self._on_click)
+
+    def _deactivate(self):
+        viewer = self._current_viewer
+        viewer.mouse_drag_callbacks.remove(self._on_click)
+        self._unfreeze_layers()
+        self._btn.text = "Select"
+
+    def _on_click(self, viewer: napari.Viewer, event: MouseEvent):
+        pos0 = event.position
+        px0 = event.pos
+        yield
+        while event.type == "mouse_move":
+            yield  # do nothing
+        if np.abs(px0 - event.pos).sum() < 2:
+            self._buffer.append(np.asarray(pos0, dtype=np.float64))
+            self._on_buffer_changed()
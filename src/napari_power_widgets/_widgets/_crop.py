@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import math
+from typing import Sequence, TYPE_CHECKING
+
+import numpy as np
+from magicgui.widgets import Container, SpinBox
+from magicgui.widgets._bases.value_widget import UNSET
+
+from ._budget import check_budget, memmap_zeros
+from ._coordinate import BoxSelector
+from ._multidim import ZRangeEdit
+from ._registry import LayerComboBox
+
+if TYPE_CHECKING:
+    from napari.layers import Image
+
+
+class LazyCrop:
+    """
+    A crop of a (possibly multiscale) image that is read on demand.
+
+    Nothing is read until the crop is converted into an array by
+    ``np.asarray`` or ``compute``. Only the chunks of the pyramid level that
+    overlap the crop are read for chunked arrays such as dask or zarr.
+
+    Parameters
+    ----------
+    levels : sequence of arrays
+        Pyramid levels from the full resolution to the coarsest.
+    bounds : sequence of (int, int)
+        (start, stop) of each axis in the full-resolution data.
+    level : int, default is 0
+        The pyramid level to read.
+    """
+
+    def __init__(
+        self,
+        levels: Sequence,
+        bounds: Sequence[tuple[int, int]],
+        level: int = 0,
+    ):
+        if not 0 <= level < len(levels):
+            raise ValueError(f"Level {level} out of range.")
+        self._levels = list(levels)
+        self._bounds = tuple((int(b0), int(b1)) for b0, b1 in bounds)
+        self._level = level
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(shape={self.shape}, "
+            f"level={self.level}, bounds={self.bounds})"
+        )
+
+    @property
+    def level(self) -> int:
+        """The pyramid level to read."""
+        return self._level
+
+    @property
+    def nlevels(self) -> int:
+        return len(self._levels)
+
+    @property
+    def bounds(self) -> tuple[tuple[int, int], ...]:
+        """(start, stop) of each axis in the full-resolution data."""
+        return self._bounds
+
+    @property
+    def downsample(self) -> tuple[float, ...]:
+        """Downsampling factor of each axis at the current level."""
+        full = self._levels[0].shape
+        return tuple(
+            s0 / s for s0, s in zip(full, self._levels[self._level].shape)
+        )
+
+    @property
+    def slices(self) -> tuple[slice, ...]:
+        """Slices of the crop at the current level."""
+        shape = self._levels[self._level].shape
+        out = []
+        for (b0, b1), f, s in zip(self._bounds, self.downsample, shape):
+            start = min(int(math.floor(b0 / f)), s)
+            stop = max(min(int(math.ceil(b1 / f)), s), start)
+            out.append(slice(start, stop))
+        return tuple(out)
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """Shape of the crop at the current level."""
+        return tuple(sl.stop - sl.start for sl in self.slices)
+
+    @property
+    def ndim(self) -> int:
+        return len(self._bounds)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self._levels[0].dtype)
+
+    def at_level(self, level: int) -> LazyCrop:
+        """The same crop at another pyramid level."""
+        return self.__class__(self._levels, self._bounds, level)
+
+    def at_resolution(self, size: int) -> LazyCrop:
+        """
+        The same crop at the coarsest level that meets the resolution.
+
+        The coarsest level whose crop is at least ``size`` pixels along the
+        longer of the last two axes is chosen. The full resolution is used if
+        no level meets it.
+        """
+        for level in reversed(range(self.nlevels)):
+            crop = self.at_level(level)
+            if max(crop.shape[-2:], default=0) >= size:
+                return crop
+        return self.at_level(0)
+
+    def dask(self):
+        """The crop as a dask array without computing."""
+        import dask.array as da
+
+        data = self._levels[self._level]
+        if not isinstance(data, da.Array):
+            data = da.from_array(data, chunks="auto")
+        return data[self.slices]
+
+    def compute(self) -> np.ndarray:
+        """
+        Read the crop into a numpy array.
+
+        If the crop exceeds the memory budget and the policy is not "raise",
+        it is read plane by plane into a memmap-backed array.
+        """
+        data = self._levels[self._level]
+        slices = self.slices
+        # the channel axis of RGB(A) images is read but not cropped
+        shape = self.shape + tuple(getattr(data, "channel_shape", ()))
+        if check_budget(shape, self.dtype, "ImageCrop") is None:
+            return np.asarray(data[slices])
+        out = memmap_zeros(shape, self.dtype)
+        # read plane by plane along the first (never the channel) axis
+        first = slices[0]
+        for i, z in enumerate(range(first.start, first.stop)):
+            out[i] = np.asarray(data[(z,) + slices[1:]])
+        return out
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        out = self.compute()
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+
+def _image_levels(image: Image) -> list:
+    levels = list(image.data) if image.multiscale else [image.data]
+    if image.rgb:
+        levels = [_Channels(data) for data in levels]
+    return levels
+
+
+class _Channels:
+    """Lazy view of an RGB(A) array whose shape excludes the channel axis."""
+
+    def __init__(self, data):
+        self._data = data
+        self.shape = data.shape[:-1]
+        self.channel_shape = data.shape[-1:]
+        self.dtype = data.dtype
+
+    def __getitem__(self, sl):
+        return self._data[sl]
+
+
+class ImageCropEdit(Container):
+    """
+    A widget for a lazy crop of an image layer.
+
+    The Y/X range is selected with a ``BoxSelector`` and the range of the
+    third last axis with a ``ZRangeEdit``. Other axes are not cropped. The
+    crop is read from the coarsest pyramid level that has at least
+    ``resolution`` pixels along the longer side (0 for the full resolution).
+    """
+
+    def __init__(
+        self,
+        value=UNSET,
+        resolution: int = 0,
+        nullable: bool = False,
+        **kwargs,
+    ):
+        self._image_cbox = LayerComboBox("Image", label="image")
+        self._box = BoxSelector(label="YX")
+        self._zrange = ZRangeEdit(label="Z")
+        self._resolution = SpinBox(
+            value=resolution, min=0, max=1e6, step=64, label="resolution"
+        )
+        super().__init__(
+            widgets=[
+                self._image_cbox,
+                self._box,
+                self._zrange,
+                self._resolution,
+            ],
+            **kwargs,
+        )
+        self.margins = (0, 0, 0, 0)
+        self.value = value
+
+    @property
+    def image_layer(self) -> Image:
+        """Currently selected image layer."""
+        return self._image_cbox.value
+
+    @property
+    def value(self) -> LazyCrop:
+        """Lazy crop of the selected image."""
+        image = self.image_layer
+        crop = LazyCrop(_image_levels(image), self._data_bounds(image))
+        if (size := self._resolution.value) > 0:
+            crop = crop.at_resolution(size)
+        return crop
+
+    @value.setter
+    def value(self, value):
+        if value is UNSET:
+            return
+        image, box, *zrange = value
+        self._image_cbox.value = image
+        self._box.value = box
+        if zrange:
+            self._zrange.value = zrange[0]
+
+    def _recipe(self) -> dict:
+        image = self.image_layer
+        return {
+            "type": "ImageCrop",
+            "image": image.name,
+            "bounds": [list(b) for b in self._data_bounds(image)],
+            "resolution": int(self._resolution.value),
+        }
+
+    def _data_bounds(self, image: Image) -> list[tuple[int, int]]:
+        """Crop bounds in the full-resolution data coordinates."""
+        levels = _image_levels(image)
+        shape = levels[0].shape
+        ndim = len(shape)
+        (ystart, ystop), (xstart, xstop) = self._box.value
+        pos0 = np.zeros(ndim)
+        pos1 = np.zeros(ndim)
+        pos0[-2:] = ystart, xstart
+        pos1[-2:] = ystop, xstop
+        d0 = np.asarray(image.world_to_data(pos0))[-2:]
+        d1 = np.asarray(image.world_to_data(pos1))[-2:]
+        bounds = [(0, s) for s in shape]
+        lo, hi = np.minimum(d0, d1), np.maximum(d0, d1)
+        for i, (a, b) in enumerate(zip(lo, hi)):
+            axis = ndim - 2 + i
+            bounds[axis] = (
+                int(np.clip(np.ceil(a), 0, shape[axis])),
+                int(np.clip(np.floor(b), 0, shape[axis])),
+            )
+        if ndim > 2:
+            z0, z1 = self._zrange.value
+            bounds[-3] = (
+                int(np.clip(z0, 0, shape[-3])),
+                int(np.clip(z1 + 1, 0, shape[-3])),  # ZRange is inclusive
+            )
+        return bounds
@@ -5,9 +5,17 @@ from magicgui.widgets import Container, ComboBox, Label, Widget
 from magicgui.widgets._bases.value_widget import UNSET
 
 from ._utils import find_viewer_ancestor, minimize_label_width
+from ._cache import (
+    features_version,
+    layer_key,
+    object_token,
+    register_value_key,
+)
+from ._registry import layer_registry
 
 if TYPE_CHECKING:
     import pandas as pd
+    from napari.layers import Layer
 
 
 def get_features(widget: Widget) -> list[tuple[str, pd.DataFrame]]:
@@ -16,12 +24,39 @@ def get_features(widget: Widget) -> list[tuple[str, pd.DataFrame]]:
     if viewer is None:
         return []
     features: list[pd.DataFrame] = []
-    for layer in viewer.layers:
+    for layer in layer_registry(viewer).layers("Layer"):
         if len(feat := getattr(layer, "features", [])) > 0:
             features.append((layer.name, feat))
     return features
 
 
+class FeaturesComboBox(ComboBox):
+    """
+    A ComboBox of the non-empty feature tables of the layers.
+
+    ``reset_choices`` is skipped unless the layers or their features have
+    changed since the last reset, as ``LayerComboBox`` does.
+    """
+
+    def __init__(self, **kwargs):
+        self._choices_state: tuple | None = None
+        super().__init__(choices=get_features, **kwargs)
+
+    def reset_choices(self, *_) -> None:
+        if viewer := find_viewer_ancestor(self.native):
+            registry = layer_registry(viewer)
+            state = (
+                object_token(registry),
+                registry.version("Layer"),
+                tuple(features_version(x) for x in registry.layers("Layer")),
+            )
+            if state == self._choices_state:
+                return None
+            self._choices_state = state
+        super().reset_choices()
+        return None
+
+
 class ColumnChoice(Container):
     def __init__(
         self,
@@ -29,7 +64,7 @@ class ColumnChoice(Container):
         nullable=False,
         **kwargs,
     ):
-        self._dataframe_cbox = ComboBox(choices=get_features, value=value)
+        self._dataframe_cbox = FeaturesComboBox(value=value)
         self._column_cbox = ComboBox(choices=self._get_available_columns)
         _label_l = Label(value='.features["')
         minimize_label_width(_label_l)
@@ -61,7 +96,28 @@ class ColumnChoice(Container):
         self._column_cbox.choices = cols
         return None
 
+    def _source_layer(self) -> Layer | None:
+        """The layer whose features are selected."""
+        df = self._dataframe_cbox.value
+        if viewer := find_viewer_ancestor(self):
+            for layer in layer_registry(viewer).layers("Layer"):
+                if getattr(layer, "features", None) is df:
+                    return layer
+        return None
+
     @property
     def value(self) -> pd.Series:
         df = self._dataframe_cbox.value
-        return df[self._column_cbox.value]
+        column = self._column_cbox.value
+        out = df[column]
+        if (layer := self._source_layer()) is None:
+            return out
+        return register_value_key(
+            out,
+            (
+                "FeatureColumn",
+                *layer_key(layer),
+                features_version(layer),
+                column,
+            ),
+        )
@@ -0,0 +1,394 @@
+"""Map a function over the objects of a label image."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from multiprocessing import shared_memory
+import os
+import sys
+from typing import Any, Callable, Iterable, Sequence, TYPE_CHECKING
+
+import numpy as np
+from magicgui.widgets import Container, LineEdit
+from magicgui.widgets._bases.value_widget import UNSET
+
+from ._cache import LRUCache, ValueSnapshot, layer_key, register_value_key
+from ._registry import LayerComboBox
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from napari.layers import Labels
+
+_Slices = tuple  # tuple of slices of an object
+
+
+class MapExecutor(Enum):
+    """Executor of ``map_labels``."""
+
+    serial = "serial"
+    thread = "thread"
+    process = "process"
+
+
+class MapOutput(Enum):
+    """Output structure of ``map_labels``."""
+
+    dict = "dict"  # ragged, {label: result}
+    table = "table"  # pandas.DataFrame indexed by label
+
+
+class LabelSelection:
+    """
+    A selection of labels in a label image.
+
+    The label image is referenced, not copied. Use ``map`` to apply a
+    function to each selected object.
+    """
+
+    def __init__(self, data, labels: Iterable[int]):
+        self._data = data
+        self._labels = tuple(int(i) for i in labels)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(shape={self._data.shape}, "
+            f"labels={self._labels})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __iter__(self):
+        return iter(self._labels)
+
+    @property
+    def data(self):
+        """The label image."""
+        return self._data
+
+    @property
+    def labels(self) -> tuple[int, ...]:
+        """Selected labels."""
+        return self._labels
+
+    def map(self, func: Callable, image=None, **kwargs):
+        """Apply ``func`` to each selected object. See ``map_labels``."""
+        return map_labels(func, self._data, self._labels, image, **kwargs)
+
+
+def _find_objects(data, labels: Sequence[int]) -> list[_Slices | None]:
+    """Bounding boxes of the labels in one pass over the image."""
+    from scipy import ndimage as ndi
+
+    if len(labels) == 0:
+        return []
+    arr = np.asarray(data)
+    if arr.dtype == bool:
+        arr = arr.view(np.uint8)
+    objects = ndi.find_objects(arr, max_label=max(labels))
+    return [objects[i - 1] if i > 0 else None for i in labels]
+
+
+def _pad(sl: _Slices, padding: int, shape: tuple[int, ...]) -> _Slices:
+    if padding <= 0:
+        return sl
+    return tuple(
+        slice(max(s.start - padding, 0), min(s.stop + padding, n))
+        for s, n in zip(sl, shape)
+    )
+
+
+def _apply(func: Callable, data, image, label: int, sl: _Slices) -> Any:
+    mask = np.asarray(data[sl]) == label
+    if image is None:
+        return func(mask)
+    return func(np.asarray(image[sl]), mask)
+
+
+def _to_shared(arr: np.ndarray) -> tuple[shared_memory.SharedMemory, tuple]:
+    """Copy an array into a new shared memory block."""
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    out = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    out[...] = arr
+    del out
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def _attach(spec: tuple) -> tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    if sys.version_info < (3, 13):
+        # the block is unlinked by the parent, not by this worker
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _run_chunk(
+    func: Callable,
+    data_spec: tuple,
+    image_spec: tuple | None,
+    tasks: list[tuple[int, _Slices]],
+) -> list[Any]:
+    """Process a chunk of objects in a worker process."""
+    shms = []
+    try:
+        shm, data = _attach(data_spec)
+        shms.append(shm)
+        image = None
+        if image_spec is not None:
+            shm, image = _attach(image_spec)
+            shms.append(shm)
+        out = [_apply(func, data, image, label, sl) for label, sl in tasks]
+        del data, image
+        return out
+    finally:
+        for shm in shms:
+            shm.close()
+
+
+def _run_processes(
+    func: Callable,
+    data,
+    image,
+    tasks: list[tuple[int, _Slices]],
+    max_workers: int | None,
+) -> list[Any]:
+    shms: list[shared_memory.SharedMemory] = []
+    try:
+        shm, data_spec = _to_shared(np.ascontiguousarray(data))
+        shms.append(shm)
+        image_spec = None
+        if image is not None:
+            shm, image_spec = _to_shared(np.ascontiguousarray(image))
+            shms.append(shm)
+        with ProcessPoolExecutor(max_workers) as executor:
+            nworkers = max_workers or os.cpu_count() or 1
+            size = max(-(-len(tasks) // (nworkers * 4)), 1)
+            chunks = [tasks[i : i + size] for i in range(0, len(tasks), size)]
+            futures = [
+                executor.submit(_run_chunk, func, data_spec, image_spec, c)
+                for c in chunks
+            ]
+            return [out for f in futures for out in f.result()]
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+
+def map_labels(
+    func: Callable,
+    data,
+    labels: Iterable[int] | None = None,
+    image=None,
+    executor: MapExecutor | str = "thread",
+    max_workers: int | None = None,
+    padding: int = 0,
+    output: MapOutput | str = "dict",
+) -> dict[int, Any] | pd.DataFrame:
+    """
+    Apply a function to each object of a label image.
+
+    The bounding boxes of all the objects are found by one pass of
+    ``scipy.ndimage.find_objects``, and ``func`` is called with the crops of
+    each object, instead of comparing the whole image for every label.
+
+    Parameters
+    ----------
+    func : callable
+        Called as ``func(mask)``, or ``func(image_crop, mask)`` if ``image``
+        is given, where ``mask`` is the boolean mask of the object in its
+        bounding box. Must be picklable for the "process" executor.
+    data : array-like or LabelSelection
+        Label image, or a ``LabelSelection`` (``SomeOfLabels``). A boolean
+        mask (``OneOfLabels``) is treated as a single object of label 1.
+    labels : iterable of int, optional
+        Labels to process. All the labels in the image by default.
+    image : array-like, optional
+        Intensity image of the same shape as ``data``.
+    executor : "serial", "thread" or "process", default is "thread"
+        Crops are views of the arrays in the thread executor. The arrays are
+        copied into shared memory once for the process executor.
+    max_workers : int, optional
+        Number of workers.
+    padding : int, default is 0
+        Pixels added to each side of the bounding boxes.
+    output : "dict" or "table", default is "dict"
+        "dict" returns ``{label: result}`` of any (ragged) results. "table"
+        returns a ``pandas.DataFrame`` indexed by label, with a column per
+        key if the results are mappings and a "value" column otherwise.
+    """
+    if isinstance(data, LabelSelection):
+        if labels is None:
+            labels = data.labels
+        data = data.data
+    executor = MapExecutor(executor)
+    output = MapOutput(output)
+    if getattr(data, "dtype", None) == bool:
+        data = np.asarray(data).view(np.uint8)
+        if labels is None:
+            labels = [1]
+    if labels is None:
+        labels = [int(i) for i in np.unique(np.asarray(data)) if i > 0]
+    labels = [int(i) for i in labels]
+    if image is not None and image.shape != data.shape:
+        raise ValueError(
+            f"Shape mismatch: labels {data.shape} and image {image.shape}."
+        )
+
+    tasks = [
+        (label, _pad(sl, padding, data.shape))
+        for label, sl in zip(labels, _find_objects(data, labels))
+        if sl is not None
+    ]
+    if executor is MapExecutor.process:
+        results = _run_processes(func, data, image, tasks, max_workers)
+    elif executor is MapExecutor.thread and max_workers != 1:
+        with ThreadPoolExecutor(max_workers) as pool:
+            results = list(
+                pool.map(lambda t: _apply(func, data, image, *t), tasks)
+            )
+    else:
+        results = [_apply(func, data, image, *t) for t in tasks]
+
+    out = {label: result for (label, _), result in zip(tasks, results)}
+    if output is MapOutput.dict:
+        return out
+    return _to_table(out)
+
+
+def _to_table(results: dict[int, Any]) -> pd.DataFrame:
+    import pandas as pd
+
+    index = pd.Index(list(results), name="label")
+    values = list(results.values())
+    if values and all(hasattr(v, "keys") for v in values):
+        return pd.DataFrame.from_records(values, index=index)
+    return pd.DataFrame({"value": values}, index=index)
+
+
+# layer_key -> labels present in the layer
+_LABEL_IDS = LRUCache(maxsize=8)
+
+
+def label_ids(layer: Labels) -> tuple[int, ...]:
+    """
+    Labels present in a Labels layer, excluding the background.
+
+    The whole array is scanned only once per data version of the layer.
+    """
+
+    def _scan():
+        return tuple(int(i) for i in np.unique(layer.data) if i > 0)
+
+    return _LABEL_IDS.get_or_create(layer_key(layer), _scan)
+
+
+def parse_label_ids(text: str) -> tuple[int, ...]:
+    """Parse comma-separated labels and ranges, such as "1-5, 8"."""
+    out: list[int] = []
+    for part in text.replace(" ", "").split(","):
+        if not part:
+            continue
+        start, sep, stop = part.partition("-")
+        try:
+            if sep:
+                out.extend(range(int(start), int(stop) + 1))
+            else:
+                out.append(int(part))
+        except ValueError:
+            raise ValueError(f"Invalid label range {part!r}.") from None
+    return tuple(dict.fromkeys(i for i in out if i > 0))
+
+
+def format_label_ids(ids: Iterable[int]) -> str:
+    """Format labels into the shortest text of ``parse_label_ids``."""
+    ids = sorted(set(int(i) for i in ids))
+    parts: list[str] = []
+    k = 0
+    while k < len(ids):
+        j = k
+        while j + 1 < len(ids) and ids[j + 1] == ids[j] + 1:
+            j += 1
+        parts.append(str(ids[k]) if j == k else f"{ids[k]}-{ids[j]}")
+        k = j + 1
+    return ", ".join(parts)
+
+
+class LabelSelect(Container):
+    """
+    A widget that selects some labels of a Labels layer.
+
+    Labels are entered as comma-separated labels and ranges such as
+    "1-100, 205", so that any number of labels can be selected. All the
+    labels in the layer are selected if the text is empty. The value is a
+    ``LabelSelection`` referencing the layer data.
+    """
+
+    def __init__(self, value=UNSET, nullable: bool = False, **kwargs):
+        self._layer_cbox = LayerComboBox("Labels")
+        self._label_edit = LineEdit(
+            tooltip='Labels and ranges such as "1-5, 8". Empty for all.'
+        )
+        super().__init__(
+            widgets=[self._layer_cbox, self._label_edit], **kwargs
+        )
+        self.margins = (0, 0, 0, 0)
+        self._layer_cbox.changed.disconnect()
+        self._label_edit.changed.disconnect()
+        self._layer_cbox.changed.connect(self._emit_changed)
+        self._label_edit.changed.connect(self._emit_changed)
+        self.value = value
+
+    @property
+    def labels_layer(self) -> Labels:
+        """Currently selected Labels layer."""
+        return self._layer_cbox.value
+
+    @property
+    def value(self) -> LabelSelection:
+        """Selected labels of the layer."""
+        layer = self.labels_layer
+        labels = self._selected_ids()
+        return register_value_key(
+            LabelSelection(layer.data, labels),
+            ("SomeOfLabels", *layer_key(layer), labels),
+        )
+
+    @value.setter
+    def value(self, value: tuple[Labels, Sequence[int]]):
+        if value is UNSET:
+            return
+        self._layer_cbox.value = value[0]
+        self._label_edit.value = format_label_ids(value[1])
+
+    def _selected_ids(self) -> tuple[int, ...]:
+        ids = parse_label_ids(self._label_edit.value)
+        if not ids:
+            ids = label_ids(self.labels_layer)
+        return ids
+
+    def _snapshot(self) -> ValueSnapshot:
+        layer = self.labels_layer
+        return ValueSnapshot(
+            LabelSelection, layer.data, self._selected_ids(), layer=layer
+        )
+
+    def _recipe(self) -> dict:
+        return {
+            "type": "SomeOfLabels",
+            "layer": self.labels_layer.name,
+            "labels": list(self._selected_ids()),
+        }
+
+    def _emit_changed(self, *_):
+        if self.labels_layer is None:
+            return
+        try:
+            value = self.value
+        except ValueError:  # text being edited
+            return
+        self.changed.emit(value)
@@ -4,7 +4,6 @@ from typing import TYPE_CHECKING
 import numpy as np
 from magicgui.widgets import (
     Container,
-    ComboBox,
     Label,
     SpinBox,
     PushButton,
@@ -13,20 +12,16 @@ from magicgui.widgets import (
 from magicgui.widgets._bases.value_widget import UNSET
 import napari
 
-from ._utils import find_viewer_ancestor, minimize_label_width
+from ._registry import LayerComboBox
+from ._utils import minimize_label_width
 from ._mouse import Mode, MouseInteractivityMixin
 from ._typing import MouseEvent
+from ._cache import ValueSnapshot, layer_key, readonly, register_value_key
+from ._mask import MaskOutput, encode_mask
 
 if TYPE_CHECKING:
     from napari.layers import Labels
-
-
-def _get_labels_layer(w: Widget) -> list[Labels]:
-    from napari.layers import Labels
-
-    if viewer := find_viewer_ancestor(w.native):
-        return [x for x in viewer.layers if isinstance(x, Labels)]
-    return []
+    from ._mask import PackedMask, RunLengthMask
 
 
 class LabelComboBox(Container, MouseInteractivityMixin):
@@ -34,10 +29,12 @@ class LabelComboBox(Container, MouseInteractivityMixin):
         self,
         value=UNSET,
         include_zero: bool = False,
+        output: MaskOutput | str = "dense",
         nullable: bool = False,
         **kwargs,
     ):
-        self._layer_cbox = ComboBox(choices=_get_labels_layer, nullable=False)
+        self._output = MaskOutput(output)
+        self._layer_cbox = LayerComboBox("Labels")
         min = 0 if include_zero else 1
         self._spinbox = SpinBox(value=min, min=min, max=1e6, step=1)
         self._btn = PushButton(text="Select")
@@ -59,10 +56,14 @@ class LabelComboBox(Container, MouseInteractivityMixin):
         self._mode = Mode.idle
 
     @property
-    def value(self) -> np.ndarray:
-        """Boolean array of the selected label."""
+    def value(self) -> np.ndarray | PackedMask | RunLengthMask:
+        """Mask of the selected label in the output mode (read-only)."""
         layer: Labels = self._layer_cbox.value
-        return layer.data == self._spinbox.value
+        idx = self._spinbox.value
+        out = readonly(encode_mask(layer.data, idx, self._output))
+        return register_value_key(
+            out, ("OneOfLabels", *layer_key(layer), idx, self._output.value)
+        )
 
     @value.setter
     def value(self, shape: tuple[Labels, int]):
@@ -71,11 +72,35 @@ class LabelComboBox(Container, MouseInteractivityMixin):
         self._layer_cbox.value = shape[0]
         self._spinbox.value = shape[1]
 
+    def _snapshot(self) -> ValueSnapshot:
+        layer: Labels = self._layer_cbox.value
+        return ValueSnapshot(
+            encode_mask,
+            layer.data,
+            self._spinbox.value,
+            self._output,
+            layer=layer,
+        )
+
+    def _recipe(self) -> dict:
+        layer: Labels = self._layer_cbox.value
+        return {
+            "type": "OneOfLabels",
+            "layer": layer.name,
+            "label": int(self._spinbox.value),
+            "output": self._output.value,
+        }
+
     @property
     def include_zero(self) -> bool:
         """True if the zero label is included."""
         return self._include_zero
 
+    @property
+    def output(self) -> MaskOutput:
+        """Output mode of the mask."""
+        return self._output
+
     def _get_index_list(self, w: Widget):
         layer: Labels = self._layer_cbox.value
         if layer is None:
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import napari
+import numpy as np
+from magicgui.widgets import Container, Label, PushButton
+from magicgui.widgets._bases.value_widget import UNSET
+
+from ._budget import zeros
+from ._geometry import polygon_mask
+from ._mouse import Mode, MouseInteractivityMixin
+from ._transform import world_to_data
+from ._registry import LayerComboBox
+from ._typing import MouseEvent
+from ._utils import GrowableArray, find_viewer_ancestor
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+    from napari.layers import Layer
+
+
+class Lasso:
+    """
+    A lasso polygon with a lazily rasterized mask.
+
+    Parameters
+    ----------
+    polygon : (N, 2) array
+        Vertices in (y, x) order, in the data coordinates of the target.
+    shape : (int, int), optional
+        Shape of the mask, usually the shape of the last two dimensions of
+        the target layer.
+    fill_rule : "evenodd" or "nonzero", default is "evenodd"
+        Rule to fill self-intersecting lassos.
+    """
+
+    def __init__(
+        self,
+        polygon: ArrayLike,
+        shape: tuple[int, int] | None = None,
+        fill_rule: str = "evenodd",
+    ):
+        polygon = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+        polygon.flags.writeable = False
+        self._polygon = polygon
+        self._shape = None if shape is None else tuple(shape)
+        self._fill_rule = fill_rule
+        self._mask: np.ndarray | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(nvertices={len(self._polygon)}, "
+            f"shape={self._shape})"
+        )
+
+    @property
+    def polygon(self) -> np.ndarray:
+        """(N, 2) vertices of the lasso (read-only)."""
+        return self._polygon
+
+    @property
+    def shape(self) -> tuple[int, int] | None:
+        """Shape of the mask."""
+        return self._shape
+
+    @property
+    def fill_rule(self) -> str:
+        return self._fill_rule
+
+    @property
+    def bbox(self) -> tuple[slice, slice]:
+        """Bounding box of the lasso in pixels, clipped to the shape."""
+        if self._polygon.shape[0] == 0:
+            return slice(0, 0), slice(0, 0)
+        lo = np.ceil(self._polygon.min(axis=0)).astype(int)
+        hi = np.floor(self._polygon.max(axis=0)).astype(int) + 1
+        if self._shape is not None:
+            lo = np.clip(lo, 0, self._shape)
+            hi = np.clip(hi, 0, self._shape)
+        return tuple(slice(a, max(a, b)) for a, b in zip(lo, hi))
+
+    @property
+    def mask(self) -> np.ndarray:
+        """Boolean mask of the pixels inside the lasso (read-only)."""
+        if self._mask is None:
+            if self._shape is None:
+                raise ValueError("Shape of the mask is not known.")
+            mask = polygon_mask(
+                self._polygon,
+                self._shape,
+                self._fill_rule,
+                out=zeros(self._shape, np.bool_, "Lasso mask"),
+            )
+            mask.flags.writeable = False
+            self._mask = mask
+        return self._mask
+
+
+class LassoSelector(Container, MouseInteractivityMixin):
+    """
+    A widget for a freehand lasso selection over a target layer.
+
+    Drag in the viewer to draw a lasso. The bounding box of the lasso is
+    shown by the interaction box overlay while dragging. The value is a
+    ``Lasso`` in the data coordinates of the target layer, whose mask is
+    rasterized only when requested.
+    """
+
+    def __init__(
+        self,
+        value=UNSET,
+        fill_rule: str = "evenodd",
+        nullable: bool = False,
+        **kwargs,
+    ):
+        if fill_rule not in ("evenodd", "nonzero"):
+            raise ValueError(
+                f"fill_rule must be 'evenodd' or 'nonzero', got {fill_rule!r}."
+            )
+        self._fill_rule = fill_rule
+        self._layer_cbox = LayerComboBox(("Image", "Labels"))
+        self._count = Label(value="No lasso")
+        self._btn = PushButton(
+            text="Select", tooltip="Drag in the viewer to draw a lasso"
+        )
+        self._buffer = GrowableArray(2)
+        self._mode = Mode.idle
+        super().__init__(
+            widgets=[self._layer_cbox, self._count, self._btn],
+            layout="horizontal",
+            labels=False,
+            **kwargs,
+        )
+        self.margins = (0, 0, 0, 0)
+        self._count.changed.disconnect()
+        self._btn.changed.disconnect()
+        self._btn.changed.connect(self._switch_mode)
+        self.value = value
+
+    @property
+    def target_layer(self) -> Layer | None:
+        """Currently selected target layer."""
+        return self._layer_cbox.value
+
+    @property
+    def value(self) -> Lasso:
+        """The lasso in the data coordinates of the target layer."""
+        world = self._buffer.view()
+        layer = self.target_layer
+        if layer is None:
+            return Lasso(world, fill_rule=self._fill_rule)
+        return Lasso(
+            self._to_data(layer, world),
+            self._plane_shape(layer),
+            fill_rule=self._fill_rule,
+        )
+
+    @value.setter
+    def value(self, polygon: ArrayLike):
+        """Set the lasso polygon in world coordinates."""
+        if polygon is UNSET:
+            return
+        self._buffer.clear()
+        self._buffer.extend(np.asarray(polygon, dtype=np.float64)[:, -2:])
+        self._on_buffer_changed()
+
+    def _recipe(self) -> dict:
+        if self.target_layer is None:
+            raise ValueError("No target layer is selected for the lasso.")
+        lasso = self.value
+        return {
+            "type": "LassoSelection",
+            "polygon": lasso.polygon.tolist(),
+            "layer": self.target_layer.name,
+            "fill_rule": self._fill_rule,
+        }
+
+    @staticmethod
+    def _plane_shape(layer: Layer) -> tuple[int, int]:
+        if getattr(layer, "multiscale", False):
+            shape = layer.level_shapes[0]
+        else:
+            shape = layer.data.shape
+        if getattr(layer, "rgb", False):
+            shape = shape[:-1]
+        return tuple(int(s) for s in shape[-2:])
+
+    def _to_data(self, layer: Layer, world: np.ndarray) -> np.ndarray:
+        """
+        Convert (N, 2) world coordinates into the layer data coordinates.
+
+        The leading axes are taken from the current slice of the viewer.
+        """
+        if world.shape[0] == 0:
+            return world
+        leading = None
+        if viewer := find_viewer_ancestor(self.native):
+            leading = np.asarray(viewer.dims.point)[:-2]
+        return world_to_data(layer, world, leading)
+
+    def _on_buffer_changed(self):
+        n = len(self._buffer)
+        self._count.value = f"{n} vertices" if n > 0 else "No lasso"
+        self.changed.emit(self.value)
+
+    def _activate(self):
+        self._btn.text = "Selecting"
+        viewer = napari.current_viewer()
+        self._freeze_layers(viewer)
+        viewer.overlays.interaction_box.points = None
+        viewer.overlays.interaction_box.show = True
+        viewer.cursor.style = "cross"
+        viewer.mouse_drag_callbacks.append(self._on_drag)
+
+    def _deactivate(self):
+        viewer = self._current_viewer
+        viewer.overlays.interaction_box.points = None
+        viewer.cursor.style = "standard"
+        viewer.mouse_drag_callbacks.remove(self._on_drag)
+        self._unfreeze_layers()
+        self._btn.text = "Select"
+
+    def _on_drag(self, viewer: napari.Viewer, event: MouseEvent):
+        self._buffer.clear()
+        box = viewer.overlays.interaction_box
+        try:
+            self._buffer.append(event.position[-2:])
+            lo = hi = np.asarray(event.position[-2:], dtype=np.float64)
+            yield
+            while event.type == "mouse_move":
+                pos = np.asarray(event.position[-2:], dtype=np.float64)
+                self._buffer.append(pos)
+                # only the bounding box is updated during drag
+                lo = np.minimum(lo, pos)
+                hi = np.maximum(hi, pos)
+                box.points = np.stack([lo, hi], axis=0)
+                yield
+        finally:
+            self._on_buffer_changed()
+            self.mode = Mode.idle
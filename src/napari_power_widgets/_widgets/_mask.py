@@ -0,0 +1,277 @@
+"""Compact representations of a label mask."""
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from ._budget import BudgetPolicy, check_budget, memmap_zeros
+
+# number of voxels compared at once
+_SLAB_SIZE = 1 << 22
+
+
+class MaskOutput(Enum):
+    """Output mode of a label mask."""
+
+    dense = "dense"  # boolean array
+    packbits = "packbits"  # bounding box and bit-packed crop
+    rle = "rle"  # run-length encoding
+
+
+def _iter_slabs(data, label: int) -> Iterator[tuple[int, np.ndarray]]:
+    """Yield (start, mask) of slabs of ``data == label`` along axis 0."""
+    if data.ndim == 0 or data.shape[0] == 0:
+        return
+    step = max(_SLAB_SIZE // max(int(np.prod(data.shape[1:])), 1), 1)
+    for start in range(0, data.shape[0], step):
+        yield start, np.asarray(data[start : start + step]) == label
+
+
+def label_bbox(data, label: int) -> tuple[slice, ...] | None:
+    """
+    Bounding box of ``data == label`` found slab by slab.
+
+    Returns None if the label does not exist.
+    """
+    shape = data.shape
+    profiles = [np.zeros(s, dtype=bool) for s in shape]
+    for start, mask in _iter_slabs(data, label):
+        for axis in range(len(shape)):
+            others = tuple(i for i in range(mask.ndim) if i != axis)
+            prof = mask.any(axis=others)
+            if axis == 0:
+                profiles[0][start : start + prof.size] = prof
+            else:
+                profiles[axis] |= prof
+    if not profiles or not profiles[0].any():
+        return None
+    bbox = []
+    for prof in profiles:
+        idx = np.flatnonzero(prof)
+        bbox.append(slice(int(idx[0]), int(idx[-1]) + 1))
+    return tuple(bbox)
+
+
+class _CompactMask:
+    """Base class of compact masks. Decoded to a dense array on demand."""
+
+    _shape: Tuple[int, ...]
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        """Shape of the dense mask."""
+        return self._shape
+
+    @property
+    def ndim(self) -> int:
+        return len(self._shape)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(bool)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        out = self.to_dense()
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+    def to_dense(self) -> np.ndarray:
+        """Decode into a boolean array."""
+        raise NotImplementedError()
+
+
+class PackedMask(_CompactMask):
+    """
+    A mask stored as a bounding box and a bit-packed crop.
+
+    Use ``crop()`` to decode only the bounding box region, and ``np.asarray``
+    or ``to_dense()`` to decode the full mask.
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, ...],
+        bbox: tuple[slice, ...],
+        packed: np.ndarray,
+    ):
+        self._shape = tuple(shape)
+        self._bbox = tuple(bbox)
+        self._packed = packed
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(shape={self.shape}, "
+            f"bbox={self.bbox_shape}, nbytes={self.nbytes})"
+        )
+
+    @classmethod
+    def from_labels(cls, data, label: int) -> PackedMask:
+        """
+        Encode ``data == label`` without materializing the dense mask.
+
+        The bounding box is found in the first pass by ``label_bbox``, and
+        only the bounding box region is read and packed in the second pass.
+        """
+        shape = data.shape
+        bbox = label_bbox(data, label)
+        if bbox is None:
+            bbox = tuple(slice(0, 0) for _ in shape)
+            return cls(shape, bbox, np.zeros(0, dtype=np.uint8))
+
+        chunks: list[np.ndarray] = []
+        carry = np.zeros(0, dtype=bool)
+        for _, mask in _iter_slabs(_Cropped(data, bbox), label):
+            bits = np.concatenate([carry, mask.ravel()])
+            n = bits.size - bits.size % 8
+            chunks.append(np.packbits(bits[:n]))
+            carry = bits[n:]
+        chunks.append(np.packbits(carry))
+        return cls(shape, bbox, np.concatenate(chunks))
+
+    @property
+    def bbox(self) -> tuple[slice, ...]:
+        """Bounding box of the True region."""
+        return self._bbox
+
+    @property
+    def bbox_shape(self) -> tuple[int, ...]:
+        return tuple(sl.stop - sl.start for sl in self._bbox)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the packed data."""
+        return self._packed.nbytes
+
+    def crop(self) -> np.ndarray:
+        """Decode the bounding box region."""
+        shape = self.bbox_shape
+        bits = np.unpackbits(self._packed, count=int(np.prod(shape)))
+        return bits.view(bool).reshape(shape)
+
+    def to_dense(self) -> np.ndarray:
+        out = np.zeros(self._shape, dtype=bool)
+        out[self._bbox] = self.crop()
+        return out
+
+
+class _Cropped:
+    """Lazily cropped array."""
+
+    def __init__(self, data, bbox: tuple[slice, ...]):
+        self._data = data
+        self._bbox = bbox
+        self.shape = tuple(sl.stop - sl.start for sl in bbox)
+        self.ndim = len(bbox)
+
+    def __getitem__(self, sl: slice):
+        first = self._bbox[0]
+        start = first.start + sl.start
+        stop = min(first.start + sl.stop, first.stop)
+        return self._data[(slice(start, stop),) + self._bbox[1:]]
+
+
+class RunLengthMask(_CompactMask):
+    """
+    A mask stored as runs of True in the flattened (C order) array.
+
+    ``starts`` and ``lengths`` are the flat start indices and the lengths of
+    the runs.
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, ...],
+        starts: np.ndarray,
+        lengths: np.ndarray,
+    ):
+        self._shape = tuple(shape)
+        self._starts = starts
+        self._lengths = lengths
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(shape={self.shape}, "
+            f"nruns={self._starts.size})"
+        )
+
+    @classmethod
+    def from_labels(cls, data, label: int) -> RunLengthMask:
+        """Encode ``data == label`` without materializing the dense mask."""
+        shape = data.shape
+        row_size = int(np.prod(shape[1:]))
+        all_starts: list[np.ndarray] = []
+        all_ends: list[np.ndarray] = []
+        for start, mask in _iter_slabs(data, label):
+            flat = mask.ravel().view(np.int8)
+            diff = np.diff(flat, prepend=np.int8(0), append=np.int8(0))
+            offset = start * row_size
+            all_starts.append(np.flatnonzero(diff == 1) + offset)
+            all_ends.append(np.flatnonzero(diff == -1) + offset)
+        if all_starts:
+            starts = np.concatenate(all_starts)
+            ends = np.concatenate(all_ends)
+        else:
+            starts = ends = np.zeros(0, dtype=np.int64)
+        # merge runs split at slab boundaries
+        joined = np.isin(starts, ends)
+        keep_ends = ~np.isin(ends, starts)
+        starts = starts[~joined].astype(np.int64)
+        ends = ends[keep_ends].astype(np.int64)
+        return cls(shape, starts, ends - starts)
+
+    @property
+    def starts(self) -> np.ndarray:
+        """Flat start indices of the runs."""
+        return self._starts
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Lengths of the runs."""
+        return self._lengths
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the encoded data."""
+        return self._starts.nbytes + self._lengths.nbytes
+
+    def sum(self) -> int:
+        """Number of True voxels."""
+        return int(self._lengths.sum())
+
+    def to_dense(self) -> np.ndarray:
+        size = int(np.prod(self._shape))
+        marks = np.zeros(size + 1, dtype=np.int8)
+        marks[self._starts] = 1
+        marks[self._starts + self._lengths] -= 1
+        out = np.cumsum(marks[:-1], dtype=np.int8).view(bool)
+        return out.reshape(self._shape)
+
+
+def dense_mask(data, label: int) -> np.ndarray | PackedMask:
+    """
+    Return ``data == label`` as a boolean array within the memory budget.
+
+    Above the budget, a ``PackedMask`` is returned with the "lazy" policy
+    and a memmap-backed array filled slab by slab with the "memmap" policy.
+    """
+    policy = check_budget(data.shape, np.bool_, "OneOfLabels mask")
+    if policy is None:
+        return np.asarray(data == label)
+    if policy is BudgetPolicy.lazy:
+        return PackedMask.from_labels(data, label)
+    out = memmap_zeros(data.shape, np.bool_)
+    for start, mask in _iter_slabs(data, label):
+        out[start : start + mask.shape[0]] = mask
+    return out
+
+
+def encode_mask(data, label: int, output: MaskOutput | str = "dense"):
+    """Return the mask of ``data == label`` in the given output mode."""
+    output = MaskOutput(output)
+    if output is MaskOutput.packbits:
+        return PackedMask.from_labels(data, label)
+    if output is MaskOutput.rle:
+        return RunLengthMask.from_labels(data, label)
+    return dense_mask(data, label)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from enum import Enum
 from typing import TYPE_CHECKING
+import weakref
 
 import napari
 
@@ -21,6 +22,15 @@ class Mode(Enum):
             return Mode.idle
 
 
+# widgets whose mouse callbacks are connected to a viewer
+_selecting: weakref.WeakSet = weakref.WeakSet()
+
+
+def selecting_widgets() -> list[MouseInteractivityMixin]:
+    """Widgets that are currently in the selecting mode."""
+    return list(_selecting)
+
+
 class MouseInteractivityMixin:
     @property
     def mode(self) -> Mode:
@@ -33,8 +43,10 @@ class MouseInteractivityMixin:
         mode = Mode(mode)
         self._mode = mode
         if mode is Mode.idle:
+            _selecting.discard(self)
             self._deactivate()
         elif mode is Mode.selecting:
+            _selecting.add(self)
             self._activate()
         else:
             raise RuntimeError(f"Unreachable: {mode}")
@@ -49,22 +61,83 @@ class MouseInteractivityMixin:
         """Switch the interactivity mode."""
         self.mode = self.mode.switched()
 
+    @property
+    def dragging(self) -> bool:
+        """True while the value is being updated by a mouse drag."""
+        return getattr(self, "_dragging", False)
+
+    def _start_drag(self):
+        self._dragging = True
+
+    def _finish_drag(self, emit: bool = True):
+        """Mark the end of a drag and emit the final value."""
+        self._dragging = False
+        if emit:
+            self.changed.emit(self.value)
+
     def _freeze_layers(self, viewer: napari.Viewer):
-        from napari.layers import Shapes, Labels
+        """
+        Capture mouse input of the selected layers.
 
+        Mouse callbacks of the layers are stashed instead of switching the
+        layer modes, because mode switching of large Shapes/Labels layers
+        triggers refreshes of thumbnails and textures.
+        """
         self._current_viewer = viewer
         self._layer_states: list[tuple[Layer, bool]] = []
         for layer in viewer.layers.selection:
             self._layer_states.append((layer, layer.interactive))
             layer.interactive = False
-            if isinstance(layer, (Shapes, Labels)):
-                # Shapes layer interactivity cannot be disabled if the layer
-                # is in add_XXX mode.
-                # Labels layer painting mode etc. should be disabled.
-                layer.mode = "pan_zoom"
+            for attr in _STASHED_CALLBACKS:
+                callbacks = getattr(layer, attr)
+                if not isinstance(callbacks, _CallbackStash):
+                    setattr(layer, attr, _CallbackStash(callbacks))
 
     def _unfreeze_layers(self):
         for layer, interactive in self._layer_states:
             layer.interactive = interactive
+            for attr in _STASHED_CALLBACKS:
+                callbacks = getattr(layer, attr)
+                if isinstance(callbacks, _CallbackStash):
+                    setattr(layer, attr, callbacks.original)
         self._current_viewer = None
         self._layer_states.clear()
+
+
+_STASHED_CALLBACKS = (
+    "mouse_drag_callbacks",
+    "mouse_move_callbacks",
+    "mouse_double_click_callbacks",
+)
+
+
+class _CallbackStash(list):
+    """
+    An always-empty callback list that stashes the original one.
+
+    napari iterates over this list and finds nothing to call. Changes made
+    while stashed, such as callbacks added or removed by a layer mode
+    change, are forwarded to the original list.
+    """
+
+    def __init__(self, original: list):
+        super().__init__()
+        self.original = original
+
+    def __contains__(self, callback) -> bool:
+        return callback in self.original
+
+    def append(self, callback) -> None:
+        self.original.append(callback)
+
+    def insert(self, index: int, callback) -> None:
+        self.original.insert(index, callback)
+
+    def extend(self, callbacks) -> None:
+        self.original.extend(callbacks)
+
+    def remove(self, callback) -> None:
+        self.original.remove(callback)
+
+    def index(self, callback, *args) -> int:
+        return self.original.index(callback, *args)
@@ -113,6 +113,9 @@ class ZRangeEdit(ButtonedValueWidget):
             val = sorted(val)
         self._zrange.value = val
 
+    def _recipe(self) -> dict:
+        return {"type": "ZRange", "range": [int(v) for v in self.value]}
+
     def _on_button_clicked(self):
         """Switch the tracking mode."""
         self.mode = self.mode.switched()
@@ -0,0 +1,404 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+import hashlib
+import weakref
+
+import numpy as np
+from magicgui.widgets import Container, Label, SpinBox, PushButton
+from magicgui.widgets._bases.value_widget import UNSET
+import napari
+
+from ._geometry import points_in_polygon
+from ._cache import layer_key, readonly, register_value_key
+from ._registry import LayerComboBox
+from ._mouse import Mode, MouseInteractivityMixin
+from ._typing import MouseEvent
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+    from napari.layers import Points
+
+
+class PointsIndex:
+    """
+    Spatial index of the points in a Points layer.
+
+    A KD-tree is used for the nearest point query and an index array sorted
+    by the y coordinate is used for box and polygon queries. Both are built
+    lazily on the first query and dropped when the layer data is changed.
+    Use ``PointsIndex.of(layer)`` to get the index of a layer.
+    """
+
+    _instances: weakref.WeakKeyDictionary[
+        Points, PointsIndex
+    ] = weakref.WeakKeyDictionary()
+
+    def __init__(self, layer: Points):
+        self._layer_ref = weakref.ref(layer)
+        self._tree = None
+        self._y_order: np.ndarray | None = None
+        self._y_sorted: np.ndarray | None = None
+        layer.events.data.connect(self._invalidate)
+
+    @classmethod
+    def of(cls, layer: Points) -> PointsIndex:
+        """Get the index of the layer."""
+        if (index := cls._instances.get(layer)) is None:
+            index = cls._instances[layer] = cls(layer)
+        return index
+
+    @property
+    def data(self) -> np.ndarray:
+        """Point coordinates in the data space."""
+        layer = self._layer_ref()
+        if layer is None:
+            raise RuntimeError("Points layer has been deleted.")
+        return np.asarray(layer.data)
+
+    def _invalidate(self, *_):
+        self._tree = None
+        self._y_order = None
+        self._y_sorted = None
+
+    def _get_tree(self):
+        if self._tree is None:
+            from scipy.spatial import cKDTree
+
+            self._tree = cKDTree(self.data)
+        return self._tree
+
+    def _get_y_order(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._y_order is None:
+            y = self.data[:, -2]
+            self._y_order = np.argsort(y, kind="stable")
+            self._y_sorted = y[self._y_order]
+        return self._y_order, self._y_sorted
+
+    def _in_slice(self, indices: np.ndarray, point: np.ndarray) -> np.ndarray:
+        """Mask of the points that are in the current slice."""
+        if point.size <= 2:
+            return np.ones(indices.size, dtype=np.bool_)
+        leading = self.data[indices, :-2]
+        return np.all(np.abs(leading - point[:-2]) < 0.5, axis=1)
+
+    def nearest(
+        self, point: ArrayLike, max_distance: float = np.inf, k: int = 8
+    ) -> int | None:
+        """
+        Index of the point nearest to the given point in the same slice.
+
+        Parameters
+        ----------
+        point : array-like
+            Query point in the data space.
+        max_distance : float, optional
+            Points further than this distance are ignored.
+        k : int, default is 8
+            Number of candidates to search for a point in the same slice.
+        """
+        point = np.asarray(point, dtype=np.float64)
+        tree = self._get_tree()
+        if tree.n == 0:
+            return None
+        k = min(k, tree.n)
+        dist, idx = tree.query(point, k=k, distance_upper_bound=max_distance)
+        dist, idx = np.atleast_1d(dist), np.atleast_1d(idx)
+        idx = idx[np.isfinite(dist)]
+        if idx.size == 0:
+            return None
+        idx = idx[self._in_slice(idx, point)]
+        if idx.size == 0:
+            return None
+        return int(idx[0])
+
+    def in_box(self, start: ArrayLike, end: ArrayLike) -> np.ndarray:
+        """
+        Indices of the points in a box of the last two dimensions.
+
+        Parameters
+        ----------
+        start, end : array-like
+            Corners of the box in the data space. Coordinates of the leading
+            dimensions of ``start`` define the current slice.
+        """
+        start = np.asarray(start, dtype=np.float64)
+        end = np.asarray(end, dtype=np.float64)
+        (y0, x0), (y1, x1) = np.sort(np.stack([start[-2:], end[-2:]]), axis=0)
+        order, y_sorted = self._get_y_order()
+        i0, i1 = np.searchsorted(y_sorted, [y0, y1], side="left")
+        candidates = order[i0:i1]
+        x = self.data[candidates, -1]
+        mask = (x0 <= x) & (x < x1)
+        mask &= self._in_slice(candidates, start)
+        return np.sort(candidates[mask])
+
+    def in_polygon(self, polygon: ArrayLike, point: ArrayLike) -> np.ndarray:
+        """
+        Indices of the points in a polygon of the last two dimensions.
+
+        Parameters
+        ----------
+        polygon : (N, 2) array
+            Vertices of the polygon in the data space.
+        point : array-like
+            A point that defines the current slice.
+        """
+        polygon = np.asarray(polygon, dtype=np.float64)
+        point = np.asarray(point, dtype=np.float64)
+        start = point.copy()
+        start[-2:] = polygon.min(axis=0)
+        end = point.copy()
+        end[-2:] = polygon.max(axis=0)
+        candidates = self.in_box(start, end)
+        inside = points_in_polygon(self.data[candidates, -2:], polygon)
+        return candidates[inside]
+
+
+def _pick_radius(layer: Points) -> float:
+    if len(layer.data) == 0:
+        return 0.0
+    return float(np.max(layer.size)) / 2
+
+
+class PointComboBox(Container, MouseInteractivityMixin):
+    def __init__(self, value=UNSET, nullable: bool = False, **kwargs):
+        self._layer_cbox = LayerComboBox("Points")
+        self._spinbox = SpinBox(value=0, min=0, max=1e9, step=1)
+        self._btn = PushButton(text="Select")
+        super().__init__(
+            widgets=[self._layer_cbox, self._spinbox, self._btn],
+            layout="horizontal",
+            **kwargs,
+        )
+        self._layer_cbox.changed.disconnect()
+        self._spinbox.changed.disconnect()
+        self._btn.changed.disconnect()
+        self._layer_cbox.changed.connect(self._emit_changed)
+        self._spinbox.changed.connect(self._index_changed)
+        self._btn.changed.connect(self._switch_mode)
+
+        self.value = value
+        self._mode = Mode.idle
+
+    @property
+    def value(self) -> np.ndarray:
+        """Coordinates of the selected point (a read-only view)."""
+        layer = self.points_layer
+        idx = self._spinbox.value
+        return register_value_key(
+            readonly(np.asarray(layer.data)[idx]),
+            ("OneOfPoints", *layer_key(layer), idx),
+        )
+
+    @value.setter
+    def value(self, point: tuple[Points, int]):
+        if point is UNSET:
+            return
+        self._layer_cbox.value = point[0]
+        self._spinbox.value = point[1]
+
+    @property
+    def points_layer(self) -> Points:
+        """Currently selected points layer."""
+        return self._layer_cbox.value
+
+    def _recipe(self) -> dict:
+        return {"type": "OneOfPoints", "value": self.value.tolist()}
+
+    def _emit_changed(self, *_):
+        layer = self.points_layer
+        if layer is None or self._spinbox.value >= len(layer.data):
+            return
+        self.changed.emit(self.value)
+
+    def _index_changed(self, idx: int):
+        layer = self.points_layer
+        if layer is not None and idx < len(layer.data):
+            layer.selected_data = {idx}
+        self._emit_changed()
+
+    def _activate(self):
+        self._btn.text = "Selecting"
+        viewer = napari.current_viewer()
+        self._freeze_layers(viewer)
+        viewer.mouse_drag_callbacks.append(self._on_click)
+
+    def _deactivate(self):
+        viewer = self._current_viewer
+        self._unfreeze_layers()
+        viewer.mouse_drag_callbacks.remove(self._on_click)
+        self._btn.text = "Select"
+
+    def _on_click(self, viewer: napari.Viewer, event: MouseEvent):
+        init = False
+        try:
+            px0 = event.pos
+            position = event.position
+            yield
+            while event.type == "mouse_move":
+                yield  # do nothing
+            px1 = event.pos
+
+            if np.abs(px0 - px1).sum() < 2:
+                if out := self._get_point_under_cursor(viewer, position):
+                    layer, idx = out
+                    self._layer_cbox.value = layer
+                    self._spinbox.value = idx
+                    init = True
+        finally:
+            if init:
+                self.mode = Mode.idle
+
+    def _get_point_under_cursor(
+        self,
+        viewer: napari.Viewer,
+        pos: np.ndarray,
+    ) -> tuple[Points, int] | None:
+        from napari.layers import Points
+
+        for layer in reversed(viewer.layers):
+            if not isinstance(layer, Points) or not layer.visible:
+                continue
+            point = layer.world_to_data(pos)
+            index = PointsIndex.of(layer)
+            idx = index.nearest(point, max_distance=_pick_radius(layer))
+            if idx is not None:
+                return layer, idx
+        return None
+
+
+class PointSelect(Container, MouseInteractivityMixin):
+    def __init__(self, value=UNSET, nullable: bool = False, **kwargs):
+        self._layer_cbox = LayerComboBox("Points")
+        self._label = Label(value="0 points")
+        self._btn = PushButton(
+            text="Select",
+            tooltip=(
+                "Click or drag a box to select points. Hold Alt while "
+                "dragging to draw a lasso. Hold Shift to add points to the "
+                "current selection."
+            ),
+        )
+        super().__init__(
+            widgets=[self._layer_cbox, self._label, self._btn],
+            layout="horizontal",
+            **kwargs,
+        )
+        self._layer_cbox.changed.disconnect()
+        self._btn.changed.disconnect()
+        self._layer_cbox.changed.connect(self._layer_changed)
+        self._btn.changed.connect(self._switch_mode)
+
+        self._indices = np.zeros(0, dtype=np.intp)
+        self._digest = ""
+        self.value = value
+        self._mode = Mode.idle
+
+    @property
+    def value(self) -> np.ndarray:
+        """Indices of the selected points (read-only)."""
+        out = readonly(self._indices)
+        if (layer := self.points_layer) is None:
+            return out
+        key = ("SomeOfPoints", *layer_key(layer), self._digest)
+        return register_value_key(out, key)
+
+    @value.setter
+    def value(self, points: tuple[Points, ArrayLike]):
+        if points is UNSET:
+            return
+        layer, indices = points
+        self._layer_cbox.value = layer
+        self._set_indices(indices)
+
+    @property
+    def points_layer(self) -> Points:
+        """Currently selected points layer."""
+        return self._layer_cbox.value
+
+    @property
+    def coordinates(self) -> np.ndarray:
+        """Coordinates of the selected points."""
+        return np.asarray(self.points_layer.data)[self._indices]
+
+    def _recipe(self) -> dict:
+        return {
+            "type": "SomeOfPoints",
+            "layer": self.points_layer.name,
+            "indices": self._indices.tolist(),
+        }
+
+    def _set_indices(self, indices: ArrayLike):
+        self._indices = np.unique(np.asarray(indices, dtype=np.intp))
+        self._digest = hashlib.blake2b(self._indices.tobytes()).hexdigest()
+        self._label.value = f"{self._indices.size} points"
+        self.changed.emit(self.value)
+
+    def _layer_changed(self, *_):
+        self._set_indices([])
+
+    def _activate(self):
+        self._btn.text = "Selecting"
+        viewer = napari.current_viewer()
+        self._freeze_layers(viewer)
+        viewer.overlays.interaction_box.points = None
+        viewer.overlays.interaction_box.show = True
+        viewer.cursor.style = "cross"
+        viewer.mouse_drag_callbacks.append(self._on_drag)
+
+    def _deactivate(self):
+        viewer = self._current_viewer
+        viewer.overlays.interaction_box.points = None
+        viewer.cursor.style = "standard"
+        viewer.mouse_drag_callbacks.remove(self._on_drag)
+        self._unfreeze_layers()
+        self._btn.text = "Select"
+
+    def _on_drag(self, viewer: napari.Viewer, event: MouseEvent):
+        box = viewer.overlays.interaction_box
+        try:
+            px0 = event.pos
+            pos0 = event.position
+            pos1 = pos0
+            lasso = "Alt" in event.modifiers
+            path = [pos0]
+            moved = 0.0  # a closed lasso ends near the start
+            yield
+            while event.type == "mouse_move":
+                pos1 = event.position
+                moved = max(moved, np.abs(px0 - event.pos).sum())
+                if lasso:
+                    path.append(pos1)
+                    points = np.stack(path, axis=0)[:, -2:]
+                    box.points = np.stack(
+                        [points.min(axis=0), points.max(axis=0)], axis=0
+                    )
+                else:
+                    points = np.stack([pos0, pos1], axis=0)
+                    box.points = points[:, -2:]
+                yield
+            if (layer := self.points_layer) is None:
+                return
+            index = PointsIndex.of(layer)
+            moved = max(moved, np.abs(px0 - event.pos).sum())
+            if moved < 2:
+                idx = index.nearest(
+                    layer.world_to_data(pos0),
+                    max_distance=_pick_radius(layer),
+                )
+                indices = np.array([] if idx is None else [idx], np.intp)
+            elif lasso:
+                polygon = np.stack([layer.world_to_data(p) for p in path])
+                indices = index.in_polygon(
+                    polygon[:, -2:], layer.world_to_data(pos0)
+                )
+            else:
+                indices = index.in_box(
+                    layer.world_to_data(pos0), layer.world_to_data(pos1)
+                )
+            if "Shift" in event.modifiers:
+                indices = np.concatenate([self._indices, indices])
+            self._set_indices(indices)
+        finally:
+            self.mode = Mode.idle
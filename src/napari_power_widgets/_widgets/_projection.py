@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Callable, Iterator, TYPE_CHECKING
+
+import numpy as np
+from magicgui.widgets import Container, ComboBox
+from magicgui.widgets._bases.value_widget import UNSET
+
+from ._budget import check_budget, memmap_zeros
+from ._cache import ValueSnapshot, layer_key, readonly, register_value_key
+from ._multidim import ZRangeEdit
+from ._registry import LayerComboBox
+
+if TYPE_CHECKING:
+    from napari.layers import Image
+
+# default maximum bytes of a chunk
+_CHUNK_NBYTES = 1 << 26
+
+
+class ProjectionMethod(Enum):
+    """Reduction method of a projection."""
+
+    max = "max"
+    min = "min"
+    sum = "sum"
+    mean = "mean"
+
+
+def _chunk_size(data, axis: int) -> int:
+    """Number of planes per chunk."""
+    if (chunks := getattr(data, "chunks", None)) is not None:
+        # dask or zarr chunks
+        size = chunks[axis]
+        size = size[0] if isinstance(size, tuple) else size
+        return max(int(size), 1)
+    plane = np.prod(data.shape) // max(data.shape[axis], 1)
+    nbytes = int(plane) * np.dtype(data.dtype).itemsize
+    return max(_CHUNK_NBYTES // max(nbytes, 1), 1)
+
+
+def _iter_chunks(
+    data, start: int, stop: int, axis: int, size: int
+) -> Iterator[tuple]:
+    for z0 in range(start, stop, size):
+        sl = [slice(None)] * data.ndim
+        sl[axis] = slice(z0, min(z0 + size, stop))
+        yield tuple(sl)
+
+
+def _reducer(method: ProjectionMethod) -> tuple[Callable, Callable]:
+    """Return (reduce a chunk, combine two partial results)."""
+    if method is ProjectionMethod.max:
+        return (lambda a, axis: a.max(axis=axis)), np.maximum
+    if method is ProjectionMethod.min:
+        return (lambda a, axis: a.min(axis=axis)), np.minimum
+    # sum of the same dtype as np.sum, float64 for mean
+    acc = np.float64 if method is ProjectionMethod.mean else None
+    return (lambda a, axis: a.sum(axis=axis, dtype=acc)), np.add
+
+
+def project_z(
+    data,
+    zrange: tuple[int, int],
+    method: ProjectionMethod | str = "max",
+    axis: int = -3,
+    chunk_size: int | None = None,
+    max_workers: int | None = None,
+) -> np.ndarray:
+    """
+    Project an inclusive range along an axis, chunk by chunk.
+
+    Chunks of planes are read and reduced one by one into an accumulator, so
+    peak memory stays at a chunk (a chunk per worker if ``max_workers`` is
+    given) plus the accumulator, however deep the range is. Works for numpy,
+    memmap, zarr and dask arrays.
+
+    Parameters
+    ----------
+    data : array-like
+        Input array.
+    zrange : (int, int)
+        Inclusive range along ``axis``, as returned by ``ZRange``.
+    method : "max", "min", "sum" or "mean", default is "max"
+        Reduction method.
+    axis : int, default is -3
+        Axis to project.
+    chunk_size : int, optional
+        Number of planes per chunk. The chunk size of chunked arrays, or
+        planes up to 64 MB by default.
+    max_workers : int, optional
+        If given, chunks are read and reduced in a thread pool.
+    """
+    method = ProjectionMethod(method)
+    ndim = data.ndim
+    if ndim < 3:
+        raise ValueError(f"Cannot project a {ndim}D array along Z.")
+    if not -ndim <= axis < ndim:
+        raise ValueError(f"axis {axis} is out of range for {ndim}D data.")
+    if axis < 0:
+        axis += ndim
+    z0, z1 = sorted(zrange)
+    start = max(int(z0), 0)
+    stop = min(int(z1) + 1, data.shape[axis])
+    if stop <= start:
+        raise ValueError(
+            f"Empty range {zrange} for an axis of size {data.shape[axis]}."
+        )
+    if chunk_size is None:
+        chunk_size = _chunk_size(data, axis)
+    reduce, combine = _reducer(method)
+    out_shape = data.shape[:axis] + data.shape[axis + 1 :]
+    if method is ProjectionMethod.mean:
+        out_dtype = np.float64
+    elif method is ProjectionMethod.sum:
+        out_dtype = np.sum(np.zeros(1, dtype=data.dtype)).dtype
+    else:
+        out_dtype = data.dtype
+    if check_budget(out_shape, out_dtype, "ZProjection") is None:
+        acc = None
+    else:
+        acc = memmap_zeros(out_shape, out_dtype)
+    chunks = _iter_chunks(data, start, stop, axis, chunk_size)
+
+    def _work(sl: tuple) -> np.ndarray:
+        return reduce(np.asarray(data[sl]), axis)
+
+    def _iter_parts() -> Iterator[np.ndarray]:
+        if max_workers is None or max_workers <= 1:
+            yield from map(_work, chunks)
+            return
+        with ThreadPoolExecutor(max_workers) as executor:
+            # keep at most max_workers chunks in flight
+            pending = deque()
+            for sl in chunks:
+                pending.append(executor.submit(_work, sl))
+                if len(pending) >= max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    first = True
+    for part in _iter_parts():
+        if acc is None:
+            acc = part
+        elif first:
+            acc[...] = part
+        else:
+            combine(acc, part, out=acc)
+        first = False
+
+    if method is ProjectionMethod.mean:
+        acc /= stop - start
+    return acc
+
+
+class ZProjectionEdit(Container):
+    """
+    A widget for a projection of an image layer over a ZRange.
+
+    The range is selected with a ``ZRangeEdit`` and projected along the third
+    last axis with ``project_z``.
+    """
+
+    def __init__(
+        self,
+        value=UNSET,
+        method: ProjectionMethod | str = "max",
+        max_workers: int | None = None,
+        nullable: bool = False,
+        **kwargs,
+    ):
+        self._image_cbox = LayerComboBox("Image", label="image")
+        self._zrange = ZRangeEdit(label="Z")
+        self._method = ComboBox(
+            choices=[m.value for m in ProjectionMethod],
+            value=ProjectionMethod(method).value,
+            label="method",
+        )
+        self._max_workers = max_workers
+        super().__init__(
+            widgets=[self._image_cbox, self._zrange, self._method],
+            **kwargs,
+        )
+        self.margins = (0, 0, 0, 0)
+        self.value = value
+
+    @property
+    def image_layer(self) -> Image:
+        """Currently selected image layer."""
+        return self._image_cbox.value
+
+    @property
+    def value(self) -> np.ndarray:
+        """Projected image (read-only)."""
+        image = self.image_layer
+        zrange = tuple(self._zrange.value)
+        method = self._method.value
+        out = project_z(
+            self._data(image), zrange, method, max_workers=self._max_workers
+        )
+        return register_value_key(
+            readonly(out), ("ZProjection", *layer_key(image), zrange, method)
+        )
+
+    @value.setter
+    def value(self, value):
+        if value is UNSET:
+            return
+        image, zrange, *method = value
+        self._image_cbox.value = image
+        self._zrange.value = zrange
+        if method:
+            self._method.value = ProjectionMethod(method[0]).value
+
+    def _snapshot(self) -> ValueSnapshot:
+        image = self.image_layer
+        return ValueSnapshot(
+            project_z,
+            self._data(image),
+            tuple(self._zrange.value),
+            self._method.value,
+            -3,
+            None,
+            self._max_workers,
+            layer=image,
+        )
+
+    def _recipe(self) -> dict:
+        return {
+            "type": "ZProjection",
+            "image": self.image_layer.name,
+            "range": [int(v) for v in self._zrange.value],
+            "method": self._method.value,
+        }
+
+    @staticmethod
+    def _data(image: Image):
+        data = image.data[0] if image.multiscale else image.data
+        if image.rgb:
+            raise ValueError("Projection of RGB images is not supported.")
+        return data
@@ -0,0 +1,138 @@
+"""Per-viewer registry of typed layer lists."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+import weakref
+
+from magicgui.widgets import ComboBox, Widget
+
+from ._cache import object_token
+from ._utils import find_viewer_ancestor
+
+if TYPE_CHECKING:
+    import napari
+    from napari.components import LayerList
+    from napari.layers import Layer
+
+_LayerTypes = tuple  # names of napari.layers classes
+
+
+def _resolve_types(names: _LayerTypes) -> tuple[type, ...]:
+    from napari import layers
+
+    return tuple(getattr(layers, name) for name in names)
+
+
+class LayerRegistry:
+    """
+    Typed layer lists of a viewer kept up to date from ``layers.events``.
+
+    A list of the layers of the given types is built by one scan on first
+    request. It is invalidated, and its version is incremented, only when a
+    layer of the types is inserted or removed, or the layers are reordered.
+    """
+
+    def __init__(self, layers: LayerList):
+        self._layers = layers
+        self._lists: dict[_LayerTypes, list[Layer]] = {}
+        self._versions: dict[_LayerTypes, int] = {}
+        events = layers.events
+        # invalidate before the widgets refresh their choices. ``move``
+        # emits both "moved" and "reordered", so only the latter is used.
+        for emitter, callback in [
+            (events.inserted, self._on_inserted_or_removed),
+            (events.removed, self._on_inserted_or_removed),
+            (events.reordered, self._on_reordered),
+        ]:
+            emitter.connect(callback, position="first")
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(cached={list(self._lists)})"
+
+    def layers(self, *types: str) -> list[Layer]:
+        """Layers of the given types (names in ``napari.layers``)."""
+        if (out := self._lists.get(types)) is None:
+            classes = _resolve_types(types)
+            out = [x for x in self._layers if isinstance(x, classes)]
+            self._lists[types] = out
+            self._versions.setdefault(types, 0)
+        return list(out)
+
+    def version(self, *types: str) -> int:
+        """Version of the layer list of the given types."""
+        return self._versions.get(types, 0)
+
+    def _invalidate(self, key: _LayerTypes) -> None:
+        self._lists.pop(key, None)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _known_types(self) -> list[_LayerTypes]:
+        return list(self._lists.keys() | self._versions.keys())
+
+    def _on_inserted_or_removed(self, event) -> None:
+        layer = event.value
+        for key in self._known_types():
+            if isinstance(layer, _resolve_types(key)):
+                self._invalidate(key)
+
+    def _on_reordered(self, event=None) -> None:
+        for key in self._known_types():
+            self._invalidate(key)
+
+
+_registries: weakref.WeakKeyDictionary[
+    napari.Viewer, LayerRegistry
+] = weakref.WeakKeyDictionary()
+
+
+def layer_registry(viewer: napari.Viewer) -> LayerRegistry:
+    """The layer registry of a viewer."""
+    if (registry := _registries.get(viewer)) is None:
+        registry = _registries[viewer] = LayerRegistry(viewer.layers)
+    return registry
+
+
+def get_layers(widget: Widget, *types: str) -> list[Layer]:
+    """Layers of the given types in the viewer of a widget."""
+    if viewer := find_viewer_ancestor(widget.native):
+        return layer_registry(viewer).layers(*types)
+    return []
+
+
+class LayerComboBox(ComboBox):
+    """
+    A ComboBox of the layers of given types.
+
+    The choices are read from the layer registry of the viewer, and
+    ``reset_choices`` is skipped unless the list of the types has changed.
+    """
+
+    def __init__(self, layer_types: str | tuple[str, ...], **kwargs):
+        if isinstance(layer_types, str):
+            layer_types = (layer_types,)
+        self._layer_types = tuple(layer_types)
+        self._choices_state: tuple[int, int] | None = None
+        kwargs.setdefault("nullable", False)
+        super().__init__(choices=self._get_layers, **kwargs)
+
+    @property
+    def layer_types(self) -> tuple[str, ...]:
+        """Names of the layer types."""
+        return self._layer_types
+
+    def _get_layers(self, w: Widget | None = None) -> list[Layer]:
+        return get_layers(self, *self._layer_types)
+
+    def reset_choices(self, *_) -> None:
+        if viewer := find_viewer_ancestor(self.native):
+            registry = layer_registry(viewer)
+            state = (
+                object_token(registry),
+                registry.version(*self._layer_types),
+            )
+            if state == self._choices_state:
+                return None
+            self._choices_state = state
+        super().reset_choices()
+        return None
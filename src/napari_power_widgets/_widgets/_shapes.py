@@ -8,18 +8,20 @@ from magicgui.widgets import Container, ComboBox, Select
 from magicgui.widgets._bases import CategoricalWidget
 from magicgui.widgets._bases.value_widget import UNSET
 
+from ._registry import LayerComboBox
 from ._utils import find_viewer_ancestor
+from ._cache import ValueList, layer_key, readonly, register_value_key
+from ._geometry import rasterize_shapes, shapes_dtype, _FILLABLE
+from ._budget import zeros
+from ._transform import (
+    apply_affine,
+    data_to_data,
+    data_to_world_matrix,
+    world_to_data,
+)
 
 if TYPE_CHECKING:
-    from napari.layers import Shapes
-
-
-def _get_shapes_layer(w: CategoricalWidget):
-    from napari.layers import Shapes
-
-    if viewer := find_viewer_ancestor(w.native):
-        return [x for x in viewer.layers if isinstance(x, Shapes)]
-    return []
+    from napari.layers import Image, Shapes
 
 
 class ShapeComboBox(Container):
@@ -35,7 +37,7 @@ class ShapeComboBox(Container):
         if filter is None:
             filter = ["line", "polygon", "rectangle", "ellipse", "path"]
         self._filter = filter
-        self._layer_cbox = ComboBox(choices=_get_shapes_layer, nullable=False)
+        self._layer_cbox = LayerComboBox("Shapes")
         self._shape_cbox = self._shape_selection_widget_cls(
             choices=self._get_available_shape_id, nullable=False
         )
@@ -52,7 +54,12 @@ class ShapeComboBox(Container):
 
     @property
     def value(self) -> np.ndarray:
-        return self.shapes_layer.data[self._shape_cbox.value]
+        """Data of the selected shape (read-only)."""
+        layer = self.shapes_layer
+        idx = self._shape_cbox.value
+        return register_value_key(
+            readonly(layer.data[idx]), ("OneOfShapes", *layer_key(layer), idx)
+        )
 
     @value.setter
     def value(self, shape: tuple[Shapes, int]):
@@ -61,6 +68,9 @@ class ShapeComboBox(Container):
         self._layer_cbox.value = shape[0]
         self._shape_cbox.value = shape[1]
 
+    def _recipe(self) -> dict:
+        return {"type": "OneOfShapes", "vertices": self.value.tolist()}
+
     @property
     def shapes_layer(self) -> Shapes:
         """Currently selected shapes layer."""
@@ -111,6 +121,30 @@ class ShapeComboBox(Container):
 class ShapeSelect(ShapeComboBox):
     _shape_selection_widget_cls = Select
 
+    @property
+    def value(self) -> list[np.ndarray]:
+        """List of data of the selected shapes (read-only)."""
+        layer = self.shapes_layer
+        indices = tuple(self._shape_cbox.value)
+        data = layer.data
+        return register_value_key(
+            ValueList(readonly(data[i]) for i in indices),
+            ("SomeOfShapes", *layer_key(layer), indices),
+        )
+
+    def _recipe(self) -> dict:
+        return {
+            "type": "SomeOfShapes",
+            "vertices": [data.tolist() for data in self.value],
+        }
+
+    @value.setter
+    def value(self, shapes: tuple[Shapes, Sequence[int]]):
+        if shapes is UNSET:
+            return
+        self._layer_cbox.value = shapes[0]
+        self._shape_cbox.value = shapes[1]
+
     def _focus_on_selected_shape(self, indices: Sequence[int]):
         if len(indices) < 1:
             return
@@ -123,3 +157,114 @@ class ShapeSelect(ShapeComboBox):
             center = np.mean(data[:, :-2], axis=0)
             viewer = find_viewer_ancestor(self)
             viewer.dims.set_current_step(range(ndim - 2), center[0])
+
+
+class ShapesMaskSelect(ShapeSelect):
+    """
+    Shape selection rasterized into a mask over a target image layer.
+
+    Parameters
+    ----------
+    output : "mask" or "labels", default is "mask"
+        Return a boolean mask, or a label image where the i-th selected shape
+        is labeled i + 1.
+    """
+
+    def __init__(
+        self,
+        value=UNSET,
+        nullable=False,
+        filter: list[str] | None = None,
+        output: str = "mask",
+        **kwargs,
+    ):
+        if output not in ("mask", "labels"):
+            raise ValueError(
+                f"output must be 'mask' or 'labels', got {output!r}."
+            )
+        if filter is None:
+            filter = list(_FILLABLE)
+        self._output = output
+        self._image_cbox = LayerComboBox("Image")
+        super().__init__(value, nullable=nullable, filter=filter, **kwargs)
+        self.append(self._image_cbox)
+
+    @property
+    def value(self) -> np.ndarray:
+        """Mask or label image of the selected shapes (read-only)."""
+        shapes = self.shapes_layer
+        image: Image = self._image_cbox.value
+        indices = tuple(self._shape_cbox.value)
+        shape = self._image_shape(image)
+        labels = self._output == "labels"
+        out = rasterize_shapes(
+            self._image_coords(indices),
+            [shapes.shape_type[i] for i in indices],
+            shape,
+            labels=labels,
+            out=zeros(shape, shapes_dtype(len(indices), labels), "ShapesMask"),
+        )
+        return register_value_key(
+            readonly(out),
+            (
+                "ShapesMask",
+                *layer_key(shapes),
+                indices,
+                *layer_key(image),
+                self._output,
+            ),
+        )
+
+    @value.setter
+    def value(self, shapes: tuple[Shapes, Sequence[int]]):
+        if shapes is UNSET:
+            return
+        self._layer_cbox.value = shapes[0]
+        self._shape_cbox.value = shapes[1]
+
+    def _recipe(self) -> dict:
+        shapes = self.shapes_layer
+        indices = tuple(self._shape_cbox.value)
+        return {
+            "type": "ShapesMask",
+            "image": self._image_cbox.value.name,
+            "vertices": [v.tolist() for v in self._image_coords(indices)],
+            "shape_types": [shapes.shape_type[i] for i in indices],
+            "output": self._output,
+        }
+
+    @property
+    def image_layer(self) -> Image:
+        """Currently selected target image layer."""
+        return self._image_cbox.value
+
+    @staticmethod
+    def _image_shape(image: Image) -> tuple[int, ...]:
+        shape = image.level_shapes[0] if image.multiscale else image.data.shape
+        if image.rgb:
+            shape = shape[:-1]
+        return tuple(int(s) for s in shape)
+
+    def _image_coords(self, indices: Sequence[int]) -> list[np.ndarray]:
+        """Vertices of the shapes in the data coordinates of the image."""
+        shapes = self.shapes_layer
+        image = self.image_layer
+        data = [shapes.data[i] for i in indices]
+        if not data:
+            return data
+        # transform all the vertices at once
+        vertices = np.concatenate(data, axis=0)
+        if shapes.ndim == image.ndim:
+            coords = data_to_data(shapes, image, vertices)
+        else:
+            # the axes missing in the shapes are taken from the current slice
+            ndim = max(shapes.ndim, image.ndim)
+            world = np.zeros((vertices.shape[0], ndim))
+            if viewer := find_viewer_ancestor(self.native):
+                point = np.asarray(viewer.dims.point)[-ndim:]
+                world[:, ndim - point.size :] = point
+            world[:, -shapes.ndim :] = apply_affine(
+                data_to_world_matrix(shapes), vertices
+            )
+            coords = world_to_data(image, world[:, -image.ndim :])
+        return np.split(coords, np.cumsum([len(v) for v in data])[:-1])
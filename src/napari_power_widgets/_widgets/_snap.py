@@ -0,0 +1,132 @@
+"""Snapping of clicked points to local maxima or label centroids."""
+
+from __future__ import annotations
+
+from enum import Enum
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from ._cache import LRUCache, layer_key
+
+if TYPE_CHECKING:
+    import napari
+    from napari.layers import Layer
+
+
+class SnapMode(Enum):
+    """Snapping target."""
+
+    maxima = "maxima"  # local maxima of an Image layer
+    centroid = "centroid"  # centroids of labels in a Labels layer
+
+
+class SnapIndex:
+    """KD-tree of the snapping targets in a 2D plane."""
+
+    def __init__(self, coords: np.ndarray):
+        from scipy.spatial import cKDTree
+
+        self._coords = coords
+        self._tree = cKDTree(coords) if coords.shape[0] > 0 else None
+
+    def __len__(self) -> int:
+        return self._coords.shape[0]
+
+    def nearest(
+        self, point: np.ndarray, max_distance: float = np.inf
+    ) -> np.ndarray | None:
+        """Coordinates of the nearest target, or None if not found."""
+        if self._tree is None:
+            return None
+        dist, idx = self._tree.query(point, distance_upper_bound=max_distance)
+        if not np.isfinite(dist):
+            return None
+        return self._coords[idx]
+
+
+def _local_maxima(plane: np.ndarray, size: int) -> np.ndarray:
+    from scipy import ndimage as ndi
+
+    filtered = ndi.maximum_filter(plane, size=size, mode="nearest")
+    mask = plane == filtered
+    # flat background is not a maximum
+    mask &= plane > plane.min()
+    return np.stack(np.nonzero(mask), axis=1).astype(np.float64)
+
+
+def _centroids(plane: np.ndarray) -> np.ndarray:
+    from scipy import ndimage as ndi
+
+    ids = np.unique(plane)
+    ids = ids[ids != 0]
+    if ids.size == 0:
+        return np.zeros((0, 2), dtype=np.float64)
+    centers = ndi.center_of_mass(np.ones(plane.shape, np.uint8), plane, ids)
+    return np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+
+
+# (mode, layer token, data version, slice, size) -> SnapIndex
+_INDEX_CACHE = LRUCache(maxsize=32)
+
+
+def get_snap_index(
+    layer: Layer,
+    slice_key: tuple[int, ...],
+    mode: SnapMode,
+    size: int = 3,
+) -> SnapIndex:
+    """
+    Get the snapping index of a 2D plane of the layer.
+
+    Indices are built with vectorized filters on the first request and cached
+    per (layer, data version, slice) with LRU eviction.
+    """
+    key = (mode, *layer_key(layer), slice_key, size)
+
+    def _build() -> SnapIndex:
+        data = layer.data[0] if layer.multiscale else layer.data
+        plane = np.asarray(data[slice_key])
+        if mode is SnapMode.maxima:
+            return SnapIndex(_local_maxima(plane, size))
+        return SnapIndex(_centroids(plane))
+
+    return _INDEX_CACHE.get_or_create(key, _build)
+
+
+def snap_position(
+    viewer: napari.Viewer,
+    position: np.ndarray,
+    mode: SnapMode | str,
+    radius: float,
+) -> np.ndarray | None:
+    """
+    Snap a world position to the nearest target of the topmost layer.
+
+    Maxima are searched in the topmost visible Image layer and centroids in
+    the topmost visible Labels layer. ``radius`` is the maximum snapping
+    distance in pixels of the layer. Returns None if no target is found.
+    """
+    from napari.layers import Image, Labels
+
+    mode = SnapMode(mode)
+    layer_type = Image if mode is SnapMode.maxima else Labels
+    for layer in reversed(viewer.layers):
+        if not isinstance(layer, layer_type) or not layer.visible:
+            continue
+        if layer.ndim < 2 or getattr(layer, "rgb", False):
+            continue
+        point = np.asarray(layer.world_to_data(position), dtype=np.float64)
+        shape = layer.level_shapes[0] if layer.multiscale else layer.data.shape
+        slice_key = tuple(
+            int(np.clip(round(p), 0, s - 1))
+            for p, s in zip(point[:-2], shape[:-2])
+        )
+        size = 2 * max(int(round(radius)), 1) + 1
+        index = get_snap_index(layer, slice_key, mode, size)
+        snapped = index.nearest(point[-2:], max_distance=radius)
+        if snapped is None:
+            continue
+        point[-2:] = snapped
+        return np.asarray(layer.data_to_world(point), dtype=np.float64)
+    return None
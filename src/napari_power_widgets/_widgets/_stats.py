@@ -0,0 +1,206 @@
+"""Box statistics read from cached summed-area tables."""
+
+from __future__ import annotations
+
+from typing import NamedTuple, TYPE_CHECKING
+
+import numpy as np
+from magicgui.widgets import Container, Label
+from magicgui.widgets._bases.value_widget import UNSET
+
+from ._budget import zeros
+from ._cache import LRUCache, layer_key
+from ._coordinate import BoxSelector
+from ._transform import world_to_data
+from ._registry import LayerComboBox
+from ._utils import find_viewer_ancestor
+
+if TYPE_CHECKING:
+    from napari.layers import Image
+
+# (layer token, data version, leading indices) -> IntegralImage
+_TABLES = LRUCache(maxsize=4)
+
+
+class BoxStats(NamedTuple):
+    """Statistics of the pixels in a box."""
+
+    sum: float
+    mean: float
+    var: float
+    count: int
+
+
+class IntegralImage:
+    """
+    Summed-area tables of a 2D plane.
+
+    The tables of the values and the squared values, shifted by the mean of
+    the plane for numerical stability, are built once in O(N). Statistics of
+    any box are then read from four lookups per table.
+    """
+
+    def __init__(self, plane):
+        plane = np.asarray(plane)
+        if plane.ndim != 2:
+            raise ValueError(f"Expected a 2D plane, got {plane.ndim}D.")
+        self._shape = plane.shape
+        self._shift = float(plane.mean()) if plane.size > 0 else 0.0
+        diff = plane.astype(np.float64) - self._shift
+        self._s1 = self._table(diff)
+        np.multiply(diff, diff, out=diff)
+        self._s2 = self._table(diff)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(shape={self._shape})"
+
+    def _table(self, arr: np.ndarray) -> np.ndarray:
+        h, w = arr.shape
+        out = zeros((h + 1, w + 1), np.float64, "BoxStatistics table")
+        inner = out[1:, 1:]
+        np.cumsum(arr, axis=0, out=inner)
+        np.cumsum(inner, axis=1, out=inner)
+        return out
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Shape of the plane."""
+        return self._shape
+
+    @property
+    def nbytes(self) -> int:
+        return self._s1.nbytes + self._s2.nbytes
+
+    def _pixel_range(self, r: tuple[float, float], size: int) -> tuple:
+        """Pixels whose centers are in the closed range."""
+        v0, v1 = sorted(r)
+        lo = min(max(int(np.ceil(v0)), 0), size)
+        hi = min(max(int(np.floor(v1)) + 1, lo), size)
+        return lo, hi
+
+    def stats(
+        self, y: tuple[float, float], x: tuple[float, float]
+    ) -> BoxStats:
+        """Statistics of the pixels in the box, in O(1)."""
+        y0, y1 = self._pixel_range(y, self._shape[0])
+        x0, x1 = self._pixel_range(x, self._shape[1])
+        n = (y1 - y0) * (x1 - x0)
+        if n == 0:
+            return BoxStats(0.0, np.nan, np.nan, 0)
+        s1, s2 = (
+            t[y1, x1] - t[y0, x1] - t[y1, x0] + t[y0, x0]
+            for t in (self._s1, self._s2)
+        )
+        mean = s1 / n
+        var = max(s2 / n - mean * mean, 0.0)
+        return BoxStats(
+            float(s1 + n * self._shift), float(mean + self._shift), var, n
+        )
+
+
+def integral_image(image: Image, index: tuple[int, ...]) -> IntegralImage:
+    """The cached integral image of a plane of an image layer."""
+    key = (*layer_key(image), index)
+
+    def _create():
+        data = image.data[0] if image.multiscale else image.data
+        return IntegralImage(data[index])
+
+    return _TABLES.get_or_create(key, _create)
+
+
+class BoxStatisticsEdit(Container):
+    """
+    A box selector with a live readout of the statistics of an image.
+
+    Sum, mean and variance in the box are read from a summed-area table of
+    the current plane of the image, so the readout is updated at every
+    mouse move while dragging. The tables of the recently used planes are
+    cached.
+    """
+
+    def __init__(self, value=UNSET, nullable: bool = False, **kwargs):
+        self._image_cbox = LayerComboBox("Image", label="image")
+        self._box = BoxSelector(label="box")
+        self._readout = Label(value="", label="stats")
+        super().__init__(
+            widgets=[self._image_cbox, self._box, self._readout], **kwargs
+        )
+        self.margins = (0, 0, 0, 0)
+        self._image_cbox.changed.disconnect()
+        self._box.changed.disconnect()
+        self._readout.changed.disconnect()
+        self._image_cbox.changed.connect(self._emit_changed)
+        self._box.changed.connect(self._emit_changed)
+        self.value = value
+
+    @property
+    def image_layer(self) -> Image:
+        """Currently selected image layer."""
+        return self._image_cbox.value
+
+    @property
+    def dragging(self) -> bool:
+        return self._box.dragging
+
+    @property
+    def value(self) -> BoxStats:
+        """Statistics of the image in the box."""
+        image = self.image_layer
+        if image.rgb:
+            raise ValueError("Statistics of RGB images are not supported.")
+        index, y, x = self._data_box(image)
+        return integral_image(image, index).stats(y, x)
+
+    @value.setter
+    def value(self, value):
+        if value is UNSET:
+            return
+        image, box = value
+        self._image_cbox.value = image
+        self._box.value = box
+
+    def _data_box(self, image: Image) -> tuple[tuple[int, ...], tuple, tuple]:
+        """Plane index and the box in the data coordinates of the image."""
+        (wy0, wy1), (wx0, wx1) = self._box.value
+        corners = np.array(
+            [[wy0, wx0], [wy0, wx1], [wy1, wx0], [wy1, wx1]], dtype=np.float64
+        )
+        leading = None
+        if viewer := find_viewer_ancestor(self.native):
+            leading = np.asarray(viewer.dims.point)
+            point = world_to_data(image, leading[-image.ndim :])
+            index = tuple(int(round(v)) for v in point[:-2])
+            leading = leading[:-2]
+        else:
+            index = (0,) * (image.ndim - 2)
+        shape = image.level_shapes[0] if image.multiscale else image.data.shape
+        index = tuple(min(max(i, 0), s - 1) for i, s in zip(index, shape[:-2]))
+        data = world_to_data(image, corners, leading)
+        lo, hi = data.min(axis=0), data.max(axis=0)
+        return index, (lo[0], hi[0]), (lo[1], hi[1])
+
+    def _emit_changed(self, *_):
+        if self.image_layer is None:
+            self._readout.value = ""
+            return
+        try:
+            s = self.value
+        except ValueError as e:  # such as an RGB image
+            self._readout.value = str(e)
+            return
+        self._readout.value = (
+            f"sum={s.sum:.4g}, mean={s.mean:.4g}, var={s.var:.4g}, n={s.count}"
+        )
+        self.changed.emit(s)
+
+    def _recipe(self) -> dict:
+        image = self.image_layer
+        index, y, x = self._data_box(image)
+        return {
+            "type": "BoxStatistics",
+            "image": image.name,
+            "index": list(index),
+            "y": [float(v) for v in y],
+            "x": [float(v) for v in x],
+        }
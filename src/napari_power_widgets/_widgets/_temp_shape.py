@@ -5,7 +5,6 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any
 import numpy as np
 
-from magicgui.widgets import Table
 from magicgui.widgets._bases.value_widget import UNSET
 
 import napari
@@ -13,6 +12,7 @@ import napari
 from ._buttoned import ButtonedValueWidget
 from ._mouse import MouseInteractivityMixin, Mode
 from ._typing import MouseEvent
+from ._utils import LazyTable
 
 if TYPE_CHECKING:
     from numpy.typing import ArrayLike
@@ -24,14 +24,9 @@ class _ShapeDataEdit(ButtonedValueWidget, MouseInteractivityMixin):
 
     def __init__(self, value=UNSET, nullable=False, **kwargs):
         self._table_data = self._init_data()
-        data_table = Table(
-            value=self._table_data, columns=["Y", "X"], name="data"
-        )
-        data_table.min_height = 30
-        data_table.max_height = 120
-        data_table.read_only = True
-        self._table = data_table
-        super().__init__(data_table, text="Draw", **kwargs)
+        # the native table is built on the first show
+        self._table = LazyTable(self._table_data, columns=["Y", "X"])
+        super().__init__(self._table, text="Draw", **kwargs)
 
         self.value = value
         self._layer: Shapes | None = None
@@ -54,7 +49,16 @@ class _ShapeDataEdit(ButtonedValueWidget, MouseInteractivityMixin):
             return
         value = self._validate_data(value)
         self._table_data = value
-        self._table.data = value
+        self._table.set_data(value)
+
+    def _recipe(self) -> dict:
+        return {"type": "ShapeData", "vertices": self.value.tolist()}
+
+    def _preview(self, factor: int) -> np.ndarray:
+        # leading coordinates select the plane and are not downsampled
+        out = np.array(self.value, dtype=np.float64)
+        out[..., -2:] /= factor
+        return out
 
     def _activate(self):
         self._btn.text = "Drawing"
@@ -102,6 +106,7 @@ class _ShapeDataEdit(ButtonedValueWidget, MouseInteractivityMixin):
                 self._layer.mode = self.SHAPE_MODE
 
     def _on_drag(self, layer: Shapes, event: MouseEvent):
+        self._start_drag()
         try:
             yield
             if layer.nshapes > 0 and layer.selected_data == set():
@@ -116,6 +121,8 @@ class _ShapeDataEdit(ButtonedValueWidget, MouseInteractivityMixin):
             layer.selected_data = {0}
         except Exception:
             self.mode = Mode.idle
+        finally:
+            self._finish_drag()
 
     def _on_button_clicked(self):
         self._switch_mode()
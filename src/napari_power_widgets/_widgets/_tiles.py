@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import math
+from typing import Callable, Iterator, NamedTuple, Tuple, TYPE_CHECKING
+
+import numpy as np
+from magicgui.widgets import SpinBox
+from magicgui.widgets._bases.value_widget import UNSET
+
+from ._budget import zeros
+from ._coordinate import BoxSelector
+
+if TYPE_CHECKING:
+    from ._coordinate import _RangeLike
+
+_Slices2D = Tuple[slice, slice]
+
+
+class Tile(NamedTuple):
+    """
+    Slices of a tile.
+
+    ``read`` is the tile with the halo (overlap) in the data, ``write`` is
+    the tile without the halo in the data, ``crop`` is ``write`` relative to
+    ``read`` and ``local`` is ``write`` relative to the box origin.
+    """
+
+    read: _Slices2D
+    write: _Slices2D
+    crop: _Slices2D
+    local: _Slices2D
+
+
+class TiledBox:
+    """
+    A box region split into tiles.
+
+    Parameters
+    ----------
+    y, x : (float, float)
+        Ranges of the box in the data coordinates. Rounded outward to
+        integers.
+    tile_size : int or (int, int), default is 1024
+        Size of a tile without the halo.
+    overlap : int, default is 0
+        Width of the halo added to each side of a tile for reading.
+    shape : (int, int), optional
+        Shape of the last two axes of the data. The box and halos are clipped
+        to it.
+    """
+
+    def __init__(
+        self,
+        y: tuple[float, float],
+        x: tuple[float, float],
+        tile_size: int | tuple[int, int] = 1024,
+        overlap: int = 0,
+        shape: tuple[int, int] | None = None,
+    ):
+        if isinstance(tile_size, int):
+            tile_size = (tile_size, tile_size)
+        tile_size = tuple(int(s) for s in tile_size)
+        if min(tile_size) <= 0:
+            raise ValueError(f"tile_size must be positive, got {tile_size}.")
+        if overlap < 0:
+            raise ValueError(f"overlap must be non-negative, got {overlap}.")
+        bounds = []
+        for i, (v0, v1) in enumerate([sorted(y), sorted(x)]):
+            lo = max(int(math.floor(v0)), 0)
+            hi = int(math.ceil(v1))
+            if shape is not None:
+                hi = min(hi, int(shape[i]))
+            bounds.append((lo, max(lo, hi)))
+        self._bounds = tuple(bounds)
+        self._tile_size = tile_size
+        self._overlap = int(overlap)
+        self._shape = None if shape is None else tuple(shape[-2:])
+
+    def __repr__(self) -> str:
+        (y0, y1), (x0, x1) = self._bounds
+        return (
+            f"{self.__class__.__name__}(y=({y0}, {y1}), x=({x0}, {x1}), "
+            f"tile_size={self._tile_size}, overlap={self._overlap})"
+        )
+
+    @property
+    def slices(self) -> _Slices2D:
+        """Slices of the whole box."""
+        return tuple(slice(lo, hi) for lo, hi in self._bounds)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Shape of the box."""
+        return tuple(hi - lo for lo, hi in self._bounds)
+
+    @property
+    def tile_size(self) -> tuple[int, int]:
+        return self._tile_size
+
+    @property
+    def overlap(self) -> int:
+        return self._overlap
+
+    @property
+    def grid_shape(self) -> tuple[int, int]:
+        """Number of tiles along each axis."""
+        return tuple(
+            -(-size // ts) for size, ts in zip(self.shape, self._tile_size)
+        )
+
+    def __len__(self) -> int:
+        ny, nx = self.grid_shape
+        return ny * nx
+
+    def __iter__(self) -> Iterator[Tile]:
+        """Iterate over the tiles in C order."""
+        origin = [lo for lo, _ in self._bounds]
+        limit = self._shape or (None, None)
+        ov = self._overlap
+        axes = []
+        for (lo, hi), ts, o, lim in zip(
+            self._bounds, self._tile_size, origin, limit
+        ):
+            ranges = []
+            for w0 in range(lo, hi, ts):
+                w1 = min(w0 + ts, hi)
+                r0 = max(w0 - ov, 0)
+                r1 = w1 + ov if lim is None else min(w1 + ov, lim)
+                ranges.append(
+                    (
+                        slice(r0, r1),
+                        slice(w0, w1),
+                        slice(w0 - r0, w1 - r0),
+                        slice(w0 - o, w1 - o),
+                    )
+                )
+            axes.append(ranges)
+        for ry in axes[0]:
+            for rx in axes[1]:
+                yield Tile(*zip(ry, rx))
+
+    def with_shape(self, shape: tuple[int, ...]) -> TiledBox:
+        """A copy clipped to the last two axes of ``shape``."""
+        (y0, y1), (x0, x1) = self._bounds
+        return TiledBox(
+            (y0, y1), (x0, x1), self._tile_size, self._overlap, shape[-2:]
+        )
+
+    def map(
+        self,
+        func: Callable[[np.ndarray], np.ndarray],
+        data,
+        out: np.ndarray | None = None,
+        max_workers: int | None = None,
+    ) -> np.ndarray:
+        """
+        Apply a function to every tile of ``data`` and stitch the results.
+
+        ``func`` is called with ``data[..., tile.read]`` and must return an
+        array of the same shape in the last two axes. The halo is cropped
+        and the result is written into ``out`` of shape
+        ``leading + box.shape``, which is allocated within the memory budget
+        if not given. At most ``max_workers`` tiles are in flight at once.
+        """
+        tiled = self.with_shape(data.shape)
+
+        def _work(tile: Tile) -> tuple[Tile, np.ndarray]:
+            return tile, np.asarray(func(np.asarray(data[(...,) + tile.read])))
+
+        def _iter_results() -> Iterator[tuple[Tile, np.ndarray]]:
+            if max_workers is None or max_workers <= 1:
+                yield from map(_work, tiled)
+                return
+            with ThreadPoolExecutor(max_workers) as executor:
+                pending = deque()
+                for tile in tiled:
+                    pending.append(executor.submit(_work, tile))
+                    if len(pending) >= max_workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+
+        for tile, result in _iter_results():
+            if out is None:
+                out = zeros(
+                    result.shape[:-2] + tiled.shape,
+                    result.dtype,
+                    "TiledBoxSelection output",
+                )
+            out[(...,) + tile.local] = result[(...,) + tile.crop]
+        if out is None:
+            out = np.zeros(data.shape[:-2] + tiled.shape, dtype=data.dtype)
+        return out
+
+
+class TiledBoxSelector(BoxSelector):
+    """
+    A ``BoxSelector`` with tile size and overlap.
+
+    The value is a ``TiledBox`` that yields the tiles of the selected box.
+    """
+
+    def __init__(
+        self,
+        value: tuple[_RangeLike, _RangeLike] = UNSET,
+        tile_size: int = 1024,
+        overlap: int = 0,
+        ordered: bool = True,
+        nullable: bool = False,
+        **kwargs,
+    ):
+        self._tile_size = SpinBox(
+            value=tile_size, min=1, max=1 << 20, label="tile"
+        )
+        self._overlap = SpinBox(
+            value=overlap, min=0, max=1 << 16, label="overlap"
+        )
+        super().__init__(value, ordered=ordered, nullable=nullable, **kwargs)
+
+    @property
+    def value(self) -> TiledBox:
+        """The selected box split into tiles."""
+        return TiledBox(
+            self._yrange.value,
+            self._xrange.value,
+            self._tile_size.value,
+            self._overlap.value,
+        )
+
+    @value.setter
+    def value(self, value):
+        if isinstance(value, TiledBox):
+            self._tile_size.value = value.tile_size[0]
+            self._overlap.value = value.overlap
+            value = value.slices
+        BoxSelector.value.fset(self, value)
+
+    def _recipe(self) -> dict:
+        box = self.value
+        return {
+            "type": "TiledBoxSelection",
+            "y": list(self._yrange.value),
+            "x": list(self._xrange.value),
+            "tile_size": box.tile_size[0],
+            "overlap": box.overlap,
+        }
+
+    def _preview(self, factor: int) -> TiledBox:
+        return TiledBox(
+            [v / factor for v in self._yrange.value],
+            [v / factor for v in self._xrange.value],
+            max(self._tile_size.value // factor, 1),
+            self._overlap.value // factor,
+        )
+
+    def _setup_container(self):
+        super()._setup_container()
+        self._range_container.extend([self._tile_size, self._overlap])
+        return None
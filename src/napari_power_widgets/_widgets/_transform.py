@@ -0,0 +1,182 @@
+"""Cached world-to-data transforms and data-space widget variants."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+import weakref
+
+import numpy as np
+from magicgui.widgets import Container
+from magicgui.widgets._bases import Widget
+from magicgui.widgets._bases.value_widget import UNSET
+
+from ._registry import LayerComboBox
+from ._utils import find_viewer_ancestor
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+    from napari.layers import Layer
+
+# events that change the data-to-world transform of a layer
+_TRANSFORM_EVENTS = ("scale", "translate", "rotate", "shear", "affine")
+
+# layer -> (world-to-data, data-to-world) homogeneous matrices
+_MATRICES: weakref.WeakKeyDictionary[
+    Layer, tuple[np.ndarray, np.ndarray]
+] = weakref.WeakKeyDictionary()
+_CONNECTED: weakref.WeakSet[Layer] = weakref.WeakSet()
+
+
+def _invalidate(ref: weakref.ReferenceType[Layer], *_):
+    if (layer := ref()) is not None:
+        _MATRICES.pop(layer, None)
+
+
+def _matrices(layer: Layer) -> tuple[np.ndarray, np.ndarray]:
+    if (out := _MATRICES.get(layer)) is not None:
+        return out
+    if layer not in _CONNECTED:
+        ref = weakref.ref(layer)
+        for name in _TRANSFORM_EVENTS:
+            if (emitter := getattr(layer.events, name, None)) is not None:
+                emitter.connect(lambda *_, ref=ref: _invalidate(ref))
+        _CONNECTED.add(layer)
+    forward = np.asarray(layer._data_to_world.affine_matrix, np.float64)
+    out = np.linalg.inv(forward), forward
+    for mat in out:
+        mat.flags.writeable = False
+    _MATRICES[layer] = out
+    return out
+
+
+def world_to_data_matrix(layer: Layer) -> np.ndarray:
+    """
+    Homogeneous (D+1, D+1) matrix from world to the data of a layer.
+
+    The matrix is cached per layer and invalidated when the scale,
+    translate, rotate, shear or affine of the layer changes.
+    """
+    return _matrices(layer)[0]
+
+
+def data_to_world_matrix(layer: Layer) -> np.ndarray:
+    """Homogeneous (D+1, D+1) matrix from the data of a layer to world."""
+    return _matrices(layer)[1]
+
+
+def apply_affine(
+    matrix: np.ndarray,
+    coords: ArrayLike,
+    leading: ArrayLike | None = None,
+) -> np.ndarray:
+    """
+    Apply a homogeneous matrix to (N, d) coordinates in one multiply.
+
+    If d is smaller than the dimension of the matrix, the coordinates are
+    the last d axes, the leading axes are fixed at ``leading`` (zeros by
+    default), and only the last d axes of the result are returned. Leading
+    coordinates are aligned to the last axes if more are given.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    pts = np.atleast_2d(coords)
+    ndim = matrix.shape[0] - 1
+    d = pts.shape[1]
+    if d > ndim:
+        raise ValueError(
+            f"Cannot transform {d}D coordinates by a {ndim}D transform."
+        )
+    nlead = ndim - d
+    if leading is None:
+        leading = np.zeros(nlead)
+    else:
+        leading = np.asarray(leading, dtype=np.float64)
+        leading = leading[leading.size - nlead :]
+    rows = matrix[nlead:ndim]
+    offset = rows[:, :nlead] @ leading + rows[:, ndim]
+    out = pts @ rows[:, nlead:ndim].T + offset
+    return out.reshape(coords.shape)
+
+
+def world_to_data(
+    layer: Layer, coords: ArrayLike, leading: ArrayLike | None = None
+) -> np.ndarray:
+    """Convert world coordinates into the data coordinates of a layer."""
+    return apply_affine(world_to_data_matrix(layer), coords, leading)
+
+
+def data_to_data(src: Layer, dst: Layer, coords: ArrayLike) -> np.ndarray:
+    """Convert data coordinates of ``src`` into those of ``dst``."""
+    matrix = world_to_data_matrix(dst) @ data_to_world_matrix(src)
+    return apply_affine(matrix, coords)
+
+
+class InLayerEdit(Container):
+    """
+    A widget that converts the value of a coordinate widget into the data
+    coordinates of a target layer.
+
+    Values of shape widgets (``ShapeComboBox``) are converted from the data
+    coordinates of the shapes layer. Values of the other widgets are in world
+    coordinates, and the leading axes are taken from the current slice.
+    """
+
+    def __init__(
+        self,
+        value=UNSET,
+        inner: type[Widget] | None = None,
+        nullable: bool = False,
+        **kwargs,
+    ):
+        if inner is None:
+            raise TypeError("The inner widget type must be given.")
+        self._inner = inner()
+        self._layer_cbox = LayerComboBox("Layer", label="layer")
+        super().__init__(widgets=[self._inner, self._layer_cbox], **kwargs)
+        self.margins = (0, 0, 0, 0)
+        self._inner.changed.disconnect()
+        self._layer_cbox.changed.disconnect()
+        self._inner.changed.connect(self._emit_changed)
+        self._layer_cbox.changed.connect(self._emit_changed)
+        self.value = value
+
+    @property
+    def target_layer(self) -> Layer:
+        """Currently selected target layer."""
+        return self._layer_cbox.value
+
+    @property
+    def inner_widget(self) -> Widget:
+        """The widget of the world (or source layer) coordinates."""
+        return self._inner
+
+    @property
+    def dragging(self) -> bool:
+        return getattr(self._inner, "dragging", False)
+
+    @property
+    def value(self) -> np.ndarray:
+        """The value in the data coordinates of the target layer."""
+        layer = self.target_layer
+        inner = self._inner
+        if (src := getattr(inner, "shapes_layer", None)) is not None:
+            return data_to_data(src, layer, inner.value)
+        leading = None
+        if viewer := find_viewer_ancestor(self.native):
+            leading = np.asarray(viewer.dims.point)[:-2]
+        return world_to_data(layer, inner.value, leading)
+
+    @value.setter
+    def value(self, value):
+        """Set the value of the inner widget."""
+        if value is UNSET:
+            return
+        self._inner.value = value
+
+    def _emit_changed(self, *_):
+        self.changed.emit(self.value)
+
+    def _recipe(self) -> dict:
+        entry = self._inner._recipe()
+        key = "value" if "value" in entry else "vertices"
+        entry[key] = self.value.tolist()
+        return entry
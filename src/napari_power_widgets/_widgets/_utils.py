@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import Any, Callable, TYPE_CHECKING
+
+import numpy as np
 from magicgui import use_app
-from magicgui.widgets import Widget, Label
+from magicgui.widgets import Container, Widget, Label, Table
 import napari
 
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
 
 def find_viewer_ancestor(widget: Widget) -> napari.Viewer | None:
     """Find the napari viewer ancestor of a magicgui widget."""
@@ -13,7 +20,202 @@ def find_viewer_ancestor(widget: Widget) -> napari.Viewer | None:
     return find_viewer_ancestor(widget)
 
 
-def minimize_label_width(widget: Label) -> None:
+@lru_cache(maxsize=256)
+def _text_width(text: str) -> int:
     _measure = use_app().get_obj("get_text_width")
-    widget.max_width = _measure(widget.value)
+    return _measure(text)
+
+
+def minimize_label_width(widget: Label) -> None:
+    widget.max_width = _text_width(widget.value)
     return None
+
+
+def on_first_show(widget: Widget, callback: Callable[[], Any]) -> None:
+    """
+    Call ``callback`` once when the native widget is shown for the first time.
+
+    The callback is called immediately if the widget is already visible or
+    the backend is not Qt.
+    """
+    native = widget.native
+    try:
+        from qtpy.QtCore import QEvent, QObject
+    except ImportError:
+        callback()
+        return None
+    if native.isVisible():
+        callback()
+        return None
+
+    class _ShowFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Show:
+                obj.removeEventFilter(self)
+                self.deleteLater()
+                callback()
+            return False
+
+    # the filter is owned by the native widget
+    native.installEventFilter(_ShowFilter(native))
+    return None
+
+
+class LazyTable(Container):
+    """
+    A read-only Table that is built when it is shown for the first time.
+
+    The data is stored as is until the table is built, so a widget that is
+    never shown does not pay for the native table.
+    """
+
+    def __init__(
+        self,
+        data: ArrayLike,
+        columns: list[str],
+        min_height: int = 30,
+        max_height: int = 120,
+        **kwargs,
+    ):
+        super().__init__(labels=False, **kwargs)
+        self.margins = (0, 0, 0, 0)
+        self.min_height = min_height
+        self.max_height = max_height
+        self._data = data
+        self._index = None
+        self._columns = list(columns)
+        self._table: Table | None = None
+        on_first_show(self, self._build)
+
+    @property
+    def built(self) -> bool:
+        """True if the native table is built."""
+        return self._table is not None
+
+    @property
+    def table(self) -> Table:
+        """The table widget, built if not yet."""
+        self._build()
+        return self._table
+
+    def set_data(
+        self,
+        data: ArrayLike,
+        index: list | None = None,
+        columns: list[str] | None = None,
+    ) -> None:
+        """Set the data, and update the table if it is built."""
+        self._data = data
+        self._index = index
+        if columns is not None:
+            self._columns = list(columns)
+        if self._table is not None:
+            with self._table.changed.blocked():
+                self._table.value = self._table_value()
+        self.changed.emit(data)
+        return None
+
+    def _table_value(self) -> dict:
+        data = np.asarray(self._data)
+        index = self._index
+        if index is None:
+            index = list(range(data.shape[0]))
+        return {"data": data, "index": index, "columns": self._columns}
+
+    def _build(self) -> None:
+        if self._table is not None:
+            return None
+        table = Table(value=self._table_value())
+        table.read_only = True
+        table.min_height = self.min_height
+        table.max_height = self.max_height
+        self._table = table
+        self.append(table)
+        return None
+
+
+class GrowableArray:
+    """
+    A 2D array of rows with amortized O(1) appending.
+
+    The rows are stored in a preallocated buffer whose capacity is doubled
+    when it is full, so appending a row does not copy the existing rows in
+    most cases.
+    """
+
+    def __init__(self, ncols: int, dtype=np.float64, capacity: int = 16):
+        self._buffer = np.empty((capacity, ncols), dtype=dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def ncols(self) -> int:
+        """Number of columns."""
+        return self._buffer.shape[1]
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows that can be stored without reallocation."""
+        return self._buffer.shape[0]
+
+    def _reserve(self, size: int) -> None:
+        if size <= self.capacity:
+            return None
+        capacity = max(self.capacity, 1)
+        while capacity < size:
+            capacity *= 2
+        buffer = np.empty((capacity, self.ncols), dtype=self._buffer.dtype)
+        buffer[: self._size] = self._buffer[: self._size]
+        self._buffer = buffer
+        return None
+
+    def append(self, row: ArrayLike) -> None:
+        """Append a row."""
+        row = np.asarray(row)
+        if row.shape != (self.ncols,):
+            if self._size > 0:
+                raise ValueError(
+                    f"Cannot append a row of shape {row.shape} to an array "
+                    f"with {self.ncols} columns."
+                )
+            self._buffer = np.empty(
+                (self.capacity, row.size), dtype=self._buffer.dtype
+            )
+        self._reserve(self._size + 1)
+        self._buffer[self._size] = row
+        self._size += 1
+        return None
+
+    def extend(self, rows: ArrayLike) -> None:
+        """Append rows at once."""
+        rows = np.asarray(rows, dtype=self._buffer.dtype)
+        if rows.size == 0:
+            return None
+        rows = rows.reshape(-1, rows.shape[-1])
+        if self._size == 0 and rows.shape[1] != self.ncols:
+            self._buffer = np.empty(
+                (self.capacity, rows.shape[1]), dtype=self._buffer.dtype
+            )
+        self._reserve(self._size + rows.shape[0])
+        self._buffer[self._size : self._size + rows.shape[0]] = rows
+        self._size += rows.shape[0]
+        return None
+
+    def clear(self) -> None:
+        """
+        Remove all the rows.
+
+        A new buffer of the same capacity is allocated, so the views
+        returned before are not overwritten by the rows appended later.
+        """
+        self._buffer = np.empty_like(self._buffer)
+        self._size = 0
+        return None
+
+    def view(self) -> np.ndarray:
+        """Read-only view of the rows."""
+        out = self._buffer[: self._size]
+        out.flags.writeable = False
+        return out
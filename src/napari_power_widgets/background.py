@@ -0,0 +1,343 @@
+"""
+Run magicgui functions in background threads.
+
+Functions annotated with power-widget types often do heavy computation, such
+as masking with ``OneOfLabels``. ``run_in_background`` makes a ``FunctionGui``
+run its function in a thread pool so that napari does not freeze.
+
+- Widget values are snapshotted on the main thread cheaply. Expensive values
+  such as the mask of ``OneOfLabels`` are recorded as references to the layer
+  data plus the data version, and evaluated in the worker thread.
+- When the inputs change again, or the function is called again, the
+  running call is cancelled and its result is discarded. Long-running
+  functions can call ``is_cancelled()`` to stop early.
+- Results are delivered back on the main thread, where the return
+  annotation is processed as usual (e.g. a returned ``Image`` is added to
+  the viewer).
+- With ``preview=N``, auto-calls during a mouse drag of a ``BoxSelection``
+  or ``LineData`` run on the inputs downsampled by ``N`` in the last two
+  axes. Arrays are passed as strided views and coordinate values are
+  divided by ``N``. The returned layer is shown with its scale multiplied
+  by ``N`` until the full-resolution call on the drag release replaces it.
+  As world coordinates are divided as is, previews only run while the
+  image and labels layers of the viewer have no scale, translation or
+  rotation in the last two axes. Otherwise auto-calls run at full
+  resolution.
+
+Examples
+--------
+>>> from magicgui import magicgui
+>>> from napari.types import ImageData
+>>> from napari_power_widgets.types import OneOfLabels
+>>> from napari_power_widgets.background import (
+>>>     run_in_background, is_cancelled
+>>> )
+>>>
+>>> @magicgui
+>>> def masked(image: ImageData, label: OneOfLabels) -> ImageData:
+>>>     return np.where(label, image, 0)
+>>>
+>>> runner = run_in_background(masked)
+>>> viewer.window.add_dock_widget(masked)
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError
+import inspect
+import threading
+from typing import Any, TYPE_CHECKING
+
+import numpy as np
+
+from ._widgets._cache import ValueSnapshot, snapshot_value
+from ._widgets._registry import layer_registry
+from ._widgets._transform import data_to_world_matrix
+from ._widgets._utils import find_viewer_ancestor
+
+if TYPE_CHECKING:
+    from magicgui.widgets import FunctionGui
+
+__all__ = ["BackgroundRunner", "run_in_background", "is_cancelled"]
+
+_local = threading.local()
+
+
+class _Run:
+    """Cancellation token of a call."""
+
+    def __init__(self, generation: int):
+        self.generation = generation
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+
+def is_cancelled() -> bool:
+    """
+    True if the current background call is cancelled.
+
+    Call this function in a function run by ``BackgroundRunner`` to stop the
+    computation early. Always False outside of a background call.
+    """
+    run: _Run | None = getattr(_local, "run", None)
+    return run is not None and run.cancelled
+
+
+def _downsample(value: Any, factor: int) -> Any:
+    """Strided view of the last two axes of an array."""
+    if factor > 1 and isinstance(value, np.ndarray) and value.ndim >= 2:
+        return value[..., ::factor, ::factor]
+    return value
+
+
+class BackgroundRunner:
+    """
+    Runner that calls the function of a FunctionGui in a thread pool.
+
+    Parameters
+    ----------
+    function_gui : FunctionGui
+        The FunctionGui to run in background.
+    max_workers : int, default is 1
+        Maximum number of worker threads.
+    auto_call : bool, optional
+        If True, the function is called every time the inputs change. Same as
+        the ``auto_call`` of the FunctionGui by default.
+    preview : int, default is 1
+        Downsampling factor of the auto-calls during a mouse drag. 1 to
+        always run at full resolution. Previews are skipped unless the
+        layers have identity transforms in the last two axes.
+    """
+
+    def __init__(
+        self,
+        function_gui: FunctionGui,
+        max_workers: int = 1,
+        auto_call: bool | None = None,
+        preview: int = 1,
+    ):
+        from superqt.utils import ensure_main_thread
+
+        self._fgui = function_gui
+        self._function = getattr(function_gui, "__wrapped__", None)
+        if self._function is None:
+            self._function = function_gui._function
+        self._params = inspect.signature(self._function).parameters
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="napari-power-widgets"
+        )
+        self._generation = 0
+        self._run: _Run | None = None
+        self._future: Future | None = None
+        self._preview = max(int(preview), 1)
+        self._base_scale: dict[str, np.ndarray] = {}
+        self._deliver_on_main = ensure_main_thread(self._deliver)
+
+        if auto_call is None:
+            auto_call = getattr(function_gui, "_auto_call", False)
+        self._auto_call = auto_call
+        self._connect()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._fgui!r})"
+
+    @property
+    def function_gui(self) -> FunctionGui:
+        """The FunctionGui."""
+        return self._fgui
+
+    @property
+    def running(self) -> bool:
+        """True if a call is running."""
+        return self._future is not None and not self._future.done()
+
+    def _connect(self):
+        fgui = self._fgui
+        if (btn := fgui.call_button) is not None:
+            btn.changed.disconnect()
+            btn.changed.connect(self.submit)
+        try:
+            fgui.changed.disconnect(fgui._on_change)
+        except Exception:
+            pass
+        fgui.changed.connect(self._on_inputs_changed)
+
+    @property
+    def dragging(self) -> bool:
+        """True if any of the input widgets is being dragged."""
+        return any(getattr(w, "dragging", False) for w in self._fgui)
+
+    def _on_inputs_changed(self, *_):
+        self.cancel()
+        if not self._auto_call:
+            return None
+        if self._preview > 1 and self.dragging and self._can_preview():
+            self._submit(self._preview)
+        else:
+            self._submit(1)
+        return None
+
+    def _can_preview(self) -> bool:
+        """
+        True if world coordinates are the data coordinates of the layers.
+
+        Preview values are world coordinates divided by the factor, which
+        index the downsampled data only if the last two axes of the image
+        and labels layers (other than the output) are not transformed.
+        """
+        viewer = find_viewer_ancestor(self._fgui.native)
+        if viewer is None:
+            return True
+        name = getattr(self._fgui, "result_name", None)
+        for layer in layer_registry(viewer).layers("Image", "Labels"):
+            if layer.name == name:
+                continue
+            matrix = data_to_world_matrix(layer)
+            identity = np.eye(matrix.shape[0])
+            if not np.allclose(matrix[-3:-1], identity[-3:-1]):
+                return False
+        return True
+
+    def snapshot(self, factor: int = 1) -> dict[str, ValueSnapshot]:
+        """
+        Take snapshots of all the argument values.
+
+        If ``factor`` is larger than 1, values of widgets that know how to
+        downsample themselves (such as ``BoxSelector``) are taken in the
+        downsampled coordinates. They are evaluated here on the main thread,
+        as they are read from the Qt widgets at the current drag position.
+        """
+        out = {}
+        for widget in self._fgui:
+            if widget.name not in self._params:
+                continue
+            preview = getattr(widget, "_preview", None)
+            if factor > 1 and preview is not None:
+                out[widget.name] = ValueSnapshot.constant(preview(factor))
+            else:
+                out[widget.name] = snapshot_value(widget)
+        return out
+
+    def submit(self, *_) -> Future:
+        """Cancel the running call and submit a new one."""
+        return self._submit(1)
+
+    def _submit(self, factor: int) -> Future:
+        self.cancel()
+        self._generation += 1
+        run = self._run = _Run(self._generation)
+        snapshots = self.snapshot(factor)
+        if factor > 1:
+            # values that are not downsampled by the widgets
+            downsample = {
+                w.name
+                for w in self._fgui
+                if w.name in snapshots and not hasattr(w, "_preview")
+            }
+        else:
+            downsample = set()
+        future = self._executor.submit(
+            self._work, run, snapshots, factor, downsample
+        )
+        future.add_done_callback(
+            lambda f: self._deliver_on_main(run, f, factor)
+        )
+        self._future = future
+        return future
+
+    def cancel(self) -> None:
+        """Cancel the running call if exists."""
+        if self._run is not None:
+            self._run.cancel()
+        if self._future is not None:
+            self._future.cancel()
+        return None
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel the running call and shut down the thread pool."""
+        self.cancel()
+        self._executor.shutdown(wait=wait)
+        return None
+
+    def _work(
+        self,
+        run: _Run,
+        snapshots: dict[str, ValueSnapshot],
+        factor: int = 1,
+        downsample: set[str] = frozenset(),
+    ) -> Any:
+        _local.run = run
+        try:
+            kwargs = {}
+            for name, snapshot in snapshots.items():
+                if run.cancelled or snapshot.is_stale():
+                    raise CancelledError()
+                value = snapshot.resolve()
+                if name in downsample:
+                    value = _downsample(value, factor)
+                kwargs[name] = value
+            if run.cancelled:
+                raise CancelledError()
+            out = self._function(**kwargs)
+            if run.cancelled:
+                raise CancelledError()
+            return out
+        finally:
+            _local.run = None
+
+    def _deliver(self, run: _Run, future: Future, factor: int = 1) -> None:
+        if run.generation != self._generation or future.cancelled():
+            return None
+        try:
+            result = future.result()
+        except CancelledError:
+            return None
+        from magicgui.type_map import type2callback
+
+        fgui = self._fgui
+        return_type = fgui.return_annotation
+        if return_type not in (None, inspect.Parameter.empty):
+            for callback in type2callback(return_type):
+                callback(fgui, result, return_type)
+        self._rescale_output(factor)
+        fgui.called.emit(result)
+        return None
+
+    def _rescale_output(self, factor: int) -> None:
+        """Show a preview output layer at the full-resolution size."""
+        if self._preview <= 1:
+            return None
+        viewer = find_viewer_ancestor(self._fgui.native)
+        name = getattr(self._fgui, "result_name", None)
+        if viewer is None or name is None or name not in viewer.layers:
+            return None
+        layer = viewer.layers[name]
+        if layer.ndim < 2:
+            return None
+        base = self._base_scale.setdefault(name, np.array(layer.scale))
+        scale = base.copy()
+        scale[-2:] *= factor
+        if not np.array_equal(layer.scale, scale):
+            layer.scale = scale
+        return None
+
+
+def run_in_background(
+    function_gui: FunctionGui,
+    max_workers: int = 1,
+    auto_call: bool | None = None,
+    preview: int = 1,
+) -> BackgroundRunner:
+    """
+    Make a FunctionGui run its function in a thread pool.
+
+    The call button and ``auto_call`` of the FunctionGui are redirected to
+    the returned runner. See ``BackgroundRunner`` for the parameters.
+    """
+    return BackgroundRunner(function_gui, max_workers, auto_call, preview)
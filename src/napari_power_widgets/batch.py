@@ -0,0 +1,486 @@
+"""
+Apply interactively built selections to many files without a viewer.
+
+A ``Recipe`` records the function of a ``FunctionGui`` and the current
+selections of its widgets (box ranges, z ranges, label ids, shape vertices,
+etc.) as a small JSON document. Layers selected in the GUI are recorded as
+named inputs, which are replaced by the arrays loaded from each file.
+
+``run_batch`` applies a recipe to a list of files with a process pool. No Qt
+application or viewer is needed in the workers. Array outputs are written to
+shared memory so that large results are not pickled back to the parent.
+
+Examples
+--------
+>>> from magicgui import magicgui
+>>> from napari_power_widgets.batch import Recipe, run_batch
+>>>
+>>> fgui = magicgui(my_module.crop_and_mask)  # built and used interactively
+>>> recipe = Recipe.from_function_gui(fgui)
+>>> recipe.save("pipeline.json")
+>>>
+>>> # later, in a headless script
+>>> recipe = Recipe.load("pipeline.json")
+>>> for result in run_batch(recipe, files, max_workers=8):
+>>>     with result:
+>>>         np.save(result.file.with_suffix(".out.npy"), result.value)
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from enum import Enum
+from importlib import import_module
+from itertools import islice
+import json
+from multiprocessing import shared_memory
+import os
+from pathlib import Path
+import sys
+import traceback
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Union,
+    TYPE_CHECKING,
+)
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from magicgui.widgets import FunctionGui
+
+__all__ = ["Recipe", "BatchResult", "run_batch", "load_arrays"]
+
+_Arrays = Union[Mapping[str, np.ndarray], np.ndarray]
+_Loader = Callable[[Path], _Arrays]
+RECIPE_VERSION = 1
+
+
+def load_arrays(path: str | Path) -> _Arrays:
+    """
+    Default loader of ``run_batch``.
+
+    ``.npz`` files are loaded as a dict of arrays keyed by the array names,
+    and other files are loaded as a single array by ``np.load``.
+    """
+    path = Path(path)
+    if path.suffix == ".npz":
+        with np.load(path) as npz:
+            return {name: npz[name] for name in npz.files}
+    return np.load(path)
+
+
+def _function_path(func: Callable) -> str:
+    module = getattr(func, "__module__", None)
+    qualname = getattr(func, "__qualname__", None)
+    if module in (None, "__main__") or not qualname or "<" in qualname:
+        raise ValueError(
+            f"{func!r} cannot be imported in worker processes. Define it at "
+            "the top level of an importable module."
+        )
+    return f"{module}:{qualname}"
+
+
+def _import_function(path: str) -> Callable:
+    module_name, qualname = path.split(":")
+    obj = import_module(module_name)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    # a function decorated with @magicgui
+    return getattr(obj, "_function", obj)
+
+
+def _is_layer_input(widget) -> bool:
+    """True if the widget selects a layer of the viewer."""
+    import napari.types
+    from napari.layers import Layer
+
+    ann = getattr(widget, "annotation", None)
+    if isinstance(ann, type) and issubclass(ann, Layer):
+        return True
+    # napari.types.ImageData etc.
+    return any(ann is t for t in vars(napari.types).values())
+
+
+def _literal(value: Any) -> Any:
+    """Convert a widget value into a JSON-compatible literal."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (tuple, list)):
+        return [_literal(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _literal(v) for k, v in value.items()}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Value {value!r} cannot be recorded in a recipe.")
+
+
+def _widget_entry(widget) -> dict[str, Any]:
+    if (recipe := getattr(widget, "_recipe", None)) is not None:
+        return recipe()
+    if _is_layer_input(widget):
+        from napari.layers import Layer
+
+        value = widget.value
+        entry = {"type": "input", "name": widget.current_choice}
+        if isinstance(value, Layer):
+            entry["layer_type"] = type(value).__name__
+        return entry
+    return {"type": "value", "value": _literal(widget.value)}
+
+
+def _get_array(arrays: _Arrays, name: str) -> np.ndarray:
+    if isinstance(arrays, np.ndarray):
+        return arrays
+    try:
+        return np.asarray(arrays[name])
+    except KeyError:
+        raise KeyError(
+            f"Input {name!r} not found. Available inputs are {list(arrays)}."
+        ) from None
+
+
+def _resolve(entry: Mapping[str, Any], arrays: _Arrays) -> Any:
+    """Resolve a recipe entry into an argument for the given inputs."""
+    _type = entry["type"]
+    if _type == "value":
+        return entry["value"]
+    if _type == "input":
+        data = _get_array(arrays, entry["name"])
+        if layer_type := entry.get("layer_type"):
+            from napari import layers
+
+            return getattr(layers, layer_type)(data, name=entry["name"])
+        return data
+    if _type == "OneOfLabels":
+        from ._widgets._mask import encode_mask
+
+        data = _get_array(arrays, entry["layer"])
+        return encode_mask(data, entry["label"], entry.get("output", "dense"))
+    if _type == "LabelContour":
+        from ._widgets._contour import label_contours
+
+        data = _get_array(arrays, entry["layer"])
+        return label_contours(data, entry["label"], entry["tolerance"])
+    if _type == "SomeOfLabels":
+        from ._widgets._label_map import LabelSelection
+
+        data = _get_array(arrays, entry["layer"])
+        return LabelSelection(data, entry["labels"])
+    if _type == "BoxSelection":
+        return tuple(entry["y"]), tuple(entry["x"])
+    if _type == "BoxStatistics":
+        from ._widgets._stats import IntegralImage
+
+        data = _get_array(arrays, entry["image"])
+        plane = data[tuple(entry["index"])]
+        return IntegralImage(plane).stats(entry["y"], entry["x"])
+    if _type == "TiledBoxSelection":
+        from ._widgets._tiles import TiledBox
+
+        return TiledBox(
+            entry["y"], entry["x"], entry["tile_size"], entry["overlap"]
+        )
+    if _type == "ZRange":
+        return tuple(entry["range"])
+    if _type in ("OneOfShapes", "ShapeData"):
+        return np.asarray(entry["vertices"], dtype=np.float64)
+    if _type == "ShapesMask":
+        from ._widgets._geometry import rasterize_shapes
+
+        return rasterize_shapes(
+            entry["vertices"],
+            entry["shape_types"],
+            _get_array(arrays, entry["image"]).shape,
+            labels=entry["output"] == "labels",
+        )
+    if _type == "LassoSelection":
+        from ._widgets._lasso import Lasso
+
+        data = _get_array(arrays, entry["layer"])
+        return Lasso(entry["polygon"], data.shape[-2:], entry["fill_rule"])
+    if _type == "ZProjection":
+        from ._widgets._projection import project_z
+
+        data = _get_array(arrays, entry["image"])
+        return project_z(data, entry["range"], entry["method"])
+    if _type == "ImageCrop":
+        from ._widgets._crop import LazyCrop
+
+        data = _get_array(arrays, entry["image"])
+        return LazyCrop([data], entry["bounds"])
+    if _type == "SomeOfShapes":
+        return [np.asarray(v, dtype=np.float64) for v in entry["vertices"]]
+    if _type in ("Coordinate", "Coordinates", "OneOfPoints"):
+        return np.asarray(entry["value"], dtype=np.float64)
+    if _type == "SomeOfPoints":
+        # indices into the points, as the value of PointSelect
+        return np.asarray(entry["indices"], dtype=np.intp)
+    raise ValueError(f"Unknown recipe entry type {_type!r}.")
+
+
+class Recipe:
+    """
+    A declarative record of a function and its widget selections.
+
+    Parameters
+    ----------
+    function : str
+        Import path of the function in "module:qualname" format.
+    params : dict
+        Recipe entry of each parameter. Each entry is a dict with a "type"
+        field, such as ``{"type": "ZRange", "range": [3, 10]}``.
+    """
+
+    def __init__(self, function: str, params: Mapping[str, Mapping]):
+        self._function = function
+        self._params = {k: dict(v) for k, v in params.items()}
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._function!r})"
+
+    @property
+    def function(self) -> str:
+        """Import path of the function."""
+        return self._function
+
+    @property
+    def params(self) -> dict[str, dict[str, Any]]:
+        """Recipe entry of each parameter."""
+        return self._params
+
+    @property
+    def inputs(self) -> set[str]:
+        """Names of the arrays that must be loaded from each file."""
+        out = set()
+        for entry in self._params.values():
+            if entry["type"] == "input":
+                out.add(entry["name"])
+            elif "image" in entry:
+                out.add(entry["image"])
+            elif "layer" in entry:
+                out.add(entry["layer"])
+        return out
+
+    @classmethod
+    def from_function_gui(cls, function_gui: FunctionGui) -> Recipe:
+        """Record the current selections of a FunctionGui."""
+        func = getattr(function_gui, "__wrapped__", None)
+        if func is None:
+            func = function_gui._function
+        names = set(function_gui.__signature__.parameters)
+        params = {
+            widget.name: _widget_entry(widget)
+            for widget in function_gui
+            if widget.name in names
+        }
+        return cls(_function_path(func), params)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the recipe into a JSON-compatible dict."""
+        return {
+            "version": RECIPE_VERSION,
+            "function": self._function,
+            "params": self._params,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Mapping[str, Any]) -> Recipe:
+        """Construct a recipe from a dict made by ``to_dict``."""
+        if (version := d.get("version", RECIPE_VERSION)) > RECIPE_VERSION:
+            raise ValueError(f"Unsupported recipe version {version}.")
+        return cls(d["function"], d["params"])
+
+    def save(self, path: str | Path) -> None:
+        """Save the recipe as a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return None
+
+    @classmethod
+    def load(cls, path: str | Path) -> Recipe:
+        """Load a recipe from a JSON file."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def apply(self, arrays: _Arrays) -> Any:
+        """
+        Apply the recipe to the inputs of a file in this process.
+
+        ``arrays`` is a mapping of the input names to arrays. A single array
+        is used for all the inputs.
+        """
+        func = _import_function(self._function)
+        kwargs = {
+            name: _resolve(entry, arrays)
+            for name, entry in self._params.items()
+        }
+        return func(**kwargs)
+
+
+def _to_shared(arr: np.ndarray) -> tuple[str, tuple[int, ...], str]:
+    """Copy an array into a new shared memory block owned by the parent."""
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    out = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+    out[...] = arr
+    del out
+    if sys.version_info < (3, 13):
+        # the block is unlinked by the parent, not by this worker
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(shm._name, "shared_memory")
+    shm.close()
+    return shm.name, arr.shape, arr.dtype.str
+
+
+def _run_one(recipe: dict, file: Path, loader: _Loader) -> tuple:
+    try:
+        out = Recipe.from_dict(recipe).apply(loader(file))
+        if isinstance(out, np.ndarray) and out.dtype != object:
+            return "shared", _to_shared(np.ascontiguousarray(out))
+        return "value", out
+    except Exception as e:
+        return "error", (repr(e), traceback.format_exc())
+
+
+class BatchResult:
+    """
+    Result of a recipe applied to a file.
+
+    Array outputs are views of shared memory. Call ``release`` (or use the
+    result as a context manager) to free the memory once the output has been
+    saved or copied.
+    """
+
+    def __init__(self, file: Path, value: Any = None, error: str = ""):
+        self.file = file
+        self._value = value
+        self._error = error
+        self._shm: shared_memory.SharedMemory | None = None
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else self._error
+        return f"{self.__class__.__name__}({str(self.file)!r}, {status})"
+
+    @classmethod
+    def _from_shared(cls, file: Path, name: str, shape, dtype: str):
+        self = cls(file)
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._value = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        return self
+
+    @property
+    def ok(self) -> bool:
+        """True if the recipe succeeded."""
+        return not self._error
+
+    @property
+    def error(self) -> str:
+        """Traceback of the error, or an empty string."""
+        return self._error
+
+    @property
+    def value(self) -> Any:
+        """Output of the function."""
+        if not self.ok:
+            raise RuntimeError(f"Recipe failed on {self.file}:\n{self._error}")
+        return self._value
+
+    def release(self) -> None:
+        """Free the shared memory of the output."""
+        self._value = None
+        if (shm := self._shm) is not None:
+            self._shm = None
+            shm.close()
+            shm.unlink()
+        return None
+
+    def __enter__(self) -> BatchResult:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.release()
+
+
+def _to_result(file: Path, kind: str, out: Any) -> BatchResult:
+    if kind == "shared":
+        return BatchResult._from_shared(file, *out)
+    if kind == "value":
+        return BatchResult(file, out)
+    return BatchResult(file, error=out[1])
+
+
+def run_batch(
+    recipe: Recipe,
+    files: Iterable[str | Path],
+    loader: _Loader = load_arrays,
+    max_workers: int | None = None,
+) -> Iterator[BatchResult]:
+    """
+    Apply a recipe to files with a process pool.
+
+    Parameters
+    ----------
+    recipe : Recipe
+        The recipe to apply.
+    files : iterable of path-like
+        Files to process.
+    loader : callable, default is ``load_arrays``
+        Function that loads a file into a mapping of input names to arrays,
+        or a single array. Must be picklable (defined at module level).
+    max_workers : int, optional
+        Number of worker processes.
+
+    Yields
+    ------
+    BatchResult
+        Results in the order of completion, not of ``files``. Errors are
+        reported in each result instead of being raised. At most twice the
+        number of workers are submitted ahead of the consumer, so the shared
+        memory in use is bounded if each result is released after use.
+    """
+    files = (Path(f) for f in files)
+    d = recipe.to_dict()
+    nworkers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers) as executor:
+        pending: dict[Future, Path] = {}
+
+        def _submit(file: Path) -> None:
+            pending[executor.submit(_run_one, d, file, loader)] = file
+
+        try:
+            for file in islice(files, 2 * nworkers):
+                _submit(file)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file = pending.pop(future)
+                    if (next_file := next(files, None)) is not None:
+                        _submit(next_file)
+                    yield _to_result(file, *future.result())
+        finally:
+            # free the outputs of the calls not consumed
+            for future in pending:
+                future.cancel()
+            for future, file in pending.items():
+                if future.cancelled():
+                    continue
+                try:
+                    _to_result(file, *future.result()).release()
+                except Exception:
+                    pass
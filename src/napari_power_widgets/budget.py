@@ -0,0 +1,40 @@
+"""
+Memory budget of the array-returning widget values.
+
+Values such as ``OneOfLabels``, ``ShapesMask``, ``LassoSelection`` masks,
+``ZProjection`` and ``ImageCrop`` allocate arrays whose size depends on the
+selected layer. A per-process budget limits the estimated size of a single
+value. Above the budget, the value getters raise ``MemoryBudgetError``
+before allocating, or fall back to lazy, cropped or memmap-backed results
+with a ``MemoryBudgetWarning`` that reports the estimated size.
+
+The default budget is read from the environment variable
+``NAPARI_POWER_WIDGETS_MEMORY_BUDGET`` (e.g. "8GB"). No limit by default.
+
+Examples
+--------
+>>> from napari_power_widgets.budget import set_memory_budget, memory_budget
+>>> set_memory_budget("4GB")  # raise above 4 GB
+>>> with memory_budget("1GB", policy="memmap"):
+>>>     mask = widget.value  # memmap-backed above 1 GB
+"""
+
+from ._widgets._budget import (
+    BudgetPolicy,
+    MemoryBudgetError,
+    MemoryBudgetWarning,
+    estimate_nbytes,
+    get_memory_budget,
+    memory_budget,
+    set_memory_budget,
+)
+
+__all__ = [
+    "BudgetPolicy",
+    "MemoryBudgetError",
+    "MemoryBudgetWarning",
+    "estimate_nbytes",
+    "get_memory_budget",
+    "memory_budget",
+    "set_memory_budget",
+]
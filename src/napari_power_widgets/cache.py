@@ -0,0 +1,106 @@
+"""
+Cross-call result caching keyed by versioned widget values.
+
+Values of power widgets such as ``OneOfLabels``, ``OneOfShapes`` and
+``FeatureColumn`` carry a key of (source layer, data version, selection).
+``memoize`` uses these keys to skip recomputation when a function is called
+again with unchanged inputs.
+
+Examples
+--------
+>>> from magicgui import magicgui
+>>> from napari.types import ImageData
+>>> from napari_power_widgets.types import OneOfLabels
+>>> from napari_power_widgets.cache import memoize
+>>>
+>>> @memoize(maxsize=8)
+>>> def expensive(mask):
+>>>     ...
+>>>
+>>> @magicgui
+>>> def f(label: OneOfLabels):
+>>>     return expensive(label)  # cached while the label is unchanged
+"""
+
+from __future__ import annotations
+
+from functools import wraps
+from typing import Any, Callable, Hashable, TypeVar
+
+import numpy as np
+
+from ._widgets._cache import LRUCache, layer_key, value_key
+
+__all__ = ["memoize", "value_key", "make_key"]
+
+_F = TypeVar("_F", bound=Callable)
+_NOT_CACHEABLE = object()
+
+# arrays smaller than this are keyed by their content
+_MAX_HASHED_NBYTES = 1 << 16
+
+
+def _arg_key(arg: Any) -> Hashable:
+    if (key := value_key(arg)) is not None:
+        return key
+    if hasattr(arg, "events") and hasattr(arg.events, "data"):
+        # napari layer
+        return ("layer", *layer_key(arg))
+    if isinstance(arg, np.ndarray):
+        if arg.nbytes > _MAX_HASHED_NBYTES:
+            return _NOT_CACHEABLE
+        return ("array", arg.shape, arg.dtype.str, arg.tobytes())
+    if isinstance(arg, (tuple, list)):
+        keys = tuple(_arg_key(a) for a in arg)
+        if any(k is _NOT_CACHEABLE for k in keys):
+            return _NOT_CACHEABLE
+        return (type(arg).__name__, keys)
+    try:
+        hash(arg)
+    except TypeError:
+        return _NOT_CACHEABLE
+    return arg
+
+
+def make_key(args: tuple, kwargs: dict[str, Any]) -> Hashable | None:
+    """
+    Make a cache key of function arguments.
+
+    Returns None if any of the arguments is not cacheable, such as a large
+    array that does not come from a power widget.
+    """
+    names = sorted(kwargs)
+    keys = [_arg_key(a) for a in args] + [_arg_key(kwargs[k]) for k in names]
+    if any(k is _NOT_CACHEABLE for k in keys):
+        return None
+    return tuple(keys), tuple(names)
+
+
+def memoize(func: _F | None = None, *, maxsize: int = 16) -> _F:
+    """
+    LRU-cache the results of a function keyed by the versioned input keys.
+
+    The cache is bypassed if any of the arguments is not cacheable. The
+    cache can be accessed by the ``cache`` attribute of the returned function
+    and cleared by ``cache_clear()``.
+
+    >>> @memoize
+    >>> def f(label): ...
+    >>> @memoize(maxsize=4)
+    >>> def g(label): ...
+    """
+
+    def _decorator(func: _F) -> _F:
+        cache = LRUCache(maxsize)
+
+        @wraps(func)
+        def _memoized(*args, **kwargs):
+            if (key := make_key(args, kwargs)) is None:
+                return func(*args, **kwargs)
+            return cache.get_or_create(key, lambda: func(*args, **kwargs))
+
+        _memoized.cache = cache
+        _memoized.cache_clear = cache.clear
+        return _memoized
+
+    return _decorator if func is None else _decorator(func)
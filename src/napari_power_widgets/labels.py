@@ -0,0 +1,32 @@
+"""
+Per-object operations over a label image.
+
+Applying a function to every object by ``data == label`` reads the whole
+image once per label. ``map_labels`` finds the bounding boxes of all the
+objects in one pass and calls the function with the crops, in a thread pool
+or in a process pool reading the arrays from shared memory.
+
+Examples
+--------
+>>> from magicgui import magicgui
+>>> from napari.types import ImageData
+>>> from napari_power_widgets.types import SomeOfLabels
+>>> from napari_power_widgets.labels import map_labels
+>>>
+>>> def mean_intensity(crop, mask):
+>>>     return crop[mask].mean()
+>>>
+>>> @magicgui
+>>> def measure(labels: SomeOfLabels, image: ImageData):
+>>>     print(map_labels(mean_intensity, labels, image=image,
+>>>                      executor="process", output="table"))
+"""
+
+from ._widgets._label_map import (
+    LabelSelection,
+    MapExecutor,
+    MapOutput,
+    map_labels,
+)
+
+__all__ = ["map_labels", "LabelSelection", "MapExecutor", "MapOutput"]
@@ -0,0 +1,320 @@
+"""
+Opt-in latency instrumentation of the power widgets.
+
+When enabled, mouse handlers (``_on_drag``, ``_on_click``), choice callbacks
+(``reset_choices`` etc.), value getters and ``changed`` emissions of every
+power widget class are timed and collected into per-class histograms. When
+disabled, the original methods are restored so that there is no overhead at
+all.
+
+Examples
+--------
+>>> from napari_power_widgets import perf
+>>> perf.enable()
+>>> ...  # interact with the widgets
+>>> perf.disable()
+>>> print(perf.stats())
+>>> perf.to_json("latency.json")
+>>> perf.to_chrome_trace("trace.json")  # open with chrome://tracing
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+import inspect
+import json
+import os
+import threading
+from time import perf_counter_ns
+from typing import Any, Callable, Iterable, Iterator
+
+__all__ = [
+    "enable",
+    "disable",
+    "is_enabled",
+    "instrumented",
+    "reset",
+    "stats",
+    "to_json",
+    "to_chrome_trace",
+    "LatencyHistogram",
+]
+
+# names of the attributes to be timed, mapped to the name shown in reports
+_TARGETS: dict[str, str] = {
+    "_on_drag": "_on_drag",
+    "_on_click": "_on_click",
+    "reset_choices": "reset_choices",
+    "_get_available_shape_id": "_get_available_shape_id",
+    "_get_index_list": "_get_index_list",
+    "_get_available_columns": "_get_available_columns",
+    "_set_available_columns": "_set_available_columns",
+    "value": "value",
+    "_emit_changed": "changed",
+}
+
+_PACKAGE = __name__.rsplit(".", 1)[0]
+_MAX_TRACE_EVENTS = 100000
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies with power-of-two bins in nanoseconds.
+
+    The i-th bin counts the latencies ``t`` that satisfy
+    ``2**(i-1) <= t < 2**i`` [ns].
+    """
+
+    NBINS = 64
+
+    def __init__(self):
+        self.counts = [0] * self.NBINS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def add(self, dt: int) -> None:
+        """Add a latency in nanoseconds."""
+        self.counts[min(dt.bit_length(), self.NBINS - 1)] += 1
+        self.count += 1
+        self.total += dt
+        if self.min is None or dt < self.min:
+            self.min = dt
+        if dt > self.max:
+            self.max = dt
+
+    def percentile(self, q: float) -> int:
+        """Upper bound of the q-th percentile in nanoseconds."""
+        if self.count == 0:
+            return 0
+        threshold = self.count * q / 100
+        cum = 0
+        for i, c in enumerate(self.counts):
+            cum += c
+            if cum >= threshold:
+                return min(2**i, self.max)
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        """Summary of the histogram in microseconds."""
+        mean = self.total / self.count if self.count else 0
+        return {
+            "count": self.count,
+            "total_us": self.total / 1e3,
+            "mean_us": mean / 1e3,
+            "min_us": (self.min or 0) / 1e3,
+            "max_us": self.max / 1e3,
+            "p50_us": self.percentile(50) / 1e3,
+            "p90_us": self.percentile(90) / 1e3,
+            "p99_us": self.percentile(99) / 1e3,
+            "bins_ns": {
+                str(2**i): c for i, c in enumerate(self.counts) if c > 0
+            },
+        }
+
+
+_histograms: dict[str, LatencyHistogram] = {}
+_trace: deque[tuple[str, int, int, int]] = deque(maxlen=_MAX_TRACE_EVENTS)
+_patched: dict[tuple[type, str], tuple[Any, bool]] = {}
+_T0 = perf_counter_ns()
+
+
+def _record(key: str, start: int) -> None:
+    dt = perf_counter_ns() - start
+    if (hist := _histograms.get(key)) is None:
+        hist = _histograms[key] = LatencyHistogram()
+    hist.add(dt)
+    _trace.append((key, start, dt, threading.get_ident()))
+
+
+def _wrap_function(func: Callable, name: str) -> Callable:
+    @wraps(func)
+    def _timed(self, *args, **kwargs):
+        t0 = perf_counter_ns()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            _record(f"{type(self).__name__}.{name}", t0)
+
+    return _timed
+
+
+def _wrap_generator_function(func: Callable, name: str) -> Callable:
+    # Mouse callbacks are generators that napari steps once per mouse event,
+    # so each step is timed separately.
+    @wraps(func)
+    def _timed(self, *args, **kwargs):
+        key = f"{type(self).__name__}.{name}"
+        gen = func(self, *args, **kwargs)
+        try:
+            while True:
+                t0 = perf_counter_ns()
+                try:
+                    next(gen)
+                except StopIteration:
+                    return
+                finally:
+                    _record(key, t0)
+                yield
+        finally:
+            gen.close()
+
+    return _timed
+
+
+def _wrap(attr: Any, name: str) -> Any:
+    if isinstance(attr, property):
+        return property(
+            _wrap_function(attr.fget, name), attr.fset, attr.fdel, attr.__doc__
+        )
+    elif inspect.isgeneratorfunction(attr):
+        return _wrap_generator_function(attr, name)
+    elif callable(attr):
+        return _wrap_function(attr, name)
+    raise TypeError(f"Cannot instrument {attr!r}.")
+
+
+def _widget_classes() -> list[type]:
+    from . import _widgets
+
+    return [getattr(_widgets, name) for name in _widgets.__all__]
+
+
+def _find_owner(cls: type, name: str) -> tuple[type, Any, bool] | None:
+    """
+    Find the class to be patched and the original attribute.
+
+    Attributes defined in this package are patched in place. Attributes
+    inherited from other packages (such as magicgui) are shadowed in ``cls``.
+    """
+    for base in cls.__mro__:
+        if name in base.__dict__:
+            owned = base.__module__.startswith(_PACKAGE)
+            return (base if owned else cls), base.__dict__[name], owned
+    return None
+
+
+def is_enabled() -> bool:
+    """True if instrumentation is enabled."""
+    return len(_patched) > 0
+
+
+def _check_idle() -> None:
+    """
+    Raise if any widget is selecting.
+
+    A selecting widget has connected its bound mouse handler to the viewer,
+    and cannot disconnect it after the handler is replaced.
+    """
+    from ._widgets._mouse import selecting_widgets
+
+    if widgets := selecting_widgets():
+        names = ", ".join(sorted({type(w).__name__ for w in widgets}))
+        raise RuntimeError(
+            f"Cannot toggle instrumentation while widgets are selecting in "
+            f"the viewer: {names}."
+        )
+
+
+def enable(classes: Iterable[type] | None = None) -> None:
+    """
+    Enable instrumentation.
+
+    Choice callbacks and ``changed`` emissions are connected when a widget is
+    constructed, so they are timed only for the widgets created after this
+    function is called. Mouse handlers, ``reset_choices`` and value getters
+    are timed for all the widgets. Raises ``RuntimeError`` if any widget is
+    selecting in the viewer; the same applies to ``disable``.
+
+    Parameters
+    ----------
+    classes : iterable of type, optional
+        Widget classes to instrument. All the widget classes of this package
+        are instrumented by default.
+    """
+    _check_idle()
+    if classes is None:
+        classes = _widget_classes()
+    for cls in classes:
+        for name, report_name in _TARGETS.items():
+            if (found := _find_owner(cls, name)) is None:
+                continue
+            owner, original, owned = found
+            if (owner, name) in _patched:
+                continue
+            _patched[(owner, name)] = (original, owned)
+            setattr(owner, name, _wrap(original, report_name))
+    return None
+
+
+def disable() -> None:
+    """Disable instrumentation and restore the original methods."""
+    _check_idle()
+    for (owner, name), (original, owned) in _patched.items():
+        if owned:
+            setattr(owner, name, original)
+        else:
+            delattr(owner, name)
+    _patched.clear()
+    return None
+
+
+@contextmanager
+def instrumented(classes: Iterable[type] | None = None) -> Iterator[None]:
+    """Context manager that enables instrumentation temporarily."""
+    enable(classes)
+    try:
+        yield
+    finally:
+        disable()
+
+
+def reset() -> None:
+    """Clear all the collected latencies."""
+    _histograms.clear()
+    _trace.clear()
+    return None
+
+
+def stats() -> dict[str, dict[str, Any]]:
+    """Summaries of latencies keyed by "<class name>.<handler name>"."""
+    return {key: hist.to_dict() for key, hist in sorted(_histograms.items())}
+
+
+def _dump(obj: Any, path: str | os.PathLike | None) -> str:
+    out = json.dumps(obj, indent=2)
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(out)
+    return out
+
+
+def to_json(path: str | os.PathLike | None = None) -> str:
+    """Export the latency summaries as a JSON string (and file)."""
+    return _dump(stats(), path)
+
+
+def to_chrome_trace(path: str | os.PathLike | None = None) -> str:
+    """
+    Export the recorded events in the Chrome trace event format.
+
+    Only the latest 100000 events are kept. The output can be loaded in
+    ``chrome://tracing`` or https://ui.perfetto.dev.
+    """
+    pid = os.getpid()
+    events = [
+        {
+            "name": key,
+            "cat": key.split(".", 1)[0],
+            "ph": "X",
+            "ts": (start - _T0) / 1e3,
+            "dur": dt / 1e3,
+            "pid": pid,
+            "tid": tid,
+        }
+        for key, start, dt, tid in _trace
+    ]
+    return _dump({"traceEvents": events, "displayTimeUnit": "ms"}, path)
@@ -0,0 +1,24 @@
+"""
+Streaming projections over a ``ZRange``.
+
+``img.data[z0:z1 + 1].max(0)`` reads the whole sub-stack into memory before
+reducing it. ``project_z`` reads and reduces the sub-stack chunk by chunk,
+optionally in a thread pool, so that only a chunk and the accumulator are
+in memory at a time.
+
+Examples
+--------
+>>> from magicgui import magicgui
+>>> from napari.layers import Image
+>>> from napari.types import ImageData
+>>> from napari_power_widgets.types import ZRange
+>>> from napari_power_widgets.projection import project_z
+>>>
+>>> @magicgui
+>>> def max_projection(img: Image, zrange: ZRange) -> ImageData:
+>>>     return project_z(img.data, zrange, "max", max_workers=4)
+"""
+
+from ._widgets._projection import ProjectionMethod, project_z
+
+__all__ = ["project_z", "ProjectionMethod"]
@@ -0,0 +1,615 @@
+"""
+Record and replay mouse event streams and camera paths.
+
+Mouse events on a viewer can be recorded into a compact ``.npz`` file and
+replayed later through the generator-based drag callbacks, without any user
+interaction. Similarly, camera states can be recorded as a camera path and
+replayed on a headless viewer while measuring frame times. These are useful
+for deterministic interaction and rendering benchmarks.
+
+Examples
+--------
+>>> from napari_power_widgets.replay import MouseRecorder, MouseStream, replay
+>>> with MouseRecorder(viewer) as recorder:
+>>>     ...  # drag on the viewer
+>>> recorder.stream.save("drag.npz")
+>>>
+>>> # replay the stream on a (headless) viewer
+>>> widget.mode = "selecting"
+>>> result = replay(MouseStream.load("drag.npz"), viewer)
+>>> print(result.summary())
+>>>
+>>> # record a camera path and replay it with 200 interpolated frames
+>>> with CameraPathRecorder(viewer) as recorder:
+>>>     ...  # move the camera
+>>> path = recorder.path.interpolate(200)
+>>> print(replay_camera_path(path, viewer).summary())
+"""
+
+from __future__ import annotations
+
+import inspect
+import os
+from time import perf_counter
+from typing import Any, Callable, Iterable, Sequence, TYPE_CHECKING
+
+import numpy as np
+
+from ._widgets._camera import CameraState
+from ._widgets._typing import MouseEvent
+
+if TYPE_CHECKING:
+    import napari
+
+__all__ = [
+    "MouseStream",
+    "MouseRecorder",
+    "ReplayResult",
+    "replay",
+    "CameraPath",
+    "CameraPathRecorder",
+    "CameraReplayResult",
+    "replay_camera_path",
+]
+
+_EVENT_TYPES = ("mouse_press", "mouse_move", "mouse_release")
+_MODIFIERS = ("Shift", "Control", "Alt", "Meta")
+
+
+def _modifier_mask(modifiers: Iterable[Any]) -> int:
+    names = {getattr(m, "name", m) for m in modifiers}
+    return sum(1 << i for i, m in enumerate(_MODIFIERS) if m in names)
+
+
+class ReplayedMouseEvent(MouseEvent):
+    """A mutable mouse event that is updated while replaying a stream."""
+
+    def __init__(self, dims_displayed: Sequence[int]):
+        self.blocked = False
+        self.handled = False
+        self.is_dragging = False
+        self.type = "mouse_press"
+        self.button = 0
+        self.buttons = []
+        self.delta = np.zeros(2, dtype=np.float64)
+        self.modifiers = []
+        self.pos = np.zeros(2, dtype=np.float64)
+        self.position = np.zeros(0, dtype=np.float64)
+        self.dims_displayed = list(dims_displayed)
+        self.view_direction = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(type={self.type!r}, "
+            f"position={self.position!r})"
+        )
+
+
+class MouseStream:
+    """
+    A compact, array-based sequence of mouse events.
+
+    Parameters
+    ----------
+    types : (N,) array of uint8
+        Index of the event type in ("mouse_press", "mouse_move",
+        "mouse_release").
+    positions : (N, ndim) array
+        Event positions in world coordinates.
+    pos : (N, 2) array, optional
+        Event positions in canvas pixels.
+    buttons : (N,) array of uint8, optional
+        Mouse button of each event.
+    modifiers : (N,) array of uint8, optional
+        Bit mask of (Shift, Control, Alt, Meta) keys.
+    times : (N,) array of float, optional
+        Time stamps in seconds.
+    dims_displayed : sequence of int, optional
+        Displayed dimensions. Last two dimensions by default.
+    """
+
+    def __init__(
+        self,
+        types: np.ndarray,
+        positions: np.ndarray,
+        pos: np.ndarray | None = None,
+        buttons: np.ndarray | None = None,
+        modifiers: np.ndarray | None = None,
+        times: np.ndarray | None = None,
+        dims_displayed: Sequence[int] | None = None,
+    ):
+        self.types = np.asarray(types, dtype=np.uint8)
+        self.positions = np.asarray(positions, dtype=np.float64)
+        n, ndim = self.positions.shape
+        if self.types.shape != (n,):
+            raise ValueError("Length of types and positions do not match.")
+        if pos is None:
+            pos = self.positions[:, -2:]
+        if buttons is None:
+            buttons = np.ones(n)
+        if modifiers is None:
+            modifiers = np.zeros(n)
+        if times is None:
+            times = np.zeros(n)
+        if dims_displayed is None:
+            dims_displayed = [ndim - 2, ndim - 1]
+        self.pos = np.asarray(pos, dtype=np.float32)
+        self.buttons = np.asarray(buttons, dtype=np.uint8)
+        self.modifiers = np.asarray(modifiers, dtype=np.uint8)
+        self.times = np.asarray(times, dtype=np.float64)
+        self.dims_displayed = np.asarray(dims_displayed, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self.types.size
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(nevents={len(self)}, "
+            f"ndim={self.ndim})"
+        )
+
+    @property
+    def ndim(self) -> int:
+        """Number of dimensions of the event positions."""
+        return self.positions.shape[1]
+
+    @classmethod
+    def drag(
+        cls,
+        start: Sequence[float],
+        stop: Sequence[float],
+        nevents: int = 100,
+        modifiers: Iterable[str] = (),
+    ) -> MouseStream:
+        """
+        Make a stream of a straight drag.
+
+        The stream consists of a press event, ``nevents - 2`` move events and
+        a release event.
+        """
+        if nevents < 2:
+            raise ValueError("A drag needs at least 2 events.")
+        positions = np.linspace(start, stop, nevents)
+        types = np.ones(nevents, dtype=np.uint8)
+        types[0], types[-1] = 0, 2
+        mods = np.full(nevents, _modifier_mask(modifiers), dtype=np.uint8)
+        return cls(types, positions, modifiers=mods)
+
+    @classmethod
+    def click(
+        cls, position: Sequence[float], modifiers: Iterable[str] = ()
+    ) -> MouseStream:
+        """Make a stream of a single click."""
+        positions = np.stack([position, position], axis=0)
+        mods = np.full(2, _modifier_mask(modifiers), dtype=np.uint8)
+        return cls(np.array([0, 2]), positions, modifiers=mods)
+
+    def concat(self, other: MouseStream) -> MouseStream:
+        """Concatenate two streams."""
+        offset = self.times[-1] if len(self) > 0 else 0.0
+        return MouseStream(
+            np.concatenate([self.types, other.types]),
+            np.concatenate([self.positions, other.positions]),
+            np.concatenate([self.pos, other.pos]),
+            np.concatenate([self.buttons, other.buttons]),
+            np.concatenate([self.modifiers, other.modifiers]),
+            np.concatenate([self.times, other.times + offset]),
+            self.dims_displayed,
+        )
+
+    def save(self, path: str | os.PathLike) -> None:
+        """Save the stream as a compressed npz file."""
+        np.savez_compressed(
+            path,
+            types=self.types,
+            positions=self.positions,
+            pos=self.pos,
+            buttons=self.buttons,
+            modifiers=self.modifiers,
+            times=self.times,
+            dims_displayed=self.dims_displayed,
+        )
+        return None
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> MouseStream:
+        """Load a stream saved by ``save``."""
+        with np.load(path, allow_pickle=False) as f:
+            return cls(**{key: f[key] for key in f.files})
+
+    def _update_event(self, event: ReplayedMouseEvent, i: int) -> None:
+        mask = int(self.modifiers[i])
+        event.type = _EVENT_TYPES[self.types[i]]
+        event.is_dragging = event.type == "mouse_move"
+        event.position = self.positions[i]
+        event.pos = self.pos[i]
+        event.button = int(self.buttons[i])
+        event.buttons = [event.button] if event.type != "mouse_release" else []
+        event.modifiers = [
+            m for j, m in enumerate(_MODIFIERS) if mask & (1 << j)
+        ]
+
+
+class MouseRecorder:
+    """
+    Record drag events on a viewer or a layer.
+
+    >>> recorder = MouseRecorder(viewer)
+    >>> recorder.start()
+    >>> ...  # drag on the viewer
+    >>> stream = recorder.stop()
+    """
+
+    def __init__(self, obj):
+        self._obj = obj
+        self._rows: list[tuple] = []
+        self._t0 = 0.0
+        self.stream: MouseStream | None = None
+
+    @property
+    def recording(self) -> bool:
+        """True if recording."""
+        return self._on_drag in self._obj.mouse_drag_callbacks
+
+    def start(self) -> None:
+        """Start recording."""
+        if self.recording:
+            raise RuntimeError("Already recording.")
+        self._rows.clear()
+        self._t0 = perf_counter()
+        # insert at the beginning to record events before other callbacks
+        self._obj.mouse_drag_callbacks.insert(0, self._on_drag)
+        return None
+
+    def stop(self) -> MouseStream:
+        """Stop recording and return the recorded stream."""
+        self._obj.mouse_drag_callbacks.remove(self._on_drag)
+        dims = getattr(self._obj, "dims", None)
+        if self._rows:
+            ndim = len(self._rows[0][1])
+        else:
+            ndim = getattr(dims, "ndim", getattr(self._obj, "ndim", 2))
+        columns = list(zip(*self._rows)) or [()] * 6
+        types, positions, pos, buttons, mods, times = columns
+        self.stream = MouseStream(
+            np.array(types, dtype=np.uint8),
+            np.array(positions, dtype=np.float64).reshape(len(types), ndim),
+            np.array(pos, dtype=np.float32).reshape(len(types), 2),
+            np.array(buttons, dtype=np.uint8),
+            np.array(mods, dtype=np.uint8),
+            np.array(times, dtype=np.float64),
+            dims_displayed=getattr(dims, "displayed", None),
+        )
+        self._rows.clear()
+        return self.stream
+
+    def __enter__(self) -> MouseRecorder:
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def _append(self, event: MouseEvent) -> None:
+        self._rows.append(
+            (
+                _EVENT_TYPES.index(event.type),
+                np.array(event.position, dtype=np.float64),
+                np.array(event.pos, dtype=np.float32)[:2],
+                event.button or 0,
+                _modifier_mask(event.modifiers),
+                perf_counter() - self._t0,
+            )
+        )
+
+    def _on_drag(self, obj, event: MouseEvent):
+        self._append(event)
+        yield
+        while event.type == "mouse_move":
+            self._append(event)
+            yield
+        self._append(event)
+
+
+class ReplayResult:
+    """Latencies of the replayed events."""
+
+    def __init__(self, types: np.ndarray, latencies: np.ndarray):
+        self.types = types
+        self.latencies = latencies
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(nevents={self.latencies.size})"
+
+    @property
+    def total(self) -> float:
+        """Total time in seconds."""
+        return float(self.latencies.sum())
+
+    @property
+    def throughput(self) -> float:
+        """Number of events processed per second."""
+        total = self.total
+        return self.latencies.size / total if total > 0 else float("inf")
+
+    def summary(self) -> dict[str, float]:
+        """Summary of the latencies of each event type in microseconds."""
+        out = {"nevents": self.latencies.size, "throughput": self.throughput}
+        for i, name in enumerate(_EVENT_TYPES):
+            lat = self.latencies[self.types == i] * 1e6
+            if lat.size == 0:
+                continue
+            out[f"{name}_mean_us"] = float(lat.mean())
+            out[f"{name}_p50_us"] = float(np.percentile(lat, 50))
+            out[f"{name}_p99_us"] = float(np.percentile(lat, 99))
+            out[f"{name}_max_us"] = float(lat.max())
+        return out
+
+
+def replay(
+    stream: MouseStream,
+    obj,
+    callbacks: Sequence[Callable] | None = None,
+) -> ReplayResult:
+    """
+    Replay a mouse event stream through drag callbacks.
+
+    Callbacks are called the same way as napari does: a callback is called
+    on the press event and, if it returns a generator, the generator is
+    stepped on every following move and release event. One event object is
+    updated in place during a drag so that the callbacks see the latest
+    state, as napari does.
+
+    Parameters
+    ----------
+    stream : MouseStream
+        The mouse event stream.
+    obj : Viewer or Layer
+        Object that is passed to the callbacks as the first argument.
+    callbacks : sequence of callable, optional
+        Callbacks to run. ``obj.mouse_drag_callbacks`` at each press event
+        are used by default.
+
+    Returns
+    -------
+    ReplayResult
+        Per-event latencies.
+    """
+    latencies = np.zeros(len(stream), dtype=np.float64)
+    generators: list = []
+    event = ReplayedMouseEvent(stream.dims_displayed)
+    for i in range(len(stream)):
+        if stream.types[i] == 0:
+            event = ReplayedMouseEvent(stream.dims_displayed)
+        stream._update_event(event, i)
+        t0 = perf_counter()
+        if event.type == "mouse_press":
+            generators.clear()
+            if callbacks is None:
+                _callbacks = list(obj.mouse_drag_callbacks)
+            else:
+                _callbacks = list(callbacks)
+            for callback in _callbacks:
+                gen = callback(obj, event)
+                if inspect.isgenerator(gen):
+                    try:
+                        next(gen)
+                    except StopIteration:
+                        continue
+                    generators.append(gen)
+        else:
+            for gen in list(generators):
+                try:
+                    next(gen)
+                except StopIteration:
+                    generators.remove(gen)
+            if event.type == "mouse_release":
+                generators.clear()
+        latencies[i] = perf_counter() - t0
+    return ReplayResult(stream.types, latencies)
+
+
+class CameraPath:
+    """
+    A sequence of camera states.
+
+    Parameters
+    ----------
+    states : sequence of CameraState
+        Camera states. All the states must have the same dimensionality.
+    """
+
+    def __init__(self, states: Iterable[CameraState] = ()):
+        self.states = [CameraState(*state) for state in states]
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def __getitem__(self, i: int) -> CameraState:
+        return self.states[i]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(nstates={len(self)})"
+
+    def append(self, state: CameraState) -> None:
+        """Append a state unless it is the same as the last one."""
+        state = CameraState(*state)
+        if not self.states or self.states[-1] != state:
+            self.states.append(state)
+        return None
+
+    def _as_arrays(self) -> dict[str, np.ndarray]:
+        return {
+            "zoom": np.array([s.zoom for s in self.states], dtype=np.float64),
+            "center": np.array([s.center for s in self.states], np.float64),
+            "angles": np.array([s.angles for s in self.states], np.float64),
+            "step": np.array([s.step for s in self.states], dtype=np.int64),
+        }
+
+    @classmethod
+    def _from_arrays(cls, zoom, center, angles, step) -> CameraPath:
+        return cls(
+            CameraState(float(z), tuple(c), tuple(a), tuple(int(i) for i in s))
+            for z, c, a, s in zip(zoom, center, angles, step)
+        )
+
+    def interpolate(self, nframes: int) -> CameraPath:
+        """
+        Interpolate the path into ``nframes`` states.
+
+        Zoom is interpolated geometrically, the others linearly. Dims steps
+        are rounded to integers.
+        """
+        if len(self) < 2:
+            return CameraPath(self.states * nframes)
+        arrays = self._as_arrays()
+        t = np.linspace(0, len(self) - 1, nframes)
+        i0 = np.minimum(np.floor(t).astype(np.intp), len(self) - 2)
+        w = (t - i0)[:, np.newaxis]
+
+        def _lerp(a: np.ndarray) -> np.ndarray:
+            a = a.reshape(len(self), -1).astype(np.float64)
+            return a[i0] * (1 - w) + a[i0 + 1] * w
+
+        return self._from_arrays(
+            np.exp(_lerp(np.log(arrays["zoom"]))[:, 0]),
+            _lerp(arrays["center"]),
+            _lerp(arrays["angles"]),
+            np.round(_lerp(arrays["step"])).astype(np.int64),
+        )
+
+    def save(self, path: str | os.PathLike) -> None:
+        """Save the camera path as a npz file."""
+        np.savez_compressed(path, **self._as_arrays())
+        return None
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> CameraPath:
+        """Load a camera path saved by ``save``."""
+        with np.load(path, allow_pickle=False) as f:
+            return cls._from_arrays(
+                f["zoom"], f["center"], f["angles"], f["step"]
+            )
+
+
+class CameraPathRecorder:
+    """
+    Record the camera states of a viewer as a camera path.
+
+    A state is recorded every time the camera or the dimension sliders
+    change. ``capture`` can be used to add a key frame manually.
+    """
+
+    def __init__(self, viewer: napari.Viewer):
+        self._viewer = viewer
+        self._recording = False
+        self.path = CameraPath()
+
+    @property
+    def recording(self) -> bool:
+        """True if recording."""
+        return self._recording
+
+    def _emitters(self) -> list:
+        camera = self._viewer.camera
+        return [
+            camera.events.zoom,
+            camera.events.center,
+            camera.events.angles,
+            self._viewer.dims.events.current_step,
+        ]
+
+    def capture(self, *_) -> None:
+        """Capture the current state."""
+        self.path.append(CameraState.from_viewer(self._viewer))
+        return None
+
+    def start(self) -> None:
+        """Start recording."""
+        if self._recording:
+            raise RuntimeError("Already recording.")
+        self.path = CameraPath()
+        self.capture()
+        for emitter in self._emitters():
+            emitter.connect(self.capture)
+        self._recording = True
+        return None
+
+    def stop(self) -> CameraPath:
+        """Stop recording and return the recorded camera path."""
+        for emitter in self._emitters():
+            emitter.disconnect(self.capture)
+        self._recording = False
+        return self.path
+
+    def __enter__(self) -> CameraPathRecorder:
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+class CameraReplayResult:
+    """Frame times of a replayed camera path."""
+
+    def __init__(self, frame_times: np.ndarray):
+        self.frame_times = frame_times
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(nframes={self.frame_times.size})"
+
+    @property
+    def fps(self) -> float:
+        """Mean frames per second."""
+        total = self.frame_times.sum()
+        return self.frame_times.size / total if total > 0 else float("inf")
+
+    def summary(self) -> dict[str, float]:
+        """Summary of the frame times in milliseconds."""
+        ms = self.frame_times * 1e3
+        if ms.size == 0:
+            return {"nframes": 0}
+        return {
+            "nframes": ms.size,
+            "fps": self.fps,
+            "mean_ms": float(ms.mean()),
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p99_ms": float(np.percentile(ms, 99)),
+            "max_ms": float(ms.max()),
+        }
+
+
+def replay_camera_path(
+    path: CameraPath,
+    viewer: napari.Viewer,
+    render: Callable[[napari.Viewer], Any] | None = None,
+) -> CameraReplayResult:
+    """
+    Replay a camera path on a viewer and measure the frame times.
+
+    Each state is applied to the viewer and the canvas is rendered
+    synchronously, so this also works on a headless viewer.
+
+    Parameters
+    ----------
+    path : CameraPath
+        The camera path.
+    viewer : napari.Viewer
+        The viewer to be updated.
+    render : callable, optional
+        Function that renders a frame. By default, an off-screen screenshot
+        of the canvas is taken.
+    """
+    if render is None:
+
+        def render(viewer: napari.Viewer):
+            return viewer.screenshot(canvas_only=True)
+
+    frame_times = np.zeros(len(path), dtype=np.float64)
+    for i, state in enumerate(path):
+        t0 = perf_counter()
+        state.apply(viewer)
+        render(viewer)
+        frame_times[i] = perf_counter() - t0
+    return CameraReplayResult(frame_times)
@@ -4,6 +4,13 @@ import numpy as np
 from magicgui import register_type
 
 from . import _widgets as wdt
+from ._widgets._camera import CameraState
+from ._widgets._mask import PackedMask, RunLengthMask
+from ._widgets._crop import LazyCrop
+from ._widgets._lasso import Lasso
+from ._widgets._tiles import TiledBox
+from ._widgets._stats import BoxStats
+from ._widgets._label_map import LabelSelection
 
 if TYPE_CHECKING:
     import pandas as pd
@@ -14,6 +21,12 @@ else:
 
 __all__ = [
     "BoxSelection",
+    "TiledBoxSelection",
+    "TiledBox",
+    "BoxStatistics",
+    "BoxStats",
+    "LassoSelection",
+    "Lasso",
     "FeatureColumn",
     "OneOfShapes",
     "OneOfLines",
@@ -27,8 +40,15 @@ __all__ = [
     "SomeOfRectangles",
     "SomeOfPolygons",
     "SomeOfPaths",
+    "ShapesMask",
     "OneOfLabels",
+    "SomeOfLabels",
+    "LabelSelection",
+    "LabelContour",
+    "OneOfPoints",
+    "SomeOfPoints",
     "Coordinate",
+    "Coordinates",
     "ZStep",
     "ZRange",
     "LineData",
@@ -36,6 +56,19 @@ __all__ = [
     "PathData",
     "PolygonData",
     "EllipseData",
+    "OneOfShapesInLayer",
+    "CoordinateInLayer",
+    "LineDataInLayer",
+    "RectangleDataInLayer",
+    "PathDataInLayer",
+    "PolygonDataInLayer",
+    "EllipseDataInLayer",
+    "CameraState",
+    "ZProjection",
+    "ImageCrop",
+    "LazyCrop",
+    "PackedMask",
+    "RunLengthMask",
 ]
 
 # fmt: off
@@ -58,6 +91,76 @@ Examples
 """
 register_type(BoxSelection, widget_type=wdt.BoxSelector)
 
+TiledBoxSelection = NewType("TiledBoxSelection", TiledBox)
+TiledBoxSelection.__doc__ = """
+Alias of TiledBox for a box selection processed tile by tile.
+
+Iterating over the box yields `Tile`s of slices: `tile.read` is the tile
+with a halo of `overlap` pixels on each side, `tile.crop` is the region of
+`tile.read` to keep, and `tile.write` (or `tile.local` relative to the box
+origin) is where it goes. `box.map(func, data, max_workers=4)` applies a
+function tile by tile in a thread pool with at most `max_workers` tiles in
+memory, and stitches the results. Tile size and overlap are set in the
+widget or by `{"tile_size": 2048, "overlap": 16}`.
+
+Examples
+--------
+>>> from napari_power_widgets.types import TiledBoxSelection
+>>> from napari.types import ImageData
+>>> from magicgui import magicgui
+>>> from scipy import ndimage as ndi
+>>>
+>>> @magicgui
+>>> def smooth(image: ImageData, box: TiledBoxSelection) -> ImageData:
+>>>     return box.map(lambda t: ndi.gaussian_filter(t, 4), image)
+"""
+register_type(TiledBoxSelection, widget_type=wdt.TiledBoxSelector)
+
+BoxStatistics = NewType("BoxStatistics", BoxStats)
+BoxStatistics.__doc__ = """
+Alias of BoxStats, a named tuple of (sum, mean, var, count) of the pixels of
+an image in a box selection.
+
+The statistics are shown in the widget and updated at every mouse move while
+dragging the box. They are read in constant time from summed-area tables of
+the current plane of the image, which are built on first use and cached for
+the recently used planes.
+
+Examples
+--------
+>>> from napari_power_widgets.types import BoxStatistics
+>>> from magicgui import magicgui
+>>>
+>>> @magicgui(auto_call=True)
+>>> def snr(stats: BoxStatistics) -> float:
+>>>     return stats.mean / np.sqrt(stats.var)
+"""
+register_type(BoxStatistics, widget_type=wdt.BoxStatisticsEdit)
+
+LassoSelection = NewType("LassoSelection", Lasso)
+LassoSelection.__doc__ = """
+Alias of Lasso for a freehand polygon selection over a target layer.
+
+Drag in the viewer to draw a lasso. `lasso.polygon` is the (N, 2) polygon in
+the data coordinates of the target Image or Labels layer, and `lasso.mask`
+is a boolean mask of the last two dimensions of the layer, rasterized on
+first access within the bounding box of the lasso. Self-intersecting lassos
+are filled with the even-odd rule by default; set
+`{"fill_rule": "nonzero"}` to use the winding number.
+
+Examples
+--------
+>>> from napari_power_widgets.types import LassoSelection
+>>> from napari.types import ImageData
+>>> from magicgui import magicgui
+>>>
+>>> @magicgui
+>>> def mean_inside(image: ImageData, lasso: LassoSelection):
+>>>     print(image[lasso.mask].mean())
+"""
+
+register_type(LassoSelection, widget_type=wdt.LassoSelector)
+
 
 # BoxSlices = NewType("BoxSlices", Tuple[slice, slice])
 # BoxSlices.__doc__ = """
@@ -163,6 +266,28 @@ register_type(SomeOfRectangles, widget_type=wdt.ShapeSelect, filter="rectangle")
 register_type(SomeOfPolygons, widget_type=wdt.ShapeSelect, filter="polygon")  # noqa
 register_type(SomeOfPaths, widget_type=wdt.ShapeSelect, filter="path")  # noqa
 
+ShapesMask = NewType("ShapesMask", np.ndarray)
+ShapesMask.__doc__ = """
+Alias of numpy.ndarray for selected shapes rasterized over an image layer.
+
+The selected polygons, rectangles and ellipses are rasterized into a boolean
+mask of the shape of the target image, in one vectorized scanline pass
+restricted to the bounding box of each shape. Set `{"output": "labels"}` to
+get a label image where the i-th selected shape is labeled i + 1.
+
+Examples
+--------
+>>> from napari_power_widgets.types import ShapesMask
+>>> from napari.types import ImageData
+>>> from magicgui import magicgui
+>>>
+>>> @magicgui
+>>> def mean_inside(image: ImageData, mask: ShapesMask):
+>>>     print(image[mask].mean())
+"""
+
+register_type(ShapesMask, widget_type=wdt.ShapesMaskSelect)
+
 OneOfLabels = NewType("OneOfLabels", np.ndarray)
 OneOfLabels.__doc__ = """
 Alias of a boolean numpy.ndarray for a label data.
@@ -170,6 +295,14 @@ Alias of a boolean numpy.ndarray for a label data.
 Label data 0 is considered as the background. If you want to use it,
 set the configuration by `@magicgui(x={"include_zero": True})`
 
+A dense mask uses one byte per voxel. Set `{"output": "packbits"}` to get a
+`PackedMask` (bounding box and bit-packed crop) or `{"output": "rle"}` to get
+a `RunLengthMask`. They are encoded from the label data slab by slab without
+a dense mask, and decoded on demand by `np.asarray(mask)`.
+A dense mask above the memory budget (see `napari_power_widgets.budget`)
+raises an error, or is returned as a `PackedMask` or a memmap-backed array
+depending on the policy.
+
 Examples
 --------
 >>> from napari_power_widgets.types import OneOfLabels
@@ -185,6 +318,88 @@ Examples
 
 register_type(OneOfLabels, widget_type=wdt.LabelComboBox)
 
+SomeOfLabels = NewType("SomeOfLabels", LabelSelection)
+SomeOfLabels.__doc__ = """
+Alias of a ``LabelSelection`` of some labels of a Labels layer.
+
+The selection references the label image and the selected labels. Use
+``map`` to apply a function to the bounding-box crop of each object, in a
+thread or process pool, instead of comparing the whole image per label.
+
+Examples
+--------
+>>> from napari_power_widgets.types import SomeOfLabels
+>>> from napari.types import ImageData
+>>> from magicgui import magicgui
+>>>
+>>> @magicgui
+>>> def mean_intensity(labels: SomeOfLabels, image: ImageData):
+>>>     mean = lambda crop, mask: crop[mask].mean()
+>>>     print(labels.map(mean, image, output="table"))
+"""
+
+register_type(SomeOfLabels, widget_type=wdt.LabelSelect)
+
+LabelContour = NewType("LabelContour", List[np.ndarray])
+LabelContour.__doc__ = """
+Alias of a list of numpy.ndarray for the contour polygons of a label.
+
+Polygons are traced by marching squares only within the bounding box of the
+selected label and returned in world coordinates. nD labels are traced plane
+by plane along the last two axes, and each polygon has the coordinates of
+its plane in the leading columns. Set `{"tolerance": 1.0}` to simplify the
+polygons by the Douglas-Peucker algorithm.
+
+Examples
+--------
+>>> from napari_power_widgets.types import LabelContour
+>>> from napari.types import LayerDataTuple
+>>> from magicgui import magicgui
+>>>
+>>> @magicgui
+>>> def outline(contours: LabelContour) -> LayerDataTuple:
+>>>     return contours, {"shape_type": "polygon"}, "shapes"
+"""
+
+register_type(LabelContour, widget_type=wdt.LabelContourEdit)
+
+OneOfPoints = NewType("OneOfPoints", np.ndarray)
+OneOfPoints.__doc__ = """
+Alias of numpy.ndarray of shape (ndim,) for one of points in a Points layer.
+
+The value is a view of the layer data. A point can be selected by clicking
+the viewer.
+
+Examples
+--------
+>>> from napari_power_widgets.types import OneOfPoints
+>>> from magicgui import magicgui
+>>>
+>>> @magicgui
+>>> def print_point(point: OneOfPoints):
+>>>     print(point)
+"""
+
+SomeOfPoints = NewType("SomeOfPoints", np.ndarray)
+SomeOfPoints.__doc__ = """
+Alias of an integer numpy.ndarray for indices of points in a Points layer.
+
+Points can be selected by clicking or dragging a box in the viewer.
+
+Examples
+--------
+>>> from napari_power_widgets.types import SomeOfPoints
+>>> from napari.layers import Points
+>>> from magicgui import magicgui
+>>>
+>>> @magicgui
+>>> def centroid(layer: Points, indices: SomeOfPoints):
+>>>     print(layer.data[indices].mean(axis=0))
+"""
+
+register_type(OneOfPoints, widget_type=wdt.PointComboBox)
+register_type(SomeOfPoints, widget_type=wdt.PointSelect)
+
 Coordinate = NewType("Coordinate", np.ndarray)
 Coordinate.__doc__ = """
 Alias of numpy.ndarray of shape (2,) for a physical point coordinate.
@@ -197,10 +412,35 @@ Examples
 >>> @magicgui
 >>> def measure_distance(pos0: Coordinate, pos1: Coordinate):
 >>>     return np.sqrt(np.sum((pos0 - pos1)**2))
+
+Clicked point can snap to the nearest local maximum of an image, or to the
+nearest centroid of labels, by `@magicgui(x={"snap": "maxima"})` or
+`@magicgui(x={"snap": "centroid"})`. Snapping radius in pixels can be set by
+`snap_radius`.
 """
 
 register_type(Coordinate, widget_type=wdt.CoordinateSelector)
 
+Coordinates = NewType("Coordinates", np.ndarray)
+Coordinates.__doc__ = """
+Alias of numpy.ndarray of shape (N, ndim) for a set of point coordinates.
+
+Every click in the selection mode appends the world coordinate of the
+clicked point, including the current dims step. The value is a read-only
+view of the widget's buffer.
+
+Examples
+--------
+>>> from napari_power_widgets.types import Coordinates
+>>> from magicgui import magicgui
+>>>
+>>> @magicgui
+>>> def add_landmarks(coords: Coordinates) -> napari.types.LayerDataTuple:
+>>>     return coords.copy(), {"name": "landmarks"}, "points"
+"""
+
+register_type(Coordinates, widget_type=wdt.CoordinatesSelector)
+
 ZStep = NewType("ZStep", int)
 ZStep.__doc__ = """
 Alias of int for z-step of the viewer.
@@ -238,6 +478,49 @@ Examples
 """
 register_type(ZRange, widget_type=wdt.ZRangeEdit)
 
+ZProjection = NewType("ZProjection", np.ndarray)
+ZProjection.__doc__ = """
+Alias of numpy.ndarray for a projection of an image over a ZRange.
+
+The sub-stack is reduced chunk by chunk, so peak memory stays at a chunk
+plus the output, whatever the depth of the range. The method ("max", "min",
+"sum" or "mean") can be selected in the widget. Set `{"max_workers": 4}` to
+read and reduce chunks in a thread pool.
+
+Examples
+--------
+>>> from napari_power_widgets.types import ZProjection
+>>> from napari.types import ImageData
+>>> from magicgui import magicgui
+>>>
+>>> @magicgui
+>>> def projection(proj: ZProjection) -> ImageData:
+>>>     return proj
+"""
+register_type(ZProjection, widget_type=wdt.ZProjectionEdit)
+
+ImageCrop = NewType("ImageCrop", LazyCrop)
+ImageCrop.__doc__ = """
+Alias of LazyCrop for a box and z-range crop of an image layer.
+
+The crop is not read until it is converted into an array. For multiscale
+layers, set `{"resolution": 1024}` to read from the coarsest pyramid level
+with at least 1024 pixels along the longer side. Only the chunks overlapping
+the crop are read.
+
+Examples
+--------
+>>> from napari_power_widgets.types import ImageCrop
+>>> from napari.types import ImageData
+>>> from magicgui import magicgui
+>>>
+>>> @magicgui
+>>> def crop(crop: ImageCrop) -> ImageData:
+>>>     return np.asarray(crop)
+"""
+
+register_type(ImageCrop, widget_type=wdt.ImageCropEdit)
+
 LineData = NewType("LineData", np.ndarray)
 RectangleData = NewType("RectangleData", np.ndarray)
 PathData = NewType("PathData", np.ndarray)
@@ -250,5 +533,61 @@ register_type(PathData, widget_type=wdt.PathDataEdit)
 register_type(PolygonData, widget_type=wdt.PolygonDataEdit)
 register_type(EllipseData, widget_type=wdt.EllipseDataEdit)
 
+OneOfShapesInLayer = NewType("OneOfShapesInLayer", np.ndarray)
+OneOfShapesInLayer.__doc__ = """
+Alias of numpy.ndarray of a shape in the data coordinates of a target layer.
+
+Same as ``OneOfShapes`` with another combobox to select the target layer. All
+the vertices are mapped from the shapes layer to the target layer by one
+matrix multiplication of the composed affine transform, which is cached per
+layer until its scale, translate, rotate, shear or affine changes. Variants
+of the other types are ``CoordinateInLayer``, ``LineDataInLayer``,
+``RectangleDataInLayer``, ``PathDataInLayer``, ``PolygonDataInLayer`` and
+``EllipseDataInLayer``, whose world coordinates are mapped on the current
+slice.
+
+Examples
+--------
+>>> from napari_power_widgets.types import OneOfShapesInLayer
+>>> from magicgui import magicgui
+>>> from skimage.draw import polygon2mask
+>>>
+>>> @magicgui
+>>> def mask(image: ImageData, shape: OneOfShapesInLayer) -> LabelsData:
+>>>     return polygon2mask(image.shape, shape)
+"""
+CoordinateInLayer = NewType("CoordinateInLayer", np.ndarray)
+LineDataInLayer = NewType("LineDataInLayer", np.ndarray)
+RectangleDataInLayer = NewType("RectangleDataInLayer", np.ndarray)
+PathDataInLayer = NewType("PathDataInLayer", np.ndarray)
+PolygonDataInLayer = NewType("PolygonDataInLayer", np.ndarray)
+EllipseDataInLayer = NewType("EllipseDataInLayer", np.ndarray)
+
+register_type(OneOfShapesInLayer, widget_type=wdt.InLayerEdit, inner=wdt.ShapeComboBox)  # noqa
+register_type(CoordinateInLayer, widget_type=wdt.InLayerEdit, inner=wdt.CoordinateSelector)  # noqa
+register_type(LineDataInLayer, widget_type=wdt.InLayerEdit, inner=wdt.LineDataEdit)  # noqa
+register_type(RectangleDataInLayer, widget_type=wdt.InLayerEdit, inner=wdt.RectangleDataEdit)  # noqa
+register_type(PathDataInLayer, widget_type=wdt.InLayerEdit, inner=wdt.PathDataEdit)  # noqa
+register_type(PolygonDataInLayer, widget_type=wdt.InLayerEdit, inner=wdt.PolygonDataEdit)  # noqa
+register_type(EllipseDataInLayer, widget_type=wdt.InLayerEdit, inner=wdt.EllipseDataEdit)  # noqa
+
+CameraState.__doc__ = """
+Named tuple of (zoom, center, angles, step) for a camera state of the viewer.
+
+The widget captures the current camera and dims step of the viewer and
+restores them with one click.
+
+Examples
+--------
+>>> from napari_power_widgets.types import CameraState
+>>> from magicgui import magicgui
+>>>
+>>> @magicgui
+>>> def screenshot(viewer: napari.Viewer, state: CameraState):
+>>>     state.apply(viewer)
+>>>     return viewer.screenshot()
+"""
+register_type(CameraState, widget_type=wdt.CameraStateEdit)
+
 # delete all the variables that are not needed
 del NewType, Tuple, List, Any, TYPE_CHECKING, np, register_type, wdt